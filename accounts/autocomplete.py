@@ -0,0 +1,245 @@
+"""
+Prefix autocomplete for ``@mention`` and username typeahead, served from Redis.
+
+Every active user is indexed in one sorted set whose members all share score 0, so
+Redis orders them lexicographically and ``ZRANGEBYLEX`` returns the members starting
+with a prefix. A member is ``"<term>\\x00<user id>"``, where the terms are the
+lowercased username, display name and each word of the display name. The rendered
+suggestion of every user is kept in a hash next to it, so a lookup never reaches
+PostgreSQL.
+
+The index is kept up to date by signals on ``User`` and ``Profile``; existing
+accounts are loaded with ``manage.py rebuild_autocomplete_index``.
+
+Suggestions the viewer follows are ranked first. Who the viewer follows is mirrored
+in a Redis set, built in the background on a cold read and kept in sync by signals
+on ``Follow``, like the viewer state sets of ``tweets.viewer_state``.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+AUTOCOMPLETE_INDEX_KEY = "autocomplete:terms"
+AUTOCOMPLETE_USERS_KEY = "autocomplete:users"
+SEPARATOR = "\x00"
+
+
+def following_key(user_id):
+    return f"autocomplete_following:{user_id}"
+
+
+def following_ready_key(user_id):
+    # An empty set does not exist in Redis, readiness is tracked separately.
+    return f"autocomplete_following_ready:{user_id}"
+
+
+def following_warming_key(user_id):
+    return f"autocomplete_following_warming:{user_id}"
+
+
+def normalize(term):
+    return term.strip().lstrip("@").lower()
+
+
+def index_terms(suggestion):
+    terms = {normalize(suggestion["username"])}
+    name = normalize(suggestion["name"] or "")
+    if name:
+        terms.add(name)
+        terms.update(name.split())
+    return terms
+
+
+def _members(suggestion):
+    return [f"{term}{SEPARATOR}{suggestion['id']}" for term in index_terms(suggestion)]
+
+
+def user_suggestion(user, profile):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "name": profile.name,
+        "profile_image": profile.profile_image.url if profile.profile_image else None,
+    }
+
+
+def _unindex(pipe, previous):
+    if previous is not None:
+        pipe.zrem(AUTOCOMPLETE_INDEX_KEY, *_members(json.loads(previous)))
+
+
+def index_user(user, profile):
+    """
+    (Re)index a user, or drop them from the index if the account is inactive.
+    """
+    conn = get_redis_connection("default")
+    previous = conn.hget(AUTOCOMPLETE_USERS_KEY, user.id)
+
+    pipe = conn.pipeline()
+    _unindex(pipe, previous)
+    if user.is_active:
+        suggestion = user_suggestion(user, profile)
+        pipe.zadd(
+            AUTOCOMPLETE_INDEX_KEY, {member: 0 for member in _members(suggestion)}
+        )
+        pipe.hset(AUTOCOMPLETE_USERS_KEY, user.id, json.dumps(suggestion))
+    else:
+        pipe.hdel(AUTOCOMPLETE_USERS_KEY, user.id)
+    pipe.execute()
+
+
+def unindex_user(user_id):
+    conn = get_redis_connection("default")
+    previous = conn.hget(AUTOCOMPLETE_USERS_KEY, user_id)
+    if previous is None:
+        return
+
+    pipe = conn.pipeline()
+    _unindex(pipe, previous)
+    pipe.hdel(AUTOCOMPLETE_USERS_KEY, user_id)
+    pipe.execute()
+
+
+def rebuild_index(profiles):
+    """
+    Replace the index with the given profiles (with their users selected).
+    """
+    conn = get_redis_connection("default")
+    conn.delete(AUTOCOMPLETE_INDEX_KEY, AUTOCOMPLETE_USERS_KEY)
+
+    count = 0
+    pipe = conn.pipeline(transaction=False)
+    for profile in profiles:
+        suggestion = user_suggestion(profile.user, profile)
+        pipe.zadd(
+            AUTOCOMPLETE_INDEX_KEY, {member: 0 for member in _members(suggestion)}
+        )
+        pipe.hset(AUTOCOMPLETE_USERS_KEY, profile.user_id, json.dumps(suggestion))
+        count += 1
+        if count % settings.AUTOCOMPLETE_REBUILD_BATCH_SIZE == 0:
+            pipe.execute()
+    pipe.execute()
+
+    return count
+
+
+def warm_following(user_id):
+    """
+    Materialize the set of users ``user_id`` follows.
+    """
+    from relationships.models import Follow
+
+    conn = get_redis_connection("default")
+    limit = settings.AUTOCOMPLETE_FOLLOWING_MAX_SET_SIZE
+    following_ids = list(
+        Follow.objects.filter(follower_id=user_id)
+        .order_by()
+        .values_list("following_id", flat=True)[: limit + 1]
+    )
+    if len(following_ids) > limit:
+        # Too large to mirror, don't retry before the TTL runs out.
+        cache.set(
+            following_warming_key(user_id),
+            1,
+            timeout=settings.AUTOCOMPLETE_FOLLOWING_TTL,
+        )
+        return
+
+    key = following_key(user_id)
+    pipe = conn.pipeline()
+    pipe.delete(key)
+    if following_ids:
+        pipe.sadd(key, *following_ids)
+        pipe.expire(key, settings.AUTOCOMPLETE_FOLLOWING_TTL)
+    pipe.set(following_ready_key(user_id), 1, ex=settings.AUTOCOMPLETE_FOLLOWING_TTL)
+    pipe.execute()
+
+
+def schedule_warm_following(user_id):
+    from .tasks import warm_autocomplete_following_task
+
+    if cache.add(following_warming_key(user_id), 1, timeout=60):
+        warm_autocomplete_following_task.delay(user_id)
+
+
+def update_following(follower_id, following_id, present):
+    """
+    Reflect a follow/unfollow in the follower's set, if it is materialized.
+    """
+    conn = get_redis_connection("default")
+    if not conn.exists(following_ready_key(follower_id)):
+        return
+
+    key = following_key(follower_id)
+    pipe = conn.pipeline()
+    if present:
+        pipe.sadd(key, following_id)
+        pipe.expire(key, settings.AUTOCOMPLETE_FOLLOWING_TTL)
+    else:
+        pipe.srem(key, following_id)
+    pipe.execute()
+
+
+def autocomplete(term, viewer_id, limit=None):
+    """
+    Up to ``limit`` suggestions whose username or display name starts with ``term``,
+    people the viewer follows first, then the shortest matching term.
+
+    Only the first ``AUTOCOMPLETE_CANDIDATES`` index entries are ranked, so the cost
+    of a lookup does not grow with the number of users.
+    """
+    prefix = normalize(term)
+    if not prefix:
+        return []
+    limit = limit or settings.AUTOCOMPLETE_LIMIT
+
+    conn = get_redis_connection("default")
+    members = conn.zrangebylex(
+        AUTOCOMPLETE_INDEX_KEY,
+        f"[{prefix}".encode(),
+        f"[{prefix}".encode() + b"\xff",  # Above any UTF-8 continuation.
+        start=0,
+        num=settings.AUTOCOMPLETE_CANDIDATES,
+    )
+
+    matches = {}
+    for member in members:
+        matched, user_id = member.decode().rsplit(SEPARATOR, 1)
+        user_id = int(user_id)
+        if user_id != viewer_id and (
+            user_id not in matches or len(matched) < len(matches[user_id])
+        ):
+            matches[user_id] = matched
+    if not matches:
+        return []
+
+    user_ids = list(matches)
+    followed = _followed(conn, viewer_id, user_ids)
+    user_ids.sort(
+        key=lambda user_id: (
+            user_id not in followed,
+            len(matches[user_id]),
+            matches[user_id],
+        )
+    )
+    user_ids = user_ids[:limit]
+
+    suggestions = conn.hmget(AUTOCOMPLETE_USERS_KEY, user_ids)
+    return [
+        {**json.loads(suggestion), "is_following": user_id in followed}
+        for user_id, suggestion in zip(user_ids, suggestions)
+        if suggestion is not None
+    ]
+
+
+def _followed(conn, viewer_id, user_ids):
+    if conn.exists(following_ready_key(viewer_id)):
+        members = conn.smismember(following_key(viewer_id), user_ids)
+        return {user_id for user_id, member in zip(user_ids, members) if member}
+
+    # Cold: rank without the follow graph and mirror it for the next keystrokes.
+    schedule_warm_following(viewer_id)
+    return set()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from accounts.autocomplete import rebuild_index
+from accounts.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis username/display name autocomplete index."
+
+    def handle(self, *args, **options):
+        profiles = (
+            Profile.objects.filter(user__is_active=True)
+            .select_related("user")
+            .iterator(chunk_size=2000)
+        )
+        count = rebuild_index(profiles)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} user(s)."))
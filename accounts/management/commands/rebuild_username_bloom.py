@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+from accounts.usernames import rebuild_bloom
+
+
+class Command(BaseCommand):
+    help = "Load every username into the Redis Bloom filter of the username resolver."
+
+    def handle(self, *args, **options):
+        usernames = User.objects.values_list("username", flat=True).iterator(
+            chunk_size=2000
+        )
+        count = rebuild_bloom(usernames)
+
+        self.stdout.write(self.style.SUCCESS(f"Added {count} username(s)."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:56
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY so large user tables stay writable.
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0004_alter_user_is_active"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="profile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="profile_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["username"],
+                name="user_username_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
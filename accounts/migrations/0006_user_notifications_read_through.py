@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_user_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="notifications_read_through",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
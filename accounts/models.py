@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.conf import settings
 
 # Create your models here.
@@ -12,9 +13,24 @@ class User(AbstractUser):
     updated_at = models.DateTimeField(auto_now=True)
 
     is_active = models.BooleanField(default=True)
+    # "Mark all notifications read": older notifications read as read (see
+    # interactions.unread).
+    notifications_read_through = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
     
     REQUIRED_FIELDS = ["email"]
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # pg_trgm index for user search (similarity and ILIKE), see accounts.search
+            GinIndex(
+                fields=["username"],
+                name="user_username_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            )
+        ]
+
     def save(self, *args, **kwargs):
         if self.email:
             self.email = self.email.strip().lower()
@@ -49,6 +65,13 @@ class Profile(models.Model):
     status = models.CharField(choices=STATUS_CHOICES, default="active", max_length=10)
     location = models.CharField(max_length=100, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                fields=["name"], name="profile_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            )
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
@@ -232,6 +232,17 @@ class ListUserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email"]
 
 
+class UserSearchSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="profile.name", read_only=True)
+    profile_image = serializers.ImageField(
+        source="profile.profile_image", read_only=True
+    )
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "name", "profile_image"]
+
+
 class ActivateSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField(write_only=True, style={"input_type": "password"})
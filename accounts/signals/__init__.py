@@ -1 +1,6 @@
-from . import profile_signal, notify_post_registration
+from . import (
+    profile_signal,
+    notify_post_registration,
+    autocomplete_index,
+    username_cache,
+)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from accounts.models import Profile
+from accounts.autocomplete import index_user, unindex_user
+
+
+@receiver(post_save, sender=Profile)
+def on_profile_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: index_user(instance.user, instance))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def on_user_saved(sender, instance, created, **kwargs):
+    # A new user is indexed once their profile is created.
+    if created:
+        return
+
+    try:
+        profile = instance.profile
+    except Profile.DoesNotExist:
+        return
+    transaction.on_commit(lambda: index_user(instance, profile))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def on_user_deleted(sender, instance, **kwargs):
+    user_id = instance.id
+    transaction.on_commit(lambda: unindex_user(user_id))
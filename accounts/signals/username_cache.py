@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.db.models.signals import post_init, post_save, post_delete
+from django.db import transaction
+from accounts.usernames import forget_username, remember_username
+
+
+def _now_and_on_commit(function, username):
+    # Again after commit, in case a concurrent lookup cached the old row meanwhile.
+    function(username)
+    transaction.on_commit(lambda: function(username))
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_loaded_username(sender, instance, **kwargs):
+    # Deferred when loaded with only(); renames are then detected on save only.
+    instance._loaded_username = instance.__dict__.get("username")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def on_user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and "username" not in update_fields:
+        return
+
+    previous = getattr(instance, "_loaded_username", None)
+    if created or previous != instance.username:
+        _now_and_on_commit(remember_username, instance.username)
+        if previous and not created:
+            _now_and_on_commit(forget_username, previous)
+    instance._loaded_username = instance.username
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def on_user_deleted(sender, instance, **kwargs):
+    _now_and_on_commit(forget_username, instance.username)
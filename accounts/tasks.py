@@ -2,6 +2,7 @@ from celery import shared_task
 from django.contrib.auth import get_user_model
 from .utils import Util
 from interactions.utils import create_notification
+from .autocomplete import warm_following
 
 User = get_user_model()
 
@@ -17,3 +18,8 @@ def send_welcome_notification_task(user_id):
         create_notification(receiver=user, verb="welcome")
     except User.DoesNotExist:
         pass
+
+
+@shared_task
+def warm_autocomplete_following_task(user_id):
+    warm_following(user_id)
@@ -0,0 +1,100 @@
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.autocomplete import autocomplete, warm_following
+from accounts.models import User
+from relationships.models import Follow
+
+
+class TestAutocomplete(APITestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.viewer = self.create_user("viewer")
+            self.alice = self.create_user("alice")
+            self.alina = self.create_user("alina")
+            self.bob = self.create_user("bob")
+            self.bob.profile.name = "Alister Bob"
+            self.bob.profile.save()
+        self.url = reverse("user-autocomplete")
+
+    def create_user(self, username):
+        return User.objects.create_user(
+            username=username, email=f"{username}@gmail.com", password="user1234"
+        )
+
+    def usernames(self, suggestions):
+        return [suggestion["username"] for suggestion in suggestions]
+
+    def test_prefix_matches_usernames_and_display_names(self):
+        with self.assertNumQueries(0):
+            suggestions = autocomplete("@Ali", self.viewer.id)
+
+        self.assertEqual(self.usernames(suggestions), ["alice", "alina", "bob"])
+        self.assertEqual(suggestions[2]["name"], "Alister Bob")
+
+    def test_followed_users_come_first(self):
+        Follow.objects.create(follower=self.viewer, following=self.bob)
+        warm_following(self.viewer.id)
+        Follow.objects.create(follower=self.viewer, following=self.alina)
+
+        suggestions = autocomplete("ali", self.viewer.id)
+
+        self.assertEqual(self.usernames(suggestions), ["alina", "bob", "alice"])
+        self.assertTrue(suggestions[0]["is_following"])
+        self.assertFalse(suggestions[2]["is_following"])
+
+    def test_renamed_and_deactivated_users_are_reindexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.username = "carol"
+            self.alice.save()
+            self.alina.is_active = False
+            self.alina.save()
+
+        # Alice keeps her display name.
+        self.assertEqual(
+            self.usernames(autocomplete("ali", self.viewer.id)), ["carol", "bob"]
+        )
+        self.assertEqual(self.usernames(autocomplete("car", self.viewer.id)), ["carol"])
+
+    def test_deleted_users_are_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.delete()
+
+        self.assertEqual(
+            self.usernames(autocomplete("ali", self.viewer.id)), ["alina", "bob"]
+        )
+
+    def test_rebuild_command_restores_the_index(self):
+        cache.clear()
+        call_command("rebuild_autocomplete_index", stdout=open("/dev/null", "w"))
+
+        self.assertEqual(
+            self.usernames(autocomplete("ali", self.viewer.id)),
+            ["alice", "alina", "bob"],
+        )
+
+    def test_endpoint_does_not_query_the_database(self):
+        token = RefreshToken.for_user(self.viewer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"q": "ali"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.usernames(response.data["results"]), ["alice", "alina", "bob"]
+        )
+        self.assertTrue(response.data["results"][0]["profile_image"].startswith("http"))
+
+    def test_viewer_is_not_suggested(self):
+        self.client.force_authenticate(user=self.viewer)
+        response = self.client.get(self.url, {"q": "view"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_unauthenticated(self):
+        response = self.client.get(self.url, {"q": "ali"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
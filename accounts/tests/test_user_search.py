@@ -0,0 +1,61 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from accounts.models import User
+
+
+class TestUserSearch(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="viewer", email="viewer@gmail.com", password="user1234"
+        )
+        self.abdallah = User.objects.create_user(
+            username="abdallah", email="abdallah@gmail.com", password="user1234"
+        )
+        self.abdallah_dev = User.objects.create_user(
+            username="abdallah_dev", email="dev@gmail.com", password="user1234"
+        )
+        self.named = User.objects.create_user(
+            username="someone", email="someone@gmail.com", password="user1234"
+        )
+        self.named.profile.name = "Mohamed Salah"
+        self.named.profile.save()
+        self.url = reverse("user-search")
+        self.client.force_authenticate(user=self.user)
+
+    def usernames(self, response):
+        return [user["username"] for user in response.data["results"]]
+
+    def test_search_tolerates_typos(self):
+        response = self.client.get(self.url, {"q": "abdalah"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.usernames(response), ["abdallah", "abdallah_dev"])
+
+    def test_closest_match_comes_first(self):
+        response = self.client.get(self.url, {"q": "abdallah_dev"})
+        self.assertEqual(self.usernames(response)[0], "abdallah_dev")
+
+    def test_search_matches_display_name(self):
+        response = self.client.get(self.url, {"q": "mohamed salh"})
+
+        self.assertEqual(self.usernames(response), ["someone"])
+        self.assertEqual(response.data["results"][0]["name"], "Mohamed Salah")
+
+    def test_inactive_users_are_hidden(self):
+        self.abdallah.is_active = False
+        self.abdallah.save()
+
+        response = self.client.get(self.url, {"q": "abdallah"})
+        self.assertEqual(self.usernames(response), ["abdallah_dev"])
+
+    def test_missing_query(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "missing_query")
+
+    def test_unauthenticated(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {"q": "abdallah"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from accounts.usernames import (
+    USERNAME_BLOOM_KEY,
+    USERNAME_BLOOM_READY_KEY,
+    local_cache,
+    rebuild_bloom,
+    resolve_username,
+    resolve_usernames,
+    username_cache_key,
+)
+
+User = get_user_model()
+
+
+class TestUsernameResolver(APITestCase):
+    def setUp(self):
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
+        self.welcome_patcher.start()
+        self.addCleanup(self.welcome_patcher.stop)
+
+        self.redis = get_redis_connection("default")
+        self.redis.delete(USERNAME_BLOOM_KEY, USERNAME_BLOOM_READY_KEY)
+        self.addCleanup(self.redis.delete, USERNAME_BLOOM_KEY, USERNAME_BLOOM_READY_KEY)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        for name in ("user", "renamed", "newcomer", "nobody"):
+            cache.delete(username_cache_key(name))
+
+    def test_resolved_name_is_served_from_the_local_cache(self):
+        self.assertEqual(resolve_username("user"), self.user.id)
+
+        with self.assertNumQueries(0), patch("accounts.usernames.cache") as shared:
+            self.assertEqual(resolve_username("user"), self.user.id)
+        shared.get_many.assert_not_called()
+
+    def test_misses_are_cached(self):
+        self.assertIsNone(resolve_username("nobody"))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(resolve_username("nobody"))
+
+    def test_bloom_filter_rules_out_unknown_names(self):
+        self.assertEqual(rebuild_bloom(["user"]), 1)
+
+        with self.assertNumQueries(0), patch("accounts.usernames.cache") as shared:
+            self.assertEqual(resolve_usernames(["nobody", "spam1", "spam2"]), {})
+        shared.get_many.assert_not_called()
+
+        self.assertEqual(resolve_usernames(["user"]), {"user": self.user.id})
+
+    def test_new_user_resolves_despite_a_cached_miss(self):
+        rebuild_bloom(["user"])
+        self.assertIsNone(resolve_username("newcomer"))
+
+        newcomer = User.objects.create_user(
+            username="newcomer", email="newcomer@gmail.com", password="user1234"
+        )
+
+        self.assertEqual(resolve_username("newcomer"), newcomer.id)
+
+    def test_rename_moves_the_name(self):
+        self.assertEqual(resolve_username("user"), self.user.id)
+        self.assertIsNone(resolve_username("renamed"))
+
+        self.user.username = "renamed"
+        self.user.save()
+
+        self.assertIsNone(resolve_username("user"))
+        self.assertEqual(resolve_username("renamed"), self.user.id)
+
+    def test_deleted_user_no_longer_resolves(self):
+        self.assertEqual(resolve_username("user"), self.user.id)
+
+        self.user.delete()
+
+        self.assertIsNone(resolve_username("user"))
+
+    def test_unknown_username_is_not_found(self):
+        rebuild_bloom(["user"])
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse("user-posts", kwargs={"username": "nobody"}))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(reverse("follow", kwargs={"username": "nobody"}))
+        self.assertEqual(response.status_code, 404)
@@ -6,6 +6,8 @@ from .views import (
     UserProfileView,
     UserUpdateProfileView,
     UserListView,
+    UserSearchAPIView,
+    UserAutocompleteAPIView,
     UserRetrieveView,
     ChangePasswordView,
     SendPasswordResetEmailView,
@@ -21,6 +23,12 @@ urlpatterns = [
     path("logout/", UserLogoutView.as_view(), name="logout"),
     path("me/", UserProfileView.as_view(), name="profile"),
     path("users/", UserListView.as_view(), name="users-list"),  # Admin
+    path("users/search/", UserSearchAPIView.as_view(), name="user-search"),
+    path(
+        "users/autocomplete/",
+        UserAutocompleteAPIView.as_view(),
+        name="user-autocomplete",
+    ),
     path("users/<str:username>/", UserRetrieveView.as_view(), name="user-detail"),
     path("me/update/", UserUpdateProfileView.as_view(), name="update-profile"),
     path("change-password/", ChangePasswordView.as_view(), name="change-password"),
@@ -0,0 +1,219 @@
+"""
+Username to user id resolution for the hot paths that only need the id: profile
+timelines, follow endpoints and ``@mention`` parsing.
+
+A lookup goes through three layers before PostgreSQL:
+
+- a small in-process LRU of resolved names, valid for a few seconds;
+- a Bloom filter of every username in a Redis bitmap, which rules out names that
+  never existed (random ``@spam``) in one round trip;
+- Redis entries for resolved names and for misses (stored as ``0``).
+
+Whatever is left is resolved with one query. Entries are dropped when a user is
+created, renamed or deleted (see ``accounts.signals.username_cache``). The Bloom
+filter is only consulted once it was built with ``manage.py rebuild_username_bloom``;
+new usernames are added to it as they are saved, names are never removed.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django_redis import get_redis_connection
+
+USERNAME_BLOOM_KEY = "usernames:bloom"
+USERNAME_BLOOM_READY_KEY = "usernames:bloom_ready"
+MISSING = 0  # Cached for names without a user, user ids start at 1.
+
+
+class LocalCache:
+    """
+    Thread-safe LRU of ``username -> user id`` whose entries expire after ``ttl``
+    seconds, since other processes cannot invalidate it.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, username):
+        with self.lock:
+            entry = self.entries.get(username)
+            if entry is None:
+                return None
+            user_id, expires = entry
+            if expires < time.monotonic():
+                del self.entries[username]
+                return None
+            self.entries.move_to_end(username)
+            return user_id
+
+    def set(self, username, user_id):
+        with self.lock:
+            self.entries[username] = (user_id, time.monotonic() + self.ttl)
+            self.entries.move_to_end(username)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, username):
+        with self.lock:
+            self.entries.pop(username, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalCache(
+    settings.USERNAME_LOCAL_CACHE_SIZE, settings.USERNAME_LOCAL_CACHE_TTL
+)
+
+
+def username_cache_key(username):
+    return f"username_id:{username}"
+
+
+def bloom_positions(username):
+    """
+    The bits of ``username`` in the filter, from two halves of one hash (double
+    hashing).
+    """
+    digest = hashlib.blake2b(username.encode(), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "big")
+    second = int.from_bytes(digest[8:], "big") | 1
+    bits = settings.USERNAME_BLOOM_BITS
+    return [(first + i * second) % bits for i in range(settings.USERNAME_BLOOM_HASHES)]
+
+
+def _bloom_add(pipe, username):
+    for position in bloom_positions(username):
+        pipe.setbit(USERNAME_BLOOM_KEY, position, 1)
+
+
+def _bloom_filter(conn, usernames):
+    """
+    The usernames the Bloom filter cannot rule out (all of them until it is built).
+    """
+    pipe = conn.pipeline(transaction=False)
+    pipe.exists(USERNAME_BLOOM_READY_KEY)
+    for username in usernames:
+        for position in bloom_positions(username):
+            pipe.getbit(USERNAME_BLOOM_KEY, position)
+    ready, *bits = pipe.execute()
+    if not ready:
+        return usernames
+
+    hashes = settings.USERNAME_BLOOM_HASHES
+    return [
+        username
+        for index, username in enumerate(usernames)
+        if all(bits[index * hashes : (index + 1) * hashes])
+    ]
+
+
+def rebuild_bloom(usernames):
+    """
+    Add every existing username to the Bloom filter and start consulting it.
+
+    The filter is filled in place, so names saved while it is rebuilt are not lost.
+    """
+    conn = get_redis_connection("default")
+    count = 0
+    pipe = conn.pipeline(transaction=False)
+    for username in usernames:
+        _bloom_add(pipe, username)
+        count += 1
+        if count % settings.USERNAME_BLOOM_REBUILD_BATCH_SIZE == 0:
+            pipe.execute()
+    pipe.set(USERNAME_BLOOM_READY_KEY, 1)
+    pipe.execute()
+
+    return count
+
+
+def remember_username(username):
+    """
+    A user now has ``username``: add it to the filter and drop a cached miss.
+    """
+    local_cache.delete(username)
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    _bloom_add(pipe, username)
+    pipe.execute()
+    cache.delete(username_cache_key(username))
+
+
+def forget_username(username):
+    """
+    No user has ``username`` any more (renamed or deleted).
+    """
+    local_cache.delete(username)
+    cache.delete(username_cache_key(username))
+
+
+def resolve_usernames(usernames):
+    """
+    ``{username: user id}`` for the given usernames that exist (matched exactly,
+    like ``username__in``).
+    """
+    resolved = {}
+    pending = []
+    for username in set(usernames):
+        user_id = local_cache.get(username)
+        if user_id is not None:
+            resolved[username] = user_id
+        else:
+            pending.append(username)
+    if not pending:
+        return resolved
+
+    pending = _bloom_filter(get_redis_connection("default"), pending)
+    if not pending:
+        return resolved
+
+    keys = {username_cache_key(username): username for username in pending}
+    cached = {keys[key]: user_id for key, user_id in cache.get_many(list(keys)).items()}
+    missing = [username for username in pending if username not in cached]
+    if missing:
+        found = dict(
+            get_user_model()
+            .objects.filter(username__in=missing)
+            .values_list("username", "id")
+        )
+        cache.set_many(
+            {username_cache_key(name): user_id for name, user_id in found.items()},
+            timeout=settings.USERNAME_CACHE_TTL,
+        )
+        cache.set_many(
+            {
+                username_cache_key(name): MISSING
+                for name in missing
+                if name not in found
+            },
+            timeout=settings.USERNAME_NEGATIVE_CACHE_TTL,
+        )
+        cached.update(found)
+
+    for username, user_id in cached.items():
+        if user_id != MISSING:
+            local_cache.set(username, user_id)
+            resolved[username] = user_id
+
+    return resolved
+
+
+def resolve_username(username):
+    return resolve_usernames([username]).get(username)
+
+
+def get_user_id_or_404(username):
+    user_id = resolve_username(username)
+    if user_id is None:
+        raise Http404("No User matches the given query.")
+    return user_id
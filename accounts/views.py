@@ -7,8 +7,9 @@ from django.urls import reverse
 from django.core.cache import cache
 from .models import User
 from .tasks import send_email_task
-from rest_framework import status, filters
+from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from interactions.utils import create_notification
 from .serializers import (
     UserRegistrationSerializer,
@@ -18,6 +19,7 @@ from .serializers import (
     UserUpdateProfileSerializer,
     UserSerializer,
     ListUserSerializer,
+    UserSearchSerializer,
     ChangePasswordSerializer,
     SendPasswordRestEmailSerializer,
     UserPasswordResetSerializer,
@@ -25,8 +27,11 @@ from .serializers import (
     PasswordCheckSerializer,
 )
 from .permissions import IsActiveUser
+from .search import search_users, UserSearchFilter
+from .autocomplete import autocomplete
 from config.throttles import AuthRateThrottle, AccountSensitiveRateThrottle
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from rest_framework.views import APIView
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -176,13 +181,56 @@ class UserPasswordResetView(APIView):
 class UserListView(generics.ListAPIView):
     serializer_class = ListUserSerializer
     permission_classes = [IsAdminUser]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["username", "profile__name"]
+    filter_backends = [UserSearchFilter]
 
     def get_queryset(self):
         return User.objects.all().exclude(pk=self.request.user.pk)
 
 
+class UserSearchAPIView(generics.ListAPIView):
+    """
+    Search active users by username or display name (``?q=``), typo-tolerant and
+    ranked by trigram similarity.
+    """
+
+    serializer_class = UserSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        term = self.request.query_params.get("q", "").strip()
+        if not term:
+            raise ValidationError(
+                {"error": "missing_query", "detail": "The q parameter is required."}
+            )
+
+        return search_users(
+            User.objects.filter(is_active=True).select_related("profile"), term
+        )
+
+
+class UserAutocompleteAPIView(APIView):
+    """
+    Username and display name suggestions for a prefix (``?q=``, a leading ``@`` is
+    ignored), answered from the Redis autocomplete index without a database query.
+    """
+
+    # Trust the token's user id instead of loading the user on every keystroke.
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # The token carries the id as a string.
+        viewer_id = int(request.user.id)
+        suggestions = autocomplete(request.query_params.get("q", ""), viewer_id)
+        for suggestion in suggestions:
+            if suggestion["profile_image"]:
+                suggestion["profile_image"] = request.build_absolute_uri(
+                    suggestion["profile_image"]
+                )
+
+        return Response({"results": suggestions}, status=status.HTTP_200_OK)
+
+
 class UserRetrieveView(generics.RetrieveAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -0,0 +1,48 @@
+"""
+Request-scoped identity map.
+
+A view, its permissions and its serializers often need the same row (the tweet
+behind ``/tweets/<pk>/likes/`` is read by ``IsTweetAuthor``, the serializer context
+and ``perform_create``). ``get_instance_or_404`` loads it once per request and
+hands the same instance to every later caller. The map lives on the underlying
+``HttpRequest``, so it is dropped with the request and never shared across users.
+"""
+
+from django.shortcuts import get_object_or_404
+
+
+def _http_request(request):
+    # DRF wraps the Django request; middleware only sees the wrapped one.
+    return getattr(request, "_request", request)
+
+
+def _identity_map(request):
+    http_request = _http_request(request)
+    if not hasattr(http_request, "identity_map"):
+        http_request.identity_map = {}
+        http_request.identity_map_hits = 0
+    return http_request
+
+
+def get_instance_or_404(request, queryset, pk):
+    """
+    The row of ``queryset`` (or of a model) with primary key ``pk``, loaded at most
+    once per request. The first caller's queryset decides what is preloaded.
+    """
+    http_request = _identity_map(request)
+    model = getattr(queryset, "model", queryset)
+    key = (model._meta.label, str(pk))
+    instance = http_request.identity_map.get(key)
+    if instance is None:
+        instance = get_object_or_404(queryset, pk=pk)
+        http_request.identity_map[key] = instance
+    else:
+        http_request.identity_map_hits += 1
+    return instance
+
+
+def identity_map_hits(request):
+    """
+    How many lookups of ``request`` were answered without a query.
+    """
+    return getattr(_http_request(request), "identity_map_hits", 0)
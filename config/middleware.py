@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .identity_map import identity_map_hits
+
+
+class QueryCountMiddleware:
+    """
+    Per-request query report: ``X-Query-Count`` is the number of queries the
+    request ran, ``X-Identity-Map-Hits`` the number of lookups the identity map
+    answered without one. Enabled by ``QUERY_COUNT_REPORT``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_COUNT_REPORT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+
+        response["X-Query-Count"] = str(queries)
+        response["X-Identity-Map-Hits"] = str(identity_map_hits(request))
+        return response
@@ -0,0 +1,126 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Opaque ``(created_at, id)`` cursor pagination that never runs a COUNT(*) or an OFFSET scan.
+
+    Plain querysets are ordered by ``-created_at, -id`` and filtered past the cursor.
+    Merged streams (see ``tweets.feed.PostStream``) provide their own ``seek()`` and
+    ``position()`` so the cursor can also carry the row kind to break ties between tables.
+
+    Requests carrying the ``page`` query parameter keep the page-number behaviour.
+    """
+
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.page_query_param not in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+
+        if hasattr(queryset, "seek"):
+            stream = queryset
+        else:
+            stream = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            stream = self.seek(stream, position)
+
+        items = list(stream[: page_size + 1])
+        self.has_next = len(items) > page_size
+        items = items[:page_size]
+
+        self.next_position = None
+        if self.has_next and items:
+            self.next_position = self.get_position(stream, items[-1])
+
+        return items
+
+    def seek(self, queryset, position):
+        created_at, kind, pk = position
+        if hasattr(queryset, "seek"):
+            return queryset.seek(created_at, kind, pk)
+
+        return queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+
+    def get_position(self, queryset, item):
+        if hasattr(queryset, "position"):
+            return queryset.position(item)
+
+        return item.created_at, "", item.pk
+
+    def encode_cursor(self, position):
+        created_at, kind, pk = position
+        raw = f"{created_at.isoformat()}|{kind}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            created_at, kind, pk = raw.split("|")
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return created_at, kind, pk
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+
+        if self.next_position is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
@@ -60,6 +60,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.middleware.QueryCountMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -160,6 +161,7 @@ REST_FRAMEWORK = {
         'auth': '5/minute',                # Register, login, and password-reset protection.
         'content_creation': '10/minute',   # Creating tweets (anti-spam).
         'interaction': '30/minute',        # Like, retweet, and follow interactions.
+        'interaction_batch': '10/minute',  # Batched interactions synced by clients.
         'account_sensitive': '5/hour',     # Sensitive account actions (e.g. change password).
     }
 }
@@ -199,6 +201,83 @@ CACHES = {
 }
 
 
+# Timelines
+
+TIMELINE_MAX_LENGTH = 800  # Newest posts kept per materialized home timeline.
+TIMELINE_TTL = 60 * 60 * 24 * 7  # Timelines of inactive users expire after a week.
+TIMELINE_FANOUT_BATCH_SIZE = 1000  # Followers updated per Redis pipeline.
+TIMELINE_CELEBRITY_THRESHOLD = 10000  # Authors above this are pulled at read time.
+TIMELINE_CELEBRITY_REFRESH_INTERVAL = 60 * 10  # Periodic recount of the celebrity set.
+
+
+# Engagement counters
+
+TWEET_COUNTERS_WRITE_BEHIND = True  # Buffer like/comment/retweet deltas in Redis.
+TWEET_COUNTERS_FLUSH_INTERVAL = 10  # Seconds between flushes to PostgreSQL.
+TWEET_COUNTERS_FLUSH_BATCH_SIZE = 1000  # Tweets updated per batched UPDATE.
+TWEET_COUNTERS_FLUSH_LOCK_TTL = 60  # Guards against overlapping flushes.
+
+
+# Viewer state
+
+VIEWER_STATE_TTL = 60 * 30  # Lifetime of a viewer's liked/retweeted/bookmarked sets.
+VIEWER_STATE_MAX_SET_SIZE = 5000  # Larger relations are always read from the database.
+
+
+# Interaction batches
+
+INTERACTION_BATCH_MAX_SIZE = 100  # Operations accepted per batch request.
+
+
+# Post payload cache
+
+POST_CACHE_TTL = 60 * 10  # Lifetime of a rendered tweet/retweet shared by all pages.
+
+
+# Comment threads
+
+COMMENT_TREE_MAX_DEPTH = 5  # Reply levels rendered below a comment.
+COMMENT_TREE_PAGE_SIZE = 10  # Replies rendered per comment and level.
+COMMENT_REPLY_PREVIEW_SIZE = 3  # Replies previewed under each comment of a list.
+COMMENT_SECTION_CACHE_TTL = 60 * 5  # Lifetime of a tweet's first page of comments.
+
+
+# Notifications
+
+NOTIFICATION_GROUP_WINDOW = 60 * 60 * 24  # Likes/retweets/follows rolled up per day.
+NOTIFICATION_GROUP_RECENT_ACTORS = 3  # Latest actors kept on a grouped notification.
+NOTIFICATION_UNREAD_RECONCILE_INTERVAL = 60 * 15  # Resync unread counters with the DB.
+NOTIFICATION_DELIVERY_DELAY = 1  # Seconds queued events gather before a delivery run.
+NOTIFICATION_DELIVERY_BATCH_SIZE = 500  # Queued events written per transaction.
+NOTIFICATION_DELIVERY_LOCK_TTL = 60  # Renewed by a delivery run before each batch.
+NOTIFICATION_DELIVERY_MAX_BATCHES = 20  # Batches per run before rescheduling.
+NOTIFICATION_DELIVERY_INTERVAL = 30  # Periodic run picking up events left queued.
+
+
+# Autocomplete
+
+AUTOCOMPLETE_LIMIT = 8  # Suggestions returned per keystroke.
+AUTOCOMPLETE_CANDIDATES = 100  # Index entries ranked per lookup.
+AUTOCOMPLETE_FOLLOWING_TTL = 60 * 30  # Lifetime of a viewer's mirrored following set.
+AUTOCOMPLETE_FOLLOWING_MAX_SET_SIZE = 5000  # Larger follow lists are not ranked.
+AUTOCOMPLETE_REBUILD_BATCH_SIZE = 1000  # Users written per Redis pipeline on rebuild.
+
+
+# Username resolution
+
+USERNAME_CACHE_TTL = 60 * 60  # Lifetime of a cached username -> user id entry.
+USERNAME_NEGATIVE_CACHE_TTL = 60 * 5  # Lifetime of a cached unknown username.
+USERNAME_LOCAL_CACHE_SIZE = 10000  # Names kept in each process's LRU.
+USERNAME_LOCAL_CACHE_TTL = 30  # Seconds a process trusts its own entries.
+USERNAME_BLOOM_BITS = 2**24  # 2 MB filter, ~1% false positives at 1.7M users.
+USERNAME_BLOOM_HASHES = 7  # Bits set per username.
+USERNAME_BLOOM_REBUILD_BATCH_SIZE = 1000  # Usernames written per Redis pipeline.
+
+
+# Query report
+
+QUERY_COUNT_REPORT = DEBUG  # X-Query-Count / X-Identity-Map-Hits response headers.
+
 # Celery
 
 CELERY_BROKER_URL = 'redis://localhost:6379/3'
@@ -207,4 +286,23 @@ CELERY_RESULT_BACKEND = 'redis://localhost:6379/3'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
-CELERY_TIMEZONE = 'Africa/Cairo' 
\ No newline at end of file
+CELERY_TIMEZONE = 'Africa/Cairo' 
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-tweet-counters': {
+        'task': 'tweets.tasks.flush_counter_deltas_task',
+        'schedule': TWEET_COUNTERS_FLUSH_INTERVAL,
+    },
+    'deliver-notifications': {
+        'task': 'interactions.tasks.deliver_notifications_task',
+        'schedule': NOTIFICATION_DELIVERY_INTERVAL,
+    },
+    'reconcile-unread-notifications': {
+        'task': 'interactions.tasks.reconcile_unread_counts_task',
+        'schedule': NOTIFICATION_UNREAD_RECONCILE_INTERVAL,
+    },
+    'refresh-timeline-celebrities': {
+        'task': 'tweets.tasks.refresh_celebrities_task',
+        'schedule': TIMELINE_CELEBRITY_REFRESH_INTERVAL,
+    },
+}
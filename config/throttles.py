@@ -28,6 +28,11 @@ class InteractionRateThrottle(UserOrIPRateThrottle):
     scope = "interaction"
 
 
+class InteractionBatchRateThrottle(UserOrIPRateThrottle):
+    # Batches carry many interactions each, so they get their own, tighter budget.
+    scope = "interaction_batch"
+
+
 class AccountSensitiveRateThrottle(UserOrIPRateThrottle):
     # Apply stricter limits to sensitive account actions such as changing password.
     scope = "account_sensitive"
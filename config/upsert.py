@@ -0,0 +1,181 @@
+"""
+Idempotent writes for rows keyed by a unique constraint (likes, retweets,
+bookmarks, follows).
+
+``insert_or_get`` writes the row or reads the one already there in a single
+statement::
+
+    WITH inserted AS (
+        INSERT INTO <table> (...) VALUES (...)
+        ON CONFLICT (<unique columns>) DO NOTHING
+        RETURNING <columns>
+    )
+    SELECT <columns>, TRUE FROM inserted
+    UNION ALL
+    SELECT <columns>, FALSE FROM <table>
+    WHERE <unique columns match> AND NOT EXISTS (SELECT 1 FROM inserted)
+
+so there is no ``exists()`` check before the insert, no ``IntegrityError`` to
+recover from and no re-fetch afterwards. ``insert_many`` and ``delete_returning``
+are the multi-row writes of batch endpoints: they report which rows they actually
+inserted or deleted and leave the side effects to the caller.
+"""
+
+from django.db import connections, router
+from django.db.models.signals import post_save
+
+
+def _writable_fields(meta):
+    return [field for field in meta.concrete_fields if field is not meta.pk]
+
+
+def _column_list(connection, fields):
+    return ", ".join(connection.ops.quote_name(field.column) for field in fields)
+
+
+def _insert_params(connection, instance, fields):
+    return [
+        field.get_db_prep_save(field.pre_save(instance, True), connection)
+        for field in fields
+    ]
+
+
+def _load(instance, fields, row, using):
+    for field, value in zip(fields, row):
+        setattr(instance, field.attname, value)
+    instance._state.adding = False
+    instance._state.db = using
+    return instance
+
+
+def insert_or_get(model, unique_fields, **values):
+    """
+    Insert a ``model`` built from ``values``, or return the row it conflicts with on
+    ``unique_fields``. Returns ``(instance, created)``.
+
+    ``post_save`` is sent for a new row as ``Model.objects.create`` would, so the
+    counters, notifications and viewer state receivers keep working; nothing is sent
+    when the row already existed.
+    """
+    instance = model(**values)
+    meta = model._meta
+    using = router.db_for_write(model, instance=instance)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+
+    fields = _writable_fields(meta)
+    returned = [meta.pk, *fields]
+    key_fields = [meta.get_field(name) for name in unique_fields]
+
+    table = quote(meta.db_table)
+    columns = _column_list(connection, returned)
+    key_match = " AND ".join(f"{quote(field.column)} = %s" for field in key_fields)
+    sql = (
+        f"WITH inserted AS ("
+        f"INSERT INTO {table} ({_column_list(connection, fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))}) "
+        f"ON CONFLICT ({_column_list(connection, key_fields)}) DO NOTHING "
+        f"RETURNING {columns}) "
+        f"SELECT {columns}, TRUE FROM inserted "
+        f"UNION ALL "
+        f"SELECT {columns}, FALSE FROM {table} "
+        f"WHERE {key_match} AND NOT EXISTS (SELECT 1 FROM inserted)"
+    )
+    params = _insert_params(connection, instance, fields) + [
+        field.get_db_prep_save(getattr(instance, field.attname), connection)
+        for field in key_fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if row is None:
+        # The conflicting row was committed after this statement took its
+        # snapshot; it is visible to the next one.
+        lookup = {
+            field.attname: getattr(instance, field.attname) for field in key_fields
+        }
+        return model._default_manager.using(using).get(**lookup), False
+
+    *row, created = row
+    _load(instance, returned, row, using)
+
+    if created:
+        post_save.send(
+            sender=model,
+            instance=instance,
+            created=True,
+            update_fields=None,
+            raw=False,
+            using=using,
+        )
+    return instance, created
+
+
+def insert_many(model, unique_fields, instances):
+    """
+    Insert ``instances`` with one ``INSERT ... ON CONFLICT DO NOTHING RETURNING``
+    and return the ones that were actually inserted, with their primary keys set.
+
+    No signals are sent: callers apply the side effects for the returned rows.
+    """
+    if not instances:
+        return []
+
+    meta = model._meta
+    using = router.db_for_write(model)
+    connection = connections[using]
+
+    fields = _writable_fields(meta)
+    returned = [meta.pk, *fields]
+    placeholders = f"({', '.join(['%s'] * len(fields))})"
+    key_fields = [meta.get_field(name) for name in unique_fields]
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(meta.db_table)} "
+        f"({_column_list(connection, fields)}) "
+        f"VALUES {', '.join([placeholders] * len(instances))} "
+        f"ON CONFLICT ({_column_list(connection, key_fields)}) DO NOTHING "
+        f"RETURNING {_column_list(connection, returned)}"
+    )
+    params = [
+        param
+        for instance in instances
+        for param in _insert_params(connection, instance, fields)
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [_load(model(), returned, row, using) for row in rows]
+
+
+def delete_returning(queryset):
+    """
+    Delete the rows of ``queryset`` with one ``DELETE ... RETURNING`` and return
+    them as instances.
+
+    Unlike ``QuerySet.delete()`` this neither collects cascades nor sends signals,
+    so it is only meant for rows nothing else points to; callers apply the side
+    effects for the returned rows.
+    """
+    model = queryset.model
+    meta = model._meta
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+
+    returned = meta.concrete_fields
+    subquery, params = queryset.values("pk").query.sql_with_params()
+    sql = (
+        f"DELETE FROM {quote(meta.db_table)} "
+        f"WHERE {quote(meta.pk.column)} IN ({subquery}) "
+        f"RETURNING {_column_list(connection, returned)}"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [_load(model(), returned, row, using) for row in rows]
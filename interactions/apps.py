@@ -4,6 +4,3 @@ from django.apps import AppConfig
 class InteractionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "interactions"
-
-    def ready(self):
-        import interactions.signals
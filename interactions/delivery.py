@@ -0,0 +1,442 @@
+"""
+Notifications for likes, comments, retweets and follows are delivered off the
+request path: the signal receivers only queue an event once the transaction
+commits, and a Celery worker drains the queue in batches.
+
+Events are appended to a Redis list. Each batch is written with one lookup of the
+rows it touches, one ``bulk_create(..., ignore_conflicts=True)`` for the new rows
+and one UPDATE for the rows that become unread again, instead of a ``get_or_create``
+savepoint per event. A single worker drains at a time (guarded by a lock), so
+aggregated rows are not contended.
+
+A run claims each batch atomically, moving it from the queue to a processing list
+of its own while renewing the lock, and drops that list once the batch committed.
+A run that lost its lock cannot claim anything more, and the processing lists of
+runs that died are put back on the queue by the next one, making delivery
+at-least-once. Events that cannot be written are moved to a dead-letter list
+instead of blocking the queue, and a run stops after
+``NOTIFICATION_DELIVERY_MAX_BATCHES`` batches and schedules the next one.
+"""
+
+import json
+import logging
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .models import Notification
+from .unread import adjust_unread_counts, is_unread
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_QUEUE_KEY = "notifications:queue"
+NOTIFICATION_DEAD_LETTER_KEY = "notifications:dead_letter"
+DELIVERY_SCHEDULED_KEY = "notifications:delivery_scheduled"
+DELIVERY_LOCK_KEY = "notifications:delivery_lock"
+# Runs with a claimed batch in flight, each one's in ``processing_key(run)``.
+DELIVERY_RUNS_KEY = "notifications:processing"
+
+
+def processing_key(run):
+    return f"notifications:processing:{run}"
+
+
+# KEYS: lock, queue, processing list, runs. ARGV: run, batch size, lock ttl.
+# Moves the head of the queue to the processing list if the lock is still held by
+# the run, renewing it. Returns the events claimed, or nothing once the lock is lost.
+CLAIM_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return false
+end
+redis.call('expire', KEYS[1], ARGV[3])
+local events = redis.call('lrange', KEYS[2], 0, tonumber(ARGV[2]) - 1)
+if #events > 0 then
+    redis.call('ltrim', KEYS[2], #events, -1)
+    redis.call('rpush', KEYS[3], unpack(events))
+    redis.call('sadd', KEYS[4], ARGV[1])
+end
+return events
+"""
+
+# KEYS: queue, processing list, runs. ARGV: run.
+# Puts the events a run had claimed back at the head of the queue, in order.
+REQUEUE_SCRIPT = """
+local events = redis.call('lrange', KEYS[2], 0, -1)
+for i = #events, 1, -1 do
+    redis.call('lpush', KEYS[1], events[i])
+end
+redis.call('del', KEYS[2])
+redis.call('srem', KEYS[3], ARGV[1])
+return #events
+"""
+
+# KEYS: lock. ARGV: run.
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# Verbs rolled up into one notification per target and time bucket, mapped to the
+# object they are grouped on (None: everything the receiver got with that verb).
+GROUPED_VERBS = {
+    "liked": lambda target: target,
+    "retweeted": lambda target: target.tweet,
+    "followed": lambda target: None,
+}
+
+
+def notification_group_key(verb, target, now=None):
+    """
+    ``"<verb>:<model>:<id>:<bucket>"``, shared by the events rolled up together.
+    """
+    now = now or timezone.now()
+    bucket = int(now.timestamp() // settings.NOTIFICATION_GROUP_WINDOW)
+    group = GROUPED_VERBS[verb](target)
+    scope = f"{group._meta.model_name}:{group.pk}" if group is not None else "all"
+
+    return f"{verb}:{scope}:{bucket}"
+
+
+GROUP_UPDATE_FIELDS = [
+    "actors_count",
+    "actor_ids",
+    "recent_actor_ids",
+    "sender",
+    "content_type",
+    "content_id",
+    "is_read",
+    "created_at",
+]
+
+
+def merge_group_actor(notification, sender_id, content_type_id, content_id):
+    """
+    Count ``sender_id`` in a group notification in memory, unless it already was,
+    making it the latest actor and the group unread again.
+    """
+    if sender_id not in notification.actor_ids:
+        notification.actor_ids = notification.actor_ids + [sender_id]
+        notification.actors_count += 1
+
+    recent = notification.recent_actor_ids
+    limit = settings.NOTIFICATION_GROUP_RECENT_ACTORS
+    notification.recent_actor_ids = [sender_id] + [
+        actor_id for actor_id in recent if actor_id != sender_id
+    ][: limit - 1]
+    notification.sender_id = sender_id
+    notification.content_type_id = content_type_id
+    notification.content_id = content_id
+    notification.is_read = False
+    notification.created_at = timezone.now()  # Latest activity, moves it to the top.
+
+
+def queue_notification(sender_id, receiver_id, verb, target):
+    """
+    Queue a notification about ``target`` for delivery after the current
+    transaction commits. A no-op when the sender and receiver are the same user.
+    """
+    queue_notifications([(sender_id, receiver_id, verb, target)])
+
+
+def queue_notifications(notifications):
+    """
+    ``queue_notification`` for many ``(sender_id, receiver_id, verb, target)``
+    tuples, pushed to the queue at once.
+    """
+    events = [
+        {
+            "sender_id": sender_id,
+            "receiver_id": receiver_id,
+            "verb": verb,
+            "content_type_id": ContentType.objects.get_for_model(target).id,
+            "content_id": target.id,
+            # Bucketed on the time of the event, not of its delivery.
+            "group_key": (
+                notification_group_key(verb, target) if verb in GROUPED_VERBS else None
+            ),
+        }
+        for sender_id, receiver_id, verb, target in notifications
+        if receiver_id is not None and sender_id != receiver_id
+    ]
+    if events:
+        transaction.on_commit(lambda: _enqueue(events))
+
+
+def _enqueue(events):
+    get_redis_connection("default").rpush(
+        NOTIFICATION_QUEUE_KEY, *[json.dumps(event) for event in events]
+    )
+    schedule_delivery()
+
+
+def schedule_delivery():
+    from .tasks import deliver_notifications_task
+
+    delay = settings.NOTIFICATION_DELIVERY_DELAY
+    if cache.add(DELIVERY_SCHEDULED_KEY, 1, timeout=delay + 60):
+        # The delay lets events of a burst accumulate into one batch.
+        deliver_notifications_task.apply_async(countdown=delay)
+
+
+def deliver_pending_notifications(batch_size=None):
+    """
+    Write the queued events, ``batch_size`` per batch, until the queue is empty or
+    ``NOTIFICATION_DELIVERY_MAX_BATCHES`` batches were written. Returns the number
+    of events delivered.
+
+    Events queued while the lock is held by another run are left to it (or to the
+    periodic run, if that one already finished).
+    """
+    batch_size = batch_size or settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+    conn = get_redis_connection("default")
+    run = uuid.uuid4().hex
+
+    cache.delete(DELIVERY_SCHEDULED_KEY)
+    if not conn.set(
+        DELIVERY_LOCK_KEY, run, nx=True, ex=settings.NOTIFICATION_DELIVERY_LOCK_TTL
+    ):
+        return 0
+
+    delivered = 0
+    try:
+        _requeue_abandoned(conn)
+
+        for _ in range(settings.NOTIFICATION_DELIVERY_MAX_BATCHES):
+            raw_events = conn.eval(
+                CLAIM_SCRIPT,
+                4,
+                DELIVERY_LOCK_KEY,
+                NOTIFICATION_QUEUE_KEY,
+                processing_key(run),
+                DELIVERY_RUNS_KEY,
+                run,
+                batch_size,
+                settings.NOTIFICATION_DELIVERY_LOCK_TTL,
+            )
+            if not raw_events:
+                # Drained, or the lock expired and another run took over.
+                break
+
+            delivered += _deliver_claimed(conn, raw_events)
+            pipe = conn.pipeline()
+            pipe.delete(processing_key(run))
+            pipe.srem(DELIVERY_RUNS_KEY, run)
+            pipe.execute()
+    finally:
+        conn.eval(RELEASE_SCRIPT, 1, DELIVERY_LOCK_KEY, run)
+
+    if conn.llen(NOTIFICATION_QUEUE_KEY):
+        # A bounded run leaves the rest of a backlog to the next one.
+        schedule_delivery()
+    return delivered
+
+
+def _requeue_abandoned(conn):
+    """
+    Put back the batches claimed by runs that stopped before finishing them. Only
+    called with the lock held, so those runs no longer own it.
+    """
+    for run in conn.smembers(DELIVERY_RUNS_KEY):
+        run = run.decode()
+        conn.eval(
+            REQUEUE_SCRIPT,
+            3,
+            NOTIFICATION_QUEUE_KEY,
+            processing_key(run),
+            DELIVERY_RUNS_KEY,
+            run,
+        )
+
+
+def _deliver_claimed(conn, raw_events):
+    """
+    Deliver a claimed batch. When it fails, its events are retried one by one and
+    the ones that still fail go to the dead-letter list. Returns the number of
+    events delivered.
+    """
+    try:
+        deliver_batch([json.loads(event) for event in raw_events])
+        return len(raw_events)
+    except Exception:
+        logger.exception("Notification delivery: batch failed, retrying per event")
+
+    delivered = 0
+    for raw_event in raw_events:
+        try:
+            deliver_batch([json.loads(raw_event)])
+            delivered += 1
+        except Exception:
+            logger.exception("Notification delivery: dead-lettering %s", raw_event)
+            conn.rpush(NOTIFICATION_DEAD_LETTER_KEY, raw_event)
+    return delivered
+
+
+def deliver_batch(events):
+    """
+    Write a batch of queued events in one transaction.
+    """
+    # Drop events whose users were deleted while they were queued.
+    user_ids = {event["sender_id"] for event in events} | {
+        event["receiver_id"] for event in events
+    }
+    read_through = dict(
+        get_user_model()
+        .objects.filter(id__in=user_ids)
+        .values_list("id", "notifications_read_through")
+    )
+    events = [
+        event
+        for event in events
+        if event["sender_id"] in read_through and event["receiver_id"] in read_through
+    ]
+
+    unread = Counter()
+    with transaction.atomic():
+        _deliver_events(
+            [event for event in events if not event["group_key"]], read_through, unread
+        )
+        _deliver_groups(
+            [event for event in events if event["group_key"]], read_through, unread
+        )
+        adjust_unread_counts(unread)
+
+
+EVENT_FIELDS = ("sender", "receiver", "verb", "content_type", "content_id")
+
+
+def _event_key(event):
+    return (
+        event["sender_id"],
+        event["receiver_id"],
+        event["verb"],
+        event["content_type_id"],
+        event["content_id"],
+    )
+
+
+def _deliver_events(events, read_through, unread):
+    """
+    One notification per sender, receiver, verb and target; repeated events make
+    an existing one unread again.
+
+    ``read_through`` maps the receivers to their read watermark, ``unread`` collects
+    the change to their unread counts.
+    """
+    keys = {_event_key(event) for event in events}
+    if not keys:
+        return
+
+    lookup = Q()
+    for sender_id, receiver_id, verb, content_type_id, content_id in keys:
+        lookup |= Q(
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            verb=verb,
+            content_type_id=content_type_id,
+            content_id=content_id,
+        )
+    existing = {
+        (
+            notification.sender_id,
+            notification.receiver_id,
+            notification.verb,
+            notification.content_type_id,
+            notification.content_id,
+        ): notification
+        for notification in Notification.objects.filter(lookup, group_key=None).only(
+            *EVENT_FIELDS, "is_read", "created_at"
+        )
+    }
+
+    new = [key for key in keys if key not in existing]
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                sender_id=sender_id,
+                receiver_id=receiver_id,
+                verb=verb,
+                content_type_id=content_type_id,
+                content_id=content_id,
+            )
+            for sender_id, receiver_id, verb, content_type_id, content_id in new
+        ],
+        ignore_conflicts=True,
+    )
+
+    reread = [
+        notification
+        for notification in existing.values()
+        if not is_unread(notification, read_through[notification.receiver_id])
+    ]
+    if reread:
+        # Moved above the read watermark, like new activity on a group.
+        Notification.objects.filter(pk__in=[n.pk for n in reread]).update(
+            is_read=False, created_at=timezone.now()
+        )
+
+    for _, receiver_id, *_ in new:
+        unread[receiver_id] += 1
+    for notification in reread:
+        unread[notification.receiver_id] += 1
+
+
+def _deliver_groups(events, read_through, unread):
+    """
+    Merge the events of each (receiver, group key) into its aggregated row.
+    """
+    groups = {}
+    for event in events:
+        groups.setdefault((event["receiver_id"], event["group_key"]), []).append(event)
+    if not groups:
+        return
+
+    lookup = Q()
+    for receiver_id, group_key in groups:
+        lookup |= Q(receiver_id=receiver_id, group_key=group_key)
+    existing = {
+        (notification.receiver_id, notification.group_key): notification
+        for notification in Notification.objects.select_for_update().filter(lookup)
+    }
+
+    created = []
+    updated = []
+    for (receiver_id, group_key), group_events in groups.items():
+        notification = existing.get((receiver_id, group_key))
+        if notification is None:
+            notification = Notification(
+                receiver_id=receiver_id,
+                group_key=group_key,
+                verb=group_events[0]["verb"],
+                actors_count=0,
+                recent_actor_ids=[],
+                actor_ids=[],
+            )
+            created.append(notification)
+            unread[receiver_id] += 1
+        else:
+            if not is_unread(notification, read_through[receiver_id]):
+                unread[receiver_id] += 1
+            updated.append(notification)
+
+        for event in group_events:
+            merge_group_actor(
+                notification,
+                event["sender_id"],
+                event["content_type_id"],
+                event["content_id"],
+            )
+
+    Notification.objects.bulk_create(created, ignore_conflicts=True)
+    if updated:
+        Notification.objects.bulk_update(updated, GROUP_UPDATE_FIELDS)
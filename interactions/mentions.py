@@ -0,0 +1,92 @@
+"""
+One mention pipeline for tweets, comments and quote retweets.
+
+Saving a post only queues its text once the transaction commits; a Celery task
+extracts the ``@usernames``, resolves them through the cached username map, inserts
+every mention with one ``bulk_create`` and delivers the "mentioned" notifications
+as one batch (see ``interactions.delivery``). The number of queries does not depend
+on how many users a post mentions.
+"""
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from accounts.usernames import resolve_usernames
+
+from .delivery import deliver_batch
+from .models import Mention
+
+MENTION_PATTERN = re.compile(r"@(\w+)")
+
+
+def extract_usernames(text):
+    return set(MENTION_PATTERN.findall(text or ""))
+
+
+def queue_mentions(actor_id, target, text):
+    """
+    Record the mentions in ``text``, posted by ``actor_id`` on ``target``, after the
+    current transaction commits.
+    """
+    if not extract_usernames(text):
+        return
+
+    from .tasks import create_mentions_task
+
+    content_type_id = ContentType.objects.get_for_model(target).id
+    content_id = target.id
+    transaction.on_commit(
+        lambda: create_mentions_task.delay(actor_id, content_type_id, content_id, text)
+    )
+
+
+def create_mentions(actor_id, content_type_id, content_id, text):
+    """
+    Insert the mentions in ``text`` and notify the mentioned users. Users who no
+    longer exist and the author are skipped. Returns the number of users mentioned.
+    """
+    user_ids = set(resolve_usernames(extract_usernames(text)).values())
+    user_ids.discard(actor_id)
+    if not user_ids:
+        return 0
+
+    existing = set(
+        get_user_model()
+        .objects.filter(id__in=user_ids | {actor_id})
+        .values_list("id", flat=True)
+    )
+    if actor_id not in existing:
+        return 0
+    user_ids &= existing
+
+    with transaction.atomic():
+        Mention.objects.bulk_create(
+            [
+                Mention(
+                    actor_id=actor_id,
+                    mentioned_user_id=user_id,
+                    content_type_id=content_type_id,
+                    content_id=content_id,
+                )
+                for user_id in user_ids
+            ],
+            ignore_conflicts=True,
+        )
+        deliver_batch(
+            [
+                {
+                    "sender_id": actor_id,
+                    "receiver_id": user_id,
+                    "verb": "mentioned",
+                    "content_type_id": content_type_id,
+                    "content_id": content_id,
+                    "group_key": None,
+                }
+                for user_id in user_ids
+            ]
+        )
+
+    return len(user_ids)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("interactions", "0005_alter_notification_verb"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="notification",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="actors_count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="group_key",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="recent_actor_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("group_key__isnull", True)),
+                fields=("sender", "receiver", "verb", "content_type", "content_id"),
+                name="notification_unique_event",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("group_key__isnull", False)),
+                fields=("receiver", "group_key"),
+                name="notification_unique_group",
+            ),
+        ),
+    ]
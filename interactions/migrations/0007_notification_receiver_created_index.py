@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:59
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built CONCURRENTLY so the notifications table stays writable.
+    atomic = False
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("interactions", "0006_notification_groups"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                fields=["receiver", "created_at"], name="notification_receiver_created"
+            ),
+        ),
+    ]
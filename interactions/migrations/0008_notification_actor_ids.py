@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:41
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_actor_ids(apps, schema_editor):
+    Notification = apps.get_model("interactions", "Notification")
+    # Only the recent actors of existing groups are known.
+    Notification.objects.filter(group_key__isnull=False).update(
+        actor_ids=F("recent_actor_ids")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("interactions", "0007_notification_receiver_created_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="actor_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_actor_ids, migrations.RunPython.noop),
+    ]
@@ -71,11 +71,37 @@ class Notification(models.Model):
     verb = models.CharField(choices=VERB_CHOICES, max_length=15)
     is_read = models.BooleanField(default=False)
 
+    # Aggregated like/retweet/follow notifications (see interactions.utils): one row
+    # per receiver and group key, where sender and target are the latest event's.
+    group_key = models.CharField(max_length=100, null=True, blank=True)
+    actors_count = models.PositiveIntegerField(default=1)
+    recent_actor_ids = models.JSONField(default=list, blank=True)
+    # Every actor counted in the group, so a repeated event is not counted twice.
+    actor_ids = models.JSONField(default=list, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
-        unique_together = ("sender", "receiver", "verb", "content_type", "content_id")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sender", "receiver", "verb", "content_type", "content_id"],
+                condition=models.Q(group_key__isnull=True),
+                name="notification_unique_event",
+            ),
+            models.UniqueConstraint(
+                fields=["receiver", "group_key"],
+                condition=models.Q(group_key__isnull=False),
+                name="notification_unique_group",
+            ),
+        ]
+        indexes = [
+            # A receiver's notifications newer than their read watermark.
+            models.Index(
+                fields=["receiver", "created_at"],
+                name="notification_receiver_created",
+            )
+        ]
 
     def __str__(self):
         templates = {
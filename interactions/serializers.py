@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Mention, Notification
+from .unread import is_unread
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -45,10 +46,21 @@ class ListUserMentionsSerializer(serializers.ModelSerializer):
 class ListNotificationsSerializer(serializers.ModelSerializer):
     sender = serializers.SerializerMethodField(read_only=True)
     content = serializers.SerializerMethodField(read_only=True)
+    recent_actors = serializers.SerializerMethodField(read_only=True)
+    is_read = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Notification
-        fields = ["id", "sender", "verb", "content", "is_read", "created_at"]
+        fields = [
+            "id",
+            "sender",
+            "verb",
+            "content",
+            "actors_count",
+            "recent_actors",
+            "is_read",
+            "created_at",
+        ]
 
     def get_sender(self, obj):
         if obj.sender:
@@ -56,11 +68,28 @@ class ListNotificationsSerializer(serializers.ModelSerializer):
 
         return "System"
 
+    def get_recent_actors(self, obj):
+        # Attached per page by interactions.utils.attach_recent_actors
+        actors = getattr(obj, "recent_actors", None)
+        if actors is None:
+            actors = [obj.sender] if obj.sender else []
+
+        return UserSerializer(actors, many=True).data
+
+    def get_is_read(self, obj):
+        # Also read when older than the receiver's "mark all read" watermark.
+        return not is_unread(obj, obj.receiver.notifications_read_through)
+
     def get_content(self, obj):
+        actors = f"{obj.sender}"
+        if obj.actors_count > 1:
+            others = obj.actors_count - 1
+            actors += f" and {others:,} other{'s' if others > 1 else ''}"
+
         templates = {
-            "followed": lambda: f"{obj.sender} followed you",
-            "liked": lambda: f"{obj.sender} liked your {obj.content_type.model}",
-            "retweeted": lambda: f"{obj.sender} retweeted your {obj.content_type.model}",
+            "followed": lambda: f"{actors} followed you",
+            "liked": lambda: f"{actors} liked your tweet",
+            "retweeted": lambda: f"{actors} retweeted your tweet",
             "commented": lambda: f"{obj.sender} commented on your {obj.content_type.model}",
             "mentioned": lambda: f"{obj.sender} mentioned you in a {obj.content_type.model}",
             "welcome": lambda: "Welcome to Twitter 🎉",
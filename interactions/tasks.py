@@ -0,0 +1,20 @@
+from celery import shared_task
+
+from .delivery import deliver_pending_notifications
+from .mentions import create_mentions
+from .unread import reconcile_unread_counts
+
+
+@shared_task
+def create_mentions_task(actor_id, content_type_id, content_id, text):
+    return create_mentions(actor_id, content_type_id, content_id, text)
+
+
+@shared_task
+def deliver_notifications_task():
+    return deliver_pending_notifications()
+
+
+@shared_task
+def reconcile_unread_counts_task():
+    return reconcile_unread_counts()
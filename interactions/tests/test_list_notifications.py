@@ -7,7 +7,6 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from interactions.models import Notification
 from tweets.models import Tweet
-from relationships.models import Follow
 
 User = get_user_model()
 
@@ -96,3 +95,27 @@ class TestListNotifications(APITestCase):
     def test_list_notifications_unauthenticated(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_notifications_cursor_pagination(self):
+        self.authenticate()
+        # 11 = 1 welcome notification seeded in setUp + 10 follow notifications
+        for i in range(10):
+            follower = User.objects.create_user(
+                username=f"follower{i}",
+                email=f"follower{i}@gmail.com",
+                password="user1234",
+            )
+            # Rows created directly, Follow signals roll follows up into one group.
+            Notification.objects.create(
+                sender=follower, receiver=self.user, verb="followed"
+            )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 10)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["verb"], "welcome")
+        self.assertIsNone(response.data["next"])
@@ -6,6 +6,7 @@ from django.contrib.contenttypes.models import ContentType
 from rest_framework.test import APITestCase
 from rest_framework import status
 from interactions.models import Notification
+from interactions.unread import is_unread, unread_for
 from tweets.models import Tweet
 from relationships.models import Follow
 
@@ -14,7 +15,9 @@ User = get_user_model()
 
 class TestMarkAllNotificationsRead(APITestCase):
     def setUp(self):
-        self.welcome_patcher = patch("accounts.tasks.send_welcome_notification_task.delay")
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
         self.welcome_patcher.start()
         self.addCleanup(self.welcome_patcher.stop)
 
@@ -70,13 +73,13 @@ class TestMarkAllNotificationsRead(APITestCase):
         # 4 = 1 welcome notification seeded in setUp + 3 test notifications
         self.assertEqual(response.data["updated_count"], 4)
 
-        # all are now read
-        notif1.refresh_from_db()
-        notif2.refresh_from_db()
-        notif3.refresh_from_db()
-        self.assertTrue(notif1.is_read)
-        self.assertTrue(notif2.is_read)
-        self.assertTrue(notif3.is_read)
+        # all are now read, through the user's watermark
+        self.user.refresh_from_db()
+        read_through = self.user.notifications_read_through
+        self.assertFalse(is_unread(notif1, read_through))
+        self.assertFalse(is_unread(notif2, read_through))
+        self.assertFalse(is_unread(notif3, read_through))
+        self.assertFalse(unread_for(self.user).exists())
 
     def test_mark_all_notifications_read_mixed_status(self):
         self.authenticate()
@@ -163,10 +166,11 @@ class TestMarkAllNotificationsRead(APITestCase):
         self.assertEqual(response.data["updated_count"], 2)
 
         # Verify only user's notification was updated
-        notif1.refresh_from_db()
-        notif2.refresh_from_db()
-        self.assertTrue(notif1.is_read)
-        self.assertFalse(notif2.is_read)  # Other user's notification unchanged
+        self.user.refresh_from_db()
+        self.other_user.refresh_from_db()
+        self.assertFalse(is_unread(notif1, self.user.notifications_read_through))
+        # Other user's notification unchanged
+        self.assertTrue(is_unread(notif2, self.other_user.notifications_read_through))
 
     def test_mark_all_notifications_read_empty(self):
         self.authenticate()
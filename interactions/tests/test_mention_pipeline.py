@@ -0,0 +1,136 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from accounts.usernames import resolve_usernames
+from interactions.mentions import create_mentions, extract_usernames
+from interactions.models import Mention, Notification
+from tweets.models import Tweet, Comment
+
+User = get_user_model()
+
+
+class TestMentionPipeline(APITestCase):
+    def setUp(self):
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
+        self.welcome_patcher.start()
+        self.addCleanup(self.welcome_patcher.stop)
+
+        self.author = User.objects.create_user(
+            username="author", email="author@gmail.com", password="user1234"
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f"reader{i}", email=f"reader{i}@gmail.com", password="pw1234"
+            )
+            for i in range(20)
+        ]
+        self.tweet = Tweet.objects.create(user=self.author, content="Hello")
+        self.content_type_id = ContentType.objects.get_for_model(Tweet).id
+
+    def mention(self, text, content_id=None):
+        return create_mentions(
+            self.author.id, self.content_type_id, content_id or self.tweet.id, text
+        )
+
+    def text_mentioning(self, users):
+        return " ".join(f"@{user.username}" for user in users)
+
+    def test_extract_usernames(self):
+        self.assertEqual(
+            extract_usernames("hi @a, @b and @a again, mail@c"), {"a", "b", "c"}
+        )
+        self.assertEqual(extract_usernames(None), set())
+
+    def test_mentions_and_notifications_are_created(self):
+        self.assertEqual(self.mention(self.text_mentioning(self.users[:3])), 3)
+
+        mentioned = Mention.objects.filter(content_id=self.tweet.id)
+        self.assertEqual(
+            set(mentioned.values_list("mentioned_user_id", flat=True)),
+            {user.id for user in self.users[:3]},
+        )
+        notifications = Notification.objects.filter(verb="mentioned")
+        self.assertEqual(
+            set(notifications.values_list("receiver_id", flat=True)),
+            {user.id for user in self.users[:3]},
+        )
+        self.assertTrue(all(n.sender_id == self.author.id for n in notifications))
+
+    def test_query_count_does_not_depend_on_the_number_of_mentions(self):
+        other = Tweet.objects.create(user=self.author, content="Other")
+
+        with CaptureQueriesContext(connection) as few:
+            self.mention(self.text_mentioning(self.users[:2]))
+        with CaptureQueriesContext(connection) as many:
+            self.mention(self.text_mentioning(self.users[2:]), content_id=other.id)
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(Mention.objects.filter(content_id=other.id).count(), 18)
+
+    def test_replayed_mentions_are_not_duplicated(self):
+        text = self.text_mentioning(self.users[:2])
+        self.mention(text)
+        self.mention(text)
+
+        self.assertEqual(Mention.objects.filter(content_id=self.tweet.id).count(), 2)
+        self.assertEqual(Notification.objects.filter(verb="mentioned").count(), 2)
+
+    def test_author_and_unknown_names_are_skipped(self):
+        self.assertEqual(self.mention("@author @nobody"), 0)
+        self.assertFalse(Mention.objects.exists())
+
+    def test_resolved_usernames_are_cached(self):
+        names = [user.username for user in self.users[:5]]
+        resolve_usernames(names)
+
+        with self.assertNumQueries(0):
+            resolved = resolve_usernames(names)
+
+        self.assertEqual(resolved, {user.username: user.id for user in self.users[:5]})
+
+    def test_renamed_user_resolves_under_the_new_name(self):
+        user = self.users[0]
+        self.assertEqual(resolve_usernames(["renamed"]), {})
+
+        user.username = "renamed"
+        user.save()
+
+        self.assertEqual(resolve_usernames(["renamed"]), {"renamed": user.id})
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+class TestMentionPipelineSignals(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username="author", email="author@gmail.com", password="user1234"
+        )
+        self.reader = User.objects.create_user(
+            username="reader", email="reader@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.author, content="Hello")
+
+    def test_comment_mentions_run_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            comment = Comment.objects.create(
+                user=self.author, tweet=self.tweet, content="Hey @reader"
+            )
+        self.assertFalse(Mention.objects.exists())
+
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(
+            Mention.objects.filter(
+                mentioned_user=self.reader, content_id=comment.id
+            ).exists()
+        )
+        self.assertTrue(
+            Notification.objects.filter(receiver=self.reader, verb="mentioned").exists()
+        )
@@ -0,0 +1,231 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from interactions.delivery import (
+    DELIVERY_LOCK_KEY,
+    DELIVERY_RUNS_KEY,
+    DELIVERY_SCHEDULED_KEY,
+    NOTIFICATION_DEAD_LETTER_KEY,
+    NOTIFICATION_QUEUE_KEY,
+    deliver_batch,
+    deliver_pending_notifications,
+    processing_key,
+    queue_notification,
+)
+from interactions.models import Notification
+from relationships.models import Follow
+from tweets.models import Tweet, Like, Comment
+
+User = get_user_model()
+
+
+class TestNotificationDelivery(APITestCase):
+    def setUp(self):
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
+        self.welcome_patcher.start()
+        self.addCleanup(self.welcome_patcher.stop)
+        # Events are delivered explicitly by the tests.
+        self.schedule_patcher = patch("interactions.delivery.schedule_delivery")
+        self.schedule_patcher.start()
+        self.addCleanup(self.schedule_patcher.stop)
+
+        self.redis = get_redis_connection("default")
+        keys = [NOTIFICATION_QUEUE_KEY, NOTIFICATION_DEAD_LETTER_KEY, DELIVERY_RUNS_KEY]
+        self.redis.delete(*keys)
+        self.addCleanup(self.redis.delete, *keys)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.fans = [
+            User.objects.create_user(
+                username=f"fan{i}", email=f"fan{i}@gmail.com", password="user1234"
+            )
+            for i in range(5)
+        ]
+        self.tweet = Tweet.objects.create(user=self.user, content="Hello")
+
+    def queued(self):
+        return self.redis.llen(NOTIFICATION_QUEUE_KEY)
+
+    def test_events_are_queued_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+            Follow.objects.create(follower=self.fans[0], following=self.user)
+
+        self.assertEqual(self.queued(), 0)
+        self.assertFalse(Notification.objects.filter(receiver=self.user).exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.queued(), 2)
+
+    def test_own_actions_are_not_queued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, tweet=self.tweet)
+
+        self.assertEqual(self.queued(), 0)
+
+    def test_batch_is_written_with_constant_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans:
+                Like.objects.create(user=fan, tweet=self.tweet)
+                Comment.objects.create(user=fan, tweet=self.tweet, content="Nice")
+                Follow.objects.create(follower=fan, following=self.user)
+
+        # Users, event lookup, insert, group lookup and insert (plus savepoints).
+        with self.assertNumQueries(7):
+            self.assertEqual(deliver_pending_notifications(), 15)
+
+        self.assertEqual(self.queued(), 0)
+        notifications = Notification.objects.filter(receiver=self.user)
+        self.assertEqual(notifications.filter(verb="commented").count(), 5)
+        self.assertEqual(notifications.get(verb="liked").actors_count, 5)
+        self.assertEqual(notifications.get(verb="followed").actors_count, 5)
+
+    def test_events_update_existing_groups(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+        deliver_pending_notifications()
+        Notification.objects.filter(receiver=self.user).update(is_read=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[1], tweet=self.tweet)
+        deliver_pending_notifications()
+
+        notification = Notification.objects.get(receiver=self.user, verb="liked")
+        self.assertEqual(notification.actors_count, 2)
+        self.assertEqual(notification.sender, self.fans[1])
+        self.assertFalse(notification.is_read)
+
+    def test_replayed_event_is_not_duplicated_and_becomes_unread(self):
+        comment = Comment.objects.create(
+            user=self.fans[0], tweet=self.tweet, content="Hi"
+        )
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_notification(self.fans[0].id, self.user.id, "commented", comment)
+            deliver_pending_notifications()
+            Notification.objects.filter(receiver=self.user).update(is_read=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_notification(self.fans[0].id, self.user.id, "commented", comment)
+        deliver_pending_notifications()
+
+        notification = Notification.objects.get(receiver=self.user, verb="commented")
+        self.assertFalse(notification.is_read)
+
+    def test_events_of_deleted_users_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.fans[0], following=self.user)
+            Follow.objects.create(follower=self.fans[1], following=self.user)
+        self.fans[0].delete()
+
+        self.assertEqual(deliver_pending_notifications(), 2)
+
+        notification = Notification.objects.get(receiver=self.user, verb="followed")
+        self.assertEqual(notification.recent_actor_ids, [self.fans[1].id])
+
+    def test_delivery_waits_for_a_running_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+        self.redis.set(DELIVERY_LOCK_KEY, "other")
+        self.addCleanup(self.redis.delete, DELIVERY_LOCK_KEY)
+
+        self.assertEqual(deliver_pending_notifications(), 0)
+        self.assertEqual(self.queued(), 1)
+
+    def test_failing_event_is_dead_lettered(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans[:3]:
+                Follow.objects.create(follower=fan, following=self.user)
+
+        def deliver(events):
+            if any(event["sender_id"] == self.fans[1].id for event in events):
+                raise ValueError("poison")
+            deliver_batch(events)
+
+        with patch("interactions.delivery.deliver_batch", side_effect=deliver):
+            self.assertEqual(deliver_pending_notifications(), 2)
+
+        self.assertEqual(self.queued(), 0)
+        dead = self.redis.lrange(NOTIFICATION_DEAD_LETTER_KEY, 0, -1)
+        self.assertEqual(len(dead), 1)
+        self.assertIn(f'"sender_id": {self.fans[1].id}', dead[0].decode())
+        notification = Notification.objects.get(receiver=self.user, verb="followed")
+        self.assertEqual(notification.actors_count, 2)
+
+    def test_batches_of_a_dead_run_are_requeued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.fans[1], following=self.user)
+        # A run that died after claiming an earlier event.
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.fans[0], following=self.user)
+        claimed = self.redis.rpop(NOTIFICATION_QUEUE_KEY)
+        self.redis.rpush(processing_key("dead"), claimed)
+        self.redis.sadd(DELIVERY_RUNS_KEY, "dead")
+        self.addCleanup(self.redis.delete, processing_key("dead"))
+
+        self.assertEqual(deliver_pending_notifications(), 2)
+
+        self.assertFalse(self.redis.exists(processing_key("dead")))
+        self.assertFalse(self.redis.exists(DELIVERY_RUNS_KEY))
+        notification = Notification.objects.get(receiver=self.user, verb="followed")
+        self.assertEqual(notification.actors_count, 2)
+
+    @override_settings(NOTIFICATION_DELIVERY_MAX_BATCHES=2)
+    def test_run_is_bounded_and_reschedules(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans:
+                Follow.objects.create(follower=fan, following=self.user)
+
+        with patch("interactions.delivery.schedule_delivery") as schedule_delivery:
+            self.assertEqual(deliver_pending_notifications(batch_size=2), 4)
+
+        self.assertEqual(self.queued(), 1)
+        schedule_delivery.assert_called_once()
+        self.assertFalse(self.redis.exists(DELIVERY_LOCK_KEY))
+
+    def test_run_stops_claiming_once_its_lock_is_lost(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans[:2]:
+                Follow.objects.create(follower=fan, following=self.user)
+
+        def deliver(events):
+            deliver_batch(events)
+            # The lock expired and another run took it.
+            self.redis.set(DELIVERY_LOCK_KEY, "other")
+
+        self.addCleanup(self.redis.delete, DELIVERY_LOCK_KEY)
+        with patch("interactions.delivery.deliver_batch", side_effect=deliver):
+            self.assertEqual(deliver_pending_notifications(batch_size=1), 1)
+
+        self.assertEqual(self.queued(), 1)
+        self.assertEqual(self.redis.get(DELIVERY_LOCK_KEY), b"other")
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+class TestNotificationDeliveryTask(APITestCase):
+    def setUp(self):
+        get_redis_connection("default").delete(NOTIFICATION_QUEUE_KEY)
+        cache.delete(DELIVERY_SCHEDULED_KEY)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.fan = User.objects.create_user(
+            username="fan", email="fan@gmail.com", password="user1234"
+        )
+
+    def test_follow_notification_is_delivered_by_the_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.fan, following=self.user)
+
+        notification = Notification.objects.get(receiver=self.user, verb="followed")
+        self.assertEqual(notification.sender, self.fan)
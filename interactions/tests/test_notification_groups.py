@@ -0,0 +1,141 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from interactions.delivery import DELIVERY_SCHEDULED_KEY, NOTIFICATION_QUEUE_KEY
+from interactions.models import Notification
+from interactions.utils import create_notification
+from relationships.models import Follow
+from tweets.models import Tweet, Like, Retweet
+
+User = get_user_model()
+
+
+@override_settings(
+    NOTIFICATION_GROUP_RECENT_ACTORS=2,
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class TestNotificationGroups(APITestCase):
+    def setUp(self):
+        get_redis_connection("default").delete(NOTIFICATION_QUEUE_KEY)
+        cache.delete(DELIVERY_SCHEDULED_KEY)
+
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
+        self.welcome_patcher.start()
+        self.addCleanup(self.welcome_patcher.stop)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.fans = [
+            User.objects.create_user(
+                username=f"fan{i}", email=f"fan{i}@gmail.com", password="user1234"
+            )
+            for i in range(4)
+        ]
+        self.tweet = Tweet.objects.create(user=self.user, content="Viral")
+        self.url = reverse("notifications")
+
+    def test_likes_on_a_tweet_share_one_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans:
+                Like.objects.create(user=fan, tweet=self.tweet)
+
+        notification = Notification.objects.get(receiver=self.user, verb="liked")
+        self.assertEqual(notification.actors_count, 4)
+        self.assertEqual(
+            notification.recent_actor_ids, [self.fans[3].id, self.fans[2].id]
+        )
+        self.assertEqual(notification.sender, self.fans[3])
+
+    def test_repeated_actor_is_counted_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+        Like.objects.filter(user=self.fans[0]).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+
+        notification = Notification.objects.get(receiver=self.user, verb="liked")
+        self.assertEqual(notification.actors_count, 1)
+
+    def test_actor_beyond_the_recent_ones_is_counted_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans:
+                Like.objects.create(user=fan, tweet=self.tweet)
+        Like.objects.filter(user=self.fans[0]).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+
+        notification = Notification.objects.get(receiver=self.user, verb="liked")
+        self.assertEqual(notification.actors_count, 4)
+        self.assertEqual(
+            notification.recent_actor_ids, [self.fans[0].id, self.fans[3].id]
+        )
+
+    def test_retweets_and_follows_are_grouped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans[:3]:
+                Retweet.objects.create(user=fan, tweet=self.tweet)
+                Follow.objects.create(follower=fan, following=self.user)
+
+        self.assertEqual(
+            Notification.objects.get(verb="retweeted", receiver=self.user).actors_count,
+            3,
+        )
+        self.assertEqual(
+            Notification.objects.get(verb="followed", receiver=self.user).actors_count,
+            3,
+        )
+
+    def test_new_bucket_starts_a_new_group(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notification(
+                sender=self.fans[0], receiver=self.user, verb="liked", target=self.tweet
+            )
+        later = timezone.now() + timedelta(days=2)
+        with patch("interactions.delivery.timezone.now", return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                create_notification(
+                    sender=self.fans[1],
+                    receiver=self.user,
+                    verb="liked",
+                    target=self.tweet,
+                )
+
+        self.assertEqual(
+            Notification.objects.filter(receiver=self.user, verb="liked").count(), 2
+        )
+
+    def test_new_activity_makes_a_read_group_unread(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[0], tweet=self.tweet)
+        Notification.objects.filter(receiver=self.user).update(is_read=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fans[1], tweet=self.tweet)
+
+        self.assertFalse(Notification.objects.get(verb="liked").is_read)
+
+    def test_list_shows_aggregated_group(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans:
+                Like.objects.create(user=fan, tweet=self.tweet)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(self.url)
+
+        group = response.data["results"][0]
+        self.assertEqual(group["content"], "fan3 and 3 others liked your tweet")
+        self.assertEqual(group["actors_count"], 4)
+        self.assertEqual(
+            [actor["username"] for actor in group["recent_actors"]], ["fan3", "fan2"]
+        )
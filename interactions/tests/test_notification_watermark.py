@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from interactions.delivery import NOTIFICATION_QUEUE_KEY, deliver_pending_notifications
+from interactions.models import Notification
+from interactions.unread import count_unread, unread_count_key, unread_for
+from interactions.utils import create_notification
+from tweets.models import Tweet
+
+User = get_user_model()
+
+
+class TestNotificationWatermark(APITestCase):
+    def setUp(self):
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
+        self.welcome_patcher.start()
+        self.addCleanup(self.welcome_patcher.stop)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.sender = User.objects.create_user(
+            username="sender", email="sender@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.user, content="Hello @user")
+        self.addCleanup(
+            get_redis_connection("default").delete, unread_count_key(self.user.id)
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def notify(self, sender, verb):
+        # Events tied to a target go through the delivery queue.
+        with patch("interactions.delivery.schedule_delivery"):
+            with self.captureOnCommitCallbacks(execute=True):
+                create_notification(
+                    sender=sender, receiver=self.user, verb=verb, target=self.tweet
+                )
+        self.addCleanup(get_redis_connection("default").delete, NOTIFICATION_QUEUE_KEY)
+        deliver_pending_notifications()
+
+    def mark_all_read(self):
+        response = self.client.post(reverse("mark-all-read"))
+        self.user.refresh_from_db()
+        return response
+
+    def test_mark_all_read_writes_only_the_watermark(self):
+        for verb in ("followed", "commented", "mentioned"):
+            Notification.objects.create(
+                sender=self.sender, receiver=self.user, verb=verb
+            )
+        self.client.get(reverse("notifications-count"))
+
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse("mark-all-read"))
+
+        self.assertEqual(response.data["updated_count"], 3)
+        self.assertFalse(
+            Notification.objects.filter(receiver=self.user, is_read=True).exists()
+        )
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.notifications_read_through)
+        self.assertEqual(count_unread(self.user.id), 0)
+
+    def test_notifications_after_the_watermark_are_unread(self):
+        old = Notification.objects.create(receiver=self.user, verb="welcome")
+        self.mark_all_read()
+        new = Notification.objects.create(
+            sender=self.sender, receiver=self.user, verb="followed"
+        )
+
+        self.assertEqual(list(unread_for(self.user)), [new])
+        self.assertEqual(count_unread(self.user.id), 1)
+
+        response = self.client.get(reverse("unread-notifications"))
+        self.assertEqual([item["id"] for item in response.data["results"]], [new.id])
+
+        response = self.client.get(reverse("notifications"))
+        is_read = {item["id"]: item["is_read"] for item in response.data["results"]}
+        self.assertEqual(is_read, {old.id: True, new.id: False})
+
+    def test_marking_one_below_the_watermark_is_a_no_op(self):
+        notification = Notification.objects.create(
+            sender=self.sender, receiver=self.user, verb="followed"
+        )
+        self.mark_all_read()
+
+        response = self.client.patch(
+            reverse("read-notification", kwargs={"pk": notification.pk})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        notification.refresh_from_db()
+        self.assertFalse(notification.is_read)
+
+    def test_repeated_event_moves_above_the_watermark(self):
+        self.notify(self.sender, "mentioned")
+        notification = Notification.objects.get(receiver=self.user)
+        self.mark_all_read()
+
+        self.notify(self.sender, "mentioned")
+
+        self.assertEqual(list(unread_for(self.user)), [notification])
+
+    def test_new_activity_on_a_group_makes_it_unread(self):
+        self.notify(self.sender, "liked")
+        self.mark_all_read()
+        self.assertFalse(unread_for(self.user).exists())
+
+        fan = User.objects.create_user(
+            username="fan", email="fan@gmail.com", password="user1234"
+        )
+        self.notify(fan, "liked")
+
+        notification = unread_for(self.user).get()
+        self.assertEqual(notification.actors_count, 2)
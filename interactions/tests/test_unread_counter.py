@@ -0,0 +1,149 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from interactions.delivery import DELIVERY_SCHEDULED_KEY, NOTIFICATION_QUEUE_KEY
+from interactions.models import Notification
+from interactions.unread import reconcile_unread_counts, unread_count_key
+from tweets.models import Tweet, Like
+
+User = get_user_model()
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+class TestUnreadCounter(APITestCase):
+    def setUp(self):
+        self.welcome_patcher = patch(
+            "accounts.tasks.send_welcome_notification_task.delay"
+        )
+        self.welcome_patcher.start()
+        self.addCleanup(self.welcome_patcher.stop)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.fan = User.objects.create_user(
+            username="fan", email="fan@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.user, content="Hello")
+        self.url = reverse("notifications-count")
+        self.redis = get_redis_connection("default")
+        self.redis.delete(NOTIFICATION_QUEUE_KEY)
+        cache.delete(DELIVERY_SCHEDULED_KEY)
+        self.addCleanup(self.redis.delete, unread_count_key(self.user.id))
+        self.client.force_authenticate(user=self.user)
+
+    def unread_count(self):
+        response = self.client.get(self.url)
+        return response.data["unread_count"]
+
+    def stored_count(self):
+        value = self.redis.get(unread_count_key(self.user.id))
+        return None if value is None else int(value)
+
+    def test_counter_is_seeded_on_first_read(self):
+        Notification.objects.create(sender=self.fan, receiver=self.user, verb="liked")
+        self.assertIsNone(self.stored_count())
+
+        self.assertEqual(self.unread_count(), 1)
+        self.assertEqual(self.stored_count(), 1)
+
+    def test_warm_count_makes_no_query(self):
+        self.unread_count()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread_count(), 0)
+
+    def test_new_notification_increments_counter(self):
+        self.unread_count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fan, tweet=self.tweet)
+
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_adjustments_before_seeding_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fan, tweet=self.tweet)
+
+        self.assertIsNone(self.stored_count())
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_read_group_becoming_unread_increments_counter(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.fan, tweet=self.tweet)
+        Notification.objects.filter(receiver=self.user).update(is_read=True)
+        self.assertEqual(self.unread_count(), 0)
+
+        other = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=other, tweet=self.tweet)
+
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_mark_one_read_decrements_once(self):
+        notification = Notification.objects.create(
+            sender=self.fan, receiver=self.user, verb="liked"
+        )
+        self.unread_count()
+        url = reverse("read-notification", kwargs={"pk": notification.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url)
+            self.client.patch(url)
+
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_all_read_resets_counter(self):
+        Notification.objects.create(sender=self.fan, receiver=self.user, verb="liked")
+        Notification.objects.create(receiver=self.user, verb="welcome")
+        self.assertEqual(self.unread_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("mark-all-read"))
+
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_deleting_unread_notification_decrements_counter(self):
+        unread = Notification.objects.create(
+            sender=self.fan, receiver=self.user, verb="liked"
+        )
+        read = Notification.objects.create(
+            receiver=self.user, verb="welcome", is_read=True
+        )
+        self.assertEqual(self.unread_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("delete-notification", kwargs={"pk": read.pk}))
+        self.assertEqual(self.unread_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("delete-notification", kwargs={"pk": unread.pk}))
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_counter_never_goes_negative(self):
+        self.unread_count()
+        notification = Notification.objects.create(
+            sender=self.fan, receiver=self.user, verb="liked"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("read-notification", kwargs={"pk": notification.pk})
+            )
+
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_reconcile_repairs_drift(self):
+        Notification.objects.create(sender=self.fan, receiver=self.user, verb="liked")
+        self.unread_count()
+        self.redis.set(unread_count_key(self.user.id), 7)
+
+        self.assertGreaterEqual(reconcile_unread_counts(), 1)
+        self.assertEqual(self.unread_count(), 1)
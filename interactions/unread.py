@@ -0,0 +1,154 @@
+"""
+Per-user unread notification counters kept in Redis.
+
+``notifications_unread:<user id>`` is adjusted by every write that changes how many
+unread notifications a user has, after the transaction commits, so polling the count
+never reaches PostgreSQL. A counter is seeded from the database the first time it is
+read; adjustments to a counter that does not exist yet are dropped, since the seed
+will include them.
+
+Writes that bypass these helpers (bulk deletes, cascades, failures between commit and
+Redis) make counters drift; ``reconcile_unread_counts`` recomputes them periodically.
+
+"Mark all read" only moves the receiver's ``notifications_read_through`` watermark:
+a notification is unread when it is not marked read on its own and was created (or
+had new activity) after the watermark.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django_redis import get_redis_connection
+
+from .models import Notification
+
+# Adjust an existing counter only, never below zero.
+ADJUST_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('incrby', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('set', KEYS[1], 0)
+    value = 0
+end
+return value
+"""
+
+UNREAD_KEY_PATTERN = "notifications_unread:*"
+
+
+def unread_count_key(user_id):
+    return f"notifications_unread:{user_id}"
+
+
+def _adjust(user_id, delta):
+    conn = get_redis_connection("default")
+    conn.eval(ADJUST_SCRIPT, 1, unread_count_key(user_id), delta)
+
+
+def adjust_unread_count(user_id, delta):
+    transaction.on_commit(lambda: _adjust(user_id, delta))
+
+
+def _adjust_many(deltas):
+    conn = get_redis_connection("default")
+    pipe = conn.pipeline(transaction=False)
+    for user_id, delta in deltas.items():
+        pipe.eval(ADJUST_SCRIPT, 1, unread_count_key(user_id), delta)
+    pipe.execute()
+
+
+def adjust_unread_counts(deltas):
+    """
+    Apply ``{user_id: delta}`` in one Redis round trip once the transaction commits.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: _adjust_many(deltas))
+
+
+def reset_unread_count(user_id):
+    conn = get_redis_connection("default")
+    transaction.on_commit(lambda: conn.set(unread_count_key(user_id), 0))
+
+
+def unread_filter():
+    """
+    Unread notifications, joined to their receiver's watermark.
+    """
+    return Q(is_read=False) & (
+        Q(receiver__notifications_read_through__isnull=True)
+        | Q(created_at__gt=F("receiver__notifications_read_through"))
+    )
+
+
+def unread_for(user):
+    """
+    The unread notifications of ``user``, a range scan on (receiver, created_at).
+    """
+    queryset = Notification.objects.filter(receiver=user, is_read=False)
+    if user.notifications_read_through is not None:
+        queryset = queryset.filter(created_at__gt=user.notifications_read_through)
+    return queryset
+
+
+def is_unread(notification, read_through):
+    """
+    Whether ``notification`` is unread for a receiver whose watermark is
+    ``read_through``.
+    """
+    return not notification.is_read and (
+        read_through is None or notification.created_at > read_through
+    )
+
+
+def count_unread(user_id):
+    return Notification.objects.filter(unread_filter(), receiver_id=user_id).count()
+
+
+def get_unread_count(user_id):
+    """
+    The user's unread count, read from Redis; seeded with one COUNT the first time.
+    """
+    conn = get_redis_connection("default")
+    key = unread_count_key(user_id)
+
+    value = conn.get(key)
+    if value is None:
+        conn.set(key, count_unread(user_id), nx=True)
+        value = conn.get(key)
+
+    return int(value)
+
+
+def reconcile_unread_counts(batch_size=1000):
+    """
+    Recompute every seeded counter from the database, ``batch_size`` users per
+    query. Returns the number of counters that were corrected.
+    """
+    conn = get_redis_connection("default")
+    keys = list(conn.scan_iter(match=UNREAD_KEY_PATTERN, count=batch_size))
+
+    fixed = 0
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start : start + batch_size]
+        user_ids = [int(key.decode().rsplit(":", 1)[1]) for key in batch]
+        current = conn.mget(batch)
+
+        counts = dict(
+            Notification.objects.filter(unread_filter(), receiver_id__in=user_ids)
+            .order_by()
+            .values("receiver_id")
+            .annotate(unread=Count("id"))
+            .values_list("receiver_id", "unread")
+        )
+
+        pipe = conn.pipeline(transaction=False)
+        for user_id, key, value in zip(user_ids, batch, current):
+            expected = counts.get(user_id, 0)
+            if value is None or int(value) != expected:
+                pipe.set(key, expected)
+                fixed += 1
+        pipe.execute()
+
+    return fixed
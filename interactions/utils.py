@@ -1,21 +1,50 @@
-from django.contrib.contenttypes.models import ContentType
-from django.db import IntegrityError, transaction
+from django.contrib.auth import get_user_model
 
 from .models import Notification
+from .unread import adjust_unread_count
+
+
+def attach_recent_actors(notifications):
+    """
+    Set ``recent_actors`` (users, most recent first) on a page of notifications
+    with a single query.
+    """
+    notifications = list(notifications)
+    actor_ids = {
+        actor_id
+        for notification in notifications
+        for actor_id in notification.recent_actor_ids
+    }
+    actors = {}
+    if actor_ids:
+        actors = get_user_model().objects.select_related("profile").in_bulk(actor_ids)
+
+    for notification in notifications:
+        notification.recent_actors = [
+            actors[actor_id]
+            for actor_id in notification.recent_actor_ids
+            if actor_id in actors
+        ]
+
+    return notifications
 
 
 def create_notification(sender=None, receiver=None, target=None, verb=None):
     """
      Create a Notification for an action performed by one user on another, optionally tied to a target object.
 
-    This helper is intended to be called from signal handlers (e.g., on like, comment, retweet, follow, mention).
+    This helper is intended to be called from signal handlers and views (e.g., on welcome, password changes).
     It is a no-op when the sender and receiver are the same user.
 
+    Notifications tied to a target are queued for delivery (see
+    ``interactions.delivery``), which aggregates likes, retweets and follows and
+    makes repeated events unread again; they are written once the transaction
+    commits and nothing is returned for them.
+
     Args:
         sender (User): The user who performed the action.
         receiver (User): The user who should receive the notification.
         target (Model | None): The object the action relates to (e.g., Tweet, Comment, Retweet, Follow).
-            When provided, it's resolved to (content_type, content_id) using ContentType.get_for_model(target).
         verb (str): The action verb. Must match one of Notification.VERB_CHOICES
 
     """
@@ -25,39 +54,14 @@ def create_notification(sender=None, receiver=None, target=None, verb=None):
     if sender == receiver:  # Don't notify yourself
         return
 
-    content_type = None
-    content_id = None
-    if target:
-        content_type = ContentType.objects.get_for_model(target)
-        content_id = target.id
-
-    if target is None:
-        return Notification.objects.create(
-            sender=sender,
-            receiver=receiver,
-            verb=verb,
-            content_type=content_type,
-            content_id=content_id,
-        )
-
-    unique_lookup = {
-        "sender": sender,
-        "receiver": receiver,
-        "verb": verb,
-        "content_type": content_type,
-        "content_id": content_id,
-    }
+    if target is not None:
+        from .delivery import queue_notification
 
-    try:
-        with transaction.atomic():
-            notification, created = Notification.objects.get_or_create(**unique_lookup)
-    except IntegrityError:
-        # Handles rare races where two transactions try to create the same notification.
-        notification = Notification.objects.get(**unique_lookup)
-        created = False
-
-    if not created and notification.is_read:
-        notification.is_read = False
-        notification.save(update_fields=["is_read"])
+        queue_notification(getattr(sender, "id", None), receiver.id, verb, target)
+        return
 
+    notification = Notification.objects.create(
+        sender=sender, receiver=receiver, verb=verb
+    )
+    adjust_unread_count(receiver.id, 1)
     return notification
@@ -1,10 +1,24 @@
+from django.contrib.auth import get_user_model
 from django.db.models import Count
+from django.utils import timezone
 from rest_framework import generics, filters, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from .models import Mention, Notification
 from .serializers import ListUserMentionsSerializer, ListNotificationsSerializer
 from .permissions import IsNotificationReceiver
+from .utils import attach_recent_actors
+from .unread import (
+    adjust_unread_count,
+    get_unread_count,
+    is_unread,
+    reset_unread_count,
+    unread_for,
+)
+from config.pagination import KeysetPagination
+
+User = get_user_model()
 
 # Create your views here.
 
@@ -12,6 +26,7 @@ from .permissions import IsNotificationReceiver
 class ListUserMentionsAPIView(generics.ListAPIView):
     serializer_class = ListUserMentionsSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ["=content_type__model", "actor__username"]
 
@@ -23,14 +38,28 @@ class ListUserMentionsAPIView(generics.ListAPIView):
         )
 
 
-class ListNotificationAPIView(generics.ListAPIView):
+class NotificationPageMixin:
+    """
+    Loads the recent actors of grouped notifications for the whole page at once.
+    """
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is None:
+            return None
+
+        return attach_recent_actors(page)
+
+
+class ListNotificationAPIView(NotificationPageMixin, generics.ListAPIView):
     serializer_class = ListNotificationsSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return (
             Notification.objects.filter(receiver=self.request.user)
-            .select_related("sender", "sender__profile", "content_type")
+            .select_related("sender", "sender__profile", "content_type", "receiver")
             .order_by("-created_at")
         )
 
@@ -43,32 +72,37 @@ class MarkNotificationAsReadAPIView(generics.UpdateAPIView):
     def patch(self, request, *args, **kwargs):
         notification = self.get_object()
 
-        notification.is_read = True
-        notification.save()
+        # Conditional so that concurrent requests decrement the counter only once.
+        marked = unread_for(request.user).filter(pk=notification.pk)
+        if marked.update(is_read=True):
+            adjust_unread_count(notification.receiver_id, -1)
 
         return Response({"detail": "Notification marked as read"})
 
 
 class NotificationsCountAPIView(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
+    """
+    Unread notification count, served from the Redis counter without a database
+    query (the token's user id is trusted instead of loading the user).
+    """
 
-    def get_queryset(self):
-        return Notification.objects.filter(receiver=self.request.user, is_read=False)
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        unread_count = self.get_queryset().count()
+        unread_count = get_unread_count(int(request.user.id))
 
         return Response({"unread_count": unread_count}, status=status.HTTP_200_OK)
 
 
-class UnreadNotificationsAPIView(generics.ListAPIView):
+class UnreadNotificationsAPIView(NotificationPageMixin, generics.ListAPIView):
     serializer_class = ListNotificationsSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return (
-            Notification.objects.filter(receiver=self.request.user, is_read=False)
-            .select_related("sender", "sender__profile", "content_type")
+            unread_for(self.request.user)
+            .select_related("sender", "sender__profile", "content_type", "receiver")
             .order_by("-created_at")
         )
 
@@ -80,7 +114,10 @@ class DeleteNotificationAPIView(generics.DestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         notification = self.get_object()
-        notification.delete()
+        deleted, _ = Notification.objects.filter(pk=notification.pk).delete()
+        read_through = request.user.notifications_read_through
+        if deleted and is_unread(notification, read_through):
+            adjust_unread_count(notification.receiver_id, -1)
 
         return Response(
             {"detail": "Notification deleted successfully"},
@@ -89,12 +126,19 @@ class DeleteNotificationAPIView(generics.DestroyAPIView):
 
 
 class MarkAllNotificationsAsReadAPIView(generics.GenericAPIView):
+    """
+    Moves the user's read watermark to now, a single-row write however many
+    notifications were unread.
+    """
+
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        updated_count = Notification.objects.filter(
-            receiver=request.user, is_read=False
-        ).update(is_read=True)
+        updated_count = get_unread_count(request.user.id)
+        User.objects.filter(pk=request.user.pk).update(
+            notifications_read_through=timezone.now()
+        )
+        reset_unread_count(request.user.id)
 
         return Response(
             {
@@ -23,14 +23,6 @@ class FollowUserSerializer(serializers.ModelSerializer):
                 {"error": "self_follow", "detail": "You cannot follow yourself"}
             )
 
-        if Follow.objects.filter(follower=follower, following=following).exists():
-            raise serializers.ValidationError(
-                {
-                    "error": "already_following",
-                    "detail": "You already follow this user",
-                }
-            )
-
         return attrs
 
 
@@ -1,15 +1,27 @@
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from .models import Follow
-from interactions.utils import create_notification
+from interactions.delivery import queue_notification
+from accounts.autocomplete import update_following
+from tweets.timelines import forget_followed_celebrities
 
 
 @receiver(post_save, sender=Follow)
 def notify_post_followed(sender, instance, created, **kwargs):
     if created:
-        create_notification(
-            sender=instance.follower,
-            receiver=instance.following,
-            verb="followed",
-            target=instance,
+        queue_notification(
+            instance.follower_id, instance.following_id, "followed", instance
         )
+
+
+@receiver(post_save, sender=Follow)
+def on_follow_created(sender, instance, created, **kwargs):
+    if created:
+        update_following(instance.follower_id, instance.following_id, True)
+        forget_followed_celebrities(instance.follower_id)
+
+
+@receiver(post_delete, sender=Follow)
+def on_follow_deleted(sender, instance, **kwargs):
+    update_following(instance.follower_id, instance.following_id, False)
+    forget_followed_celebrities(instance.follower_id)
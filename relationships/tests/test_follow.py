@@ -37,11 +37,12 @@ class TestFollow(APITestCase):
         response = self.client.post(self.follow_url_user2)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-        # Second follow
+        # Second follow returns the existing one
         response = self.client.post(self.follow_url_user2)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("error", response.data)
-        self.assertEqual(response.data.get("error")[0], "already_following")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Follow.objects.filter(follower=self.user1, following=self.user2).count(), 1
+        )
 
     def test_follow_unknown_user(self):
         self.authenticate_user1()
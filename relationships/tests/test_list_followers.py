@@ -44,3 +44,15 @@ class TestListFollowers(APITestCase):
     def test_list_followers_unauthenticated(self):
         response = self.client.get(self.url_user1_followers)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_search_followers_tolerates_typos(self):
+        Follow.objects.create(follower=self.user2, following=self.user1)
+        Follow.objects.create(follower=self.user3, following=self.user1)
+        self.user2.profile.name = "Jonathan"
+        self.user2.profile.save()
+
+        self.authenticate_user1()
+        response = self.client.get(self.url_user1_followers, {"search": "jonathon"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['username'], "user2")
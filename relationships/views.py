@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, filters
+from rest_framework import generics, status
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .serializers import (
     FollowUserSerializer,
@@ -9,8 +10,12 @@ from .serializers import (
     FollowingUserSerializer,
 )
 from .models import Follow
+from accounts.search import UserSearchFilter
+from accounts.usernames import get_user_id_or_404
 from tweets.cache_utils import invalidate_feed_cache
+from tweets.timelines import backfill_timeline, purge_author
 from config.throttles import InteractionRateThrottle
+from config.upsert import insert_or_get
 
 # Create your views here.
 User = get_user_model()
@@ -29,11 +34,32 @@ class FollowUserAPIView(generics.CreateAPIView):
         return context
 
     def get_following(self):
-        return get_object_or_404(User, username=self.kwargs["username"])
+        # Used by the serializer context and perform_create, loaded once.
+        if not hasattr(self, "_following"):
+            self._following = get_object_or_404(
+                User.objects.select_related("profile"),
+                pk=get_user_id_or_404(self.kwargs["username"]),
+            )
+        return self._following
+
+    def create(self, request, *args, **kwargs):
+        # Idempotent: following again returns the existing follow.
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        follow, created = insert_or_get(
+            Follow,
+            ["follower", "following"],
+            follower=request.user,
+            following=self.get_following(),
+        )
+        if created:
+            backfill_timeline(request.user.id, follow.following)
+            invalidate_feed_cache(request.user.id)
 
-    def perform_create(self, serializer):
-        serializer.save(follower=self.request.user, following=self.get_following())
-        invalidate_feed_cache(self.request.user.id)
+        return Response(
+            self.get_serializer(follow).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
 
 class UnFollowUserAPIView(generics.DestroyAPIView):
@@ -41,29 +67,28 @@ class UnFollowUserAPIView(generics.DestroyAPIView):
     serializer_class = UnFollowUserSerializer
     permission_classes = [IsAuthenticated]
 
-    def get_following(self):
-        return get_object_or_404(User, username=self.kwargs["username"])
-
     def get_object(self):
         return get_object_or_404(
-            Follow, follower=self.request.user, following=self.get_following()
+            Follow,
+            follower=self.request.user,
+            following_id=get_user_id_or_404(self.kwargs["username"]),
         )
 
     def perform_destroy(self, instance):
         instance.delete()
+        purge_author(self.request.user.id, instance.following_id)
         invalidate_feed_cache(self.request.user.id)
 
 
 class ListFollowersAPIView(generics.ListAPIView):
     serializer_class = FollowerUserSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["username", "profile__name"]
+    filter_backends = [UserSearchFilter]
 
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs["username"])
+        user_id = get_user_id_or_404(self.kwargs["username"])
 
-        follower_ids = Follow.objects.filter(following=user).values_list(
+        follower_ids = Follow.objects.filter(following_id=user_id).values_list(
             "follower_id", flat=True
         )
 
@@ -73,13 +98,12 @@ class ListFollowersAPIView(generics.ListAPIView):
 class ListFollowingAPIView(generics.ListAPIView):
     serializer_class = FollowingUserSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["username", "profile__name"]
+    filter_backends = [UserSearchFilter]
 
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs["username"])
+        user_id = get_user_id_or_404(self.kwargs["username"])
 
-        following_ids = Follow.objects.filter(follower=user).values_list(
+        following_ids = Follow.objects.filter(follower_id=user_id).values_list(
             "following_id", flat=True
         )
 
@@ -1,4 +1,11 @@
+import logging
+
 from django.core.cache import cache
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+FEED_INVALIDATION_METRICS_KEY = "cache_metrics:feed_invalidation"
 
 def invalidate_feed_cache(user_id):
     """
@@ -13,14 +20,86 @@ def invalidate_feed_cache(user_id):
         cache.set(version_key, 1, timeout=None)
 
 
-def get_feed_cache_key(user_id, page, search=""):
+def celebrity_feed_version_key(author_id):
+    return f"celebrity_feed_version:{author_id}"
+
+
+def invalidate_celebrity_feeds(author_id):
+    """
+    Invalidate the cached feed pages of every follower of a celebrity at once.
+    Their feed cache keys include the versions of the celebrities they follow, so
+    one bump replaces a version bump per follower. Returns the number of versions
+    bumped.
     """
-    Build a cache key for the feed that includes the user's local version number.
+    version_key = celebrity_feed_version_key(author_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, timeout=None)
+    return 1
+
+
+def bulk_invalidate_feed_cache(user_ids):
+    """
+    Invalidate the cached feed pages of many users in one pipelined round trip.
+    Same versioning as invalidate_feed_cache, INCR creates a missing version at 1.
+    Returns the number of feed versions bumped.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.incr(cache.make_key(f"feed_version:{user_id}"))
+    pipe.execute()
+
+    return len(user_ids)
+
+
+def record_feed_invalidation(source, keys):
+    """
+    Record how many feed versions a single write invalidated.
+    Aggregates are kept in a Redis hash, see get_feed_invalidation_metrics.
+    """
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    pipe.hincrby(FEED_INVALIDATION_METRICS_KEY, "writes", 1)
+    pipe.hincrby(FEED_INVALIDATION_METRICS_KEY, "keys", keys)
+    pipe.hincrby(FEED_INVALIDATION_METRICS_KEY, f"writes:{source}", 1)
+    pipe.hincrby(FEED_INVALIDATION_METRICS_KEY, f"keys:{source}", keys)
+    pipe.execute()
+
+    logger.info("Feed invalidation: %s invalidated %d feed(s)", source, keys)
+
+
+def get_feed_invalidation_metrics():
+    """
+    Totals recorded by record_feed_invalidation, with the mean keys per write.
+    """
+    raw = get_redis_connection("default").hgetall(FEED_INVALIDATION_METRICS_KEY)
+    metrics = {field.decode(): int(value) for field, value in raw.items()}
+    writes = metrics.get("writes", 0)
+    metrics["keys_per_write"] = metrics.get("keys", 0) / writes if writes else 0.0
+    return metrics
+
+
+def get_feed_cache_key(user_id, page, search="", cursor="", celebrity_ids=()):
+    """
+    Build a cache key for the feed that includes the user's local version number
+    and the versions of the followed celebrities in ``celebrity_ids``.
     """
     version_key = f"feed_version:{user_id}"
-    version = cache.get(version_key, 0)
-    
-    return f"feed:u{user_id}:v{version}:p{page}:s{search}"
+    celebrity_keys = [celebrity_feed_version_key(i) for i in sorted(celebrity_ids)]
+    versions = cache.get_many([version_key, *celebrity_keys])
+    # Versions only grow, so their sum changes whenever one of them does.
+    version = ".".join(
+        [
+            str(versions.get(version_key, 0)),
+            str(sum(versions.get(key, 0) for key in celebrity_keys)),
+        ]
+    )
+
+    return f"feed:u{user_id}:v{version}:p{page}:c{cursor}:s{search}"
 
 
 def invalidate_user_posts_cache(user_id):
@@ -36,14 +115,15 @@ def invalidate_user_posts_cache(user_id):
         cache.set(version_key, 1, timeout=None)
 
 
-def get_user_posts_cache_key(user_id, viewer_id, page):
+def get_user_posts_cache_key(user_id, page, cursor=""):
     """
     Build a cache key for the user posts that includes the user's local version number.
+    Pages are shared by every viewer, viewer flags are merged at response time.
     """
     version_key = f"user_posts_version:{user_id}"
     version = cache.get(version_key, 0)
     
-    return f"user_posts:u{user_id}:viewer_{viewer_id}:v{version}:p{page}"
+    return f"user_posts:u{user_id}:v{version}:p{page}:c{cursor}"
 
 
 def invalidate_tweet_cache(tweet_id):
@@ -57,13 +137,41 @@ def invalidate_tweet_cache(tweet_id):
         cache.incr(version_key)
     except ValueError:
         cache.set(version_key, 1, timeout=None)
+    invalidate_post_cache("tweet", [tweet_id])
+
+
+def get_comment_section_cache_key(tweet_id):
+    """
+    Cache key of the first page of a tweet's comments, shared by every viewer.
+    """
+    return f"tweet_comments:{tweet_id}"
+
+
+def invalidate_comment_section_cache(tweet_id):
+    cache.delete(get_comment_section_cache_key(tweet_id))
 
 
-def get_tweet_cache_key(tweet_id,viewer_id):
+def get_tweet_cache_key(tweet_id):
     """
     Build a cache key for a tweet that includes the local version number.
+    The body is shared by every viewer, viewer flags are merged at response time.
     """
     version_key = f"tweet_version:{tweet_id}"
     version = cache.get(version_key, 0)
     
-    return f"tweet:{tweet_id}:viewer_{viewer_id}:v{version}"
\ No newline at end of file
+    return f"tweet:{tweet_id}:v{version}"
+
+
+def get_post_cache_key(kind, post_id):
+    """
+    Build the cache key of a single tweet or retweet payload shared by every page.
+    """
+    return f"post:{kind}:{post_id}"
+
+
+def invalidate_post_cache(kind, post_ids):
+    """
+    Drop cached tweet or retweet payloads, they are rebuilt on their next read.
+    """
+    if post_ids:
+        cache.delete_many([get_post_cache_key(kind, post_id) for post_id in post_ids])
@@ -0,0 +1,75 @@
+"""
+The comment section embedded in tweet detail.
+
+Tweet detail shows the first page of top-level comments, each with a capped preview
+of its replies, and a cursor to the rest on the comments endpoint. The page is
+rendered without viewer-specific data and cached once per tweet; comment writes drop
+it (see ``tweets.signals.comment_section``).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.urls import reverse
+
+from config.pagination import KeysetPagination
+
+from .cache_utils import get_comment_section_cache_key
+from .models import Comment
+from .serializers import CommentSerializer
+
+
+def prefetch_reply_previews(limit: int = None):
+    """
+    Prefetch only the newest ``limit`` replies of each comment (one more to tell
+    whether there are others) into ``reply_preview``.
+
+    Django runs a sliced prefetch as ``ROW_NUMBER() OVER (PARTITION BY parent_id)``,
+    so the rows loaded per page no longer depend on the size of the threads.
+    """
+    limit = limit or settings.COMMENT_REPLY_PREVIEW_SIZE
+    replies_qs = Comment.objects.select_related("user", "user__profile").order_by(
+        "-created_at", "-id"
+    )
+
+    return Prefetch(
+        "replies", queryset=replies_qs[: limit + 1], to_attr="reply_preview"
+    )
+
+
+def render_comment_section(tweet_id):
+    """
+    ``{"results": [...], "next": url}`` for the first page of a tweet's top-level
+    comments; ``next`` is a (relative) cursor link to the comments endpoint.
+    """
+    pagination = KeysetPagination()
+    page_size = pagination.page_size
+
+    comments = list(
+        Comment.objects.filter(tweet_id=tweet_id, parent=None)
+        .select_related("user", "user__profile")
+        .prefetch_related(prefetch_reply_previews())
+        .order_by(*pagination.ordering)[: page_size + 1]
+    )
+
+    next_link = None
+    if len(comments) > page_size:
+        comments = comments[:page_size]
+        last = comments[-1]
+        cursor = pagination.encode_cursor((last.created_at, "", last.pk))
+        next_link = f"{reverse('comments', kwargs={'pk': tweet_id})}?cursor={cursor}"
+
+    return {
+        "results": list(CommentSerializer(comments, many=True).data),
+        "next": next_link,
+    }
+
+
+def cache_comment_section(tweet_id):
+    section = render_comment_section(tweet_id)
+    cache.set(
+        get_comment_section_cache_key(tweet_id),
+        section,
+        timeout=settings.COMMENT_SECTION_CACHE_TTL,
+    )
+    return section
@@ -0,0 +1,100 @@
+"""
+Comment threads loaded from the materialized path.
+
+Every comment stores ``path`` (``"<root id>/.../<own id>/"``) and ``depth``, so the
+subtree under a comment is the single indexed range query ``path LIKE '<path>%'``,
+bounded by depth. The rows are grouped by parent in memory and every level is paged
+on its own: each comment shows its newest ``COMMENT_TREE_PAGE_SIZE`` replies and a
+cursor to the rest, down to ``COMMENT_TREE_MAX_DEPTH`` levels below the requested
+comment.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.urls import reverse
+
+from config.pagination import KeysetPagination
+
+from .models import Comment
+
+
+def order_key(comment):
+    return comment.created_at, comment.pk
+
+
+class CommentTree:
+    """
+    The subtree under ``root`` down to ``max_depth`` levels. Comments at the bottom
+    link to their replies when their ``replies_count`` says they have some.
+
+    ``cursor`` is a ``(created_at, kind, id)`` position (see ``KeysetPagination``)
+    from which the replies of ``root`` itself continue.
+    """
+
+    def __init__(self, root, max_depth=None, page_size=None, cursor=None):
+        self.root = root
+        self.max_depth = max_depth or settings.COMMENT_TREE_MAX_DEPTH
+        self.page_size = page_size or settings.COMMENT_TREE_PAGE_SIZE
+        self.cursor = cursor
+
+        queryset = Comment.objects.filter(
+            path__startswith=root.path,
+            depth__gt=root.depth,
+            depth__lte=root.depth + self.max_depth,
+        ).select_related("user", "user__profile")
+
+        self.children = defaultdict(list)
+        for comment in queryset:
+            self.children[comment.parent_id].append(comment)
+        for replies in self.children.values():
+            replies.sort(key=order_key, reverse=True)
+
+    def _remaining(self, comment):
+        replies = self.children[comment.pk]
+        if comment.pk == self.root.pk and self.cursor is not None:
+            created_at, _, pk = self.cursor
+            replies = [
+                reply for reply in replies if order_key(reply) < (created_at, pk)
+            ]
+        return replies
+
+    def _is_leaf_level(self, comment):
+        return comment.depth - self.root.depth >= self.max_depth
+
+    def replies(self, comment):
+        """
+        The page of direct replies rendered under ``comment``.
+        """
+        if self._is_leaf_level(comment):
+            return []
+        return self._remaining(comment)[: self.page_size]
+
+    def next_position(self, comment):
+        """
+        Where the replies of ``comment`` continue: ``None`` when they are all shown,
+        ``()`` when none are (below the maximum depth), otherwise the position of the
+        last reply shown.
+        """
+        if self._is_leaf_level(comment):
+            return () if comment.replies_count else None
+        remaining = self._remaining(comment)
+        if len(remaining) > self.page_size:
+            last = remaining[self.page_size - 1]
+            return last.created_at, "", last.pk
+        return None
+
+
+def comment_replies_link(request, comment, position):
+    """
+    URL of the comment's thread, continuing after ``position`` if given. Absolute
+    when rendered for a request, a path in viewer-neutral cached bodies.
+    """
+    url = reverse(
+        "comment-details", kwargs={"pk": comment.tweet_id, "comment_id": comment.pk}
+    )
+    if request is not None:
+        url = request.build_absolute_uri(url)
+    if position:
+        url += f"?cursor={KeysetPagination().encode_cursor(position)}"
+    return url
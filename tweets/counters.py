@@ -0,0 +1,222 @@
+"""
+Engagement counters are written behind: every like, comment and retweet delta is
+applied with HINCRBY to a Redis hash per tweet, and a Celery beat task flushes the
+pending deltas to PostgreSQL in batched UPDATEs. Read paths overlay the pending
+deltas on top of the stored columns so counts stay fresh between flushes.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django_redis import get_redis_connection
+from .cache_utils import invalidate_post_cache
+from .models import Tweet, Like, Comment, Retweet
+
+COUNTER_FIELDS = ("likes_count", "comments_count", "retweets_count")
+
+DIRTY_TWEETS_KEY = "tweet_counters:dirty"
+FLUSHING_TWEETS_KEY = "tweet_counters:flushing"
+FLUSH_LOCK_KEY = "tweet_counters:flush_lock"
+
+
+def pending_counters_key(tweet_id):
+    return f"tweet_counters:pending:{tweet_id}"
+
+
+def flushing_counters_key(tweet_id):
+    return f"tweet_counters:flushing:{tweet_id}"
+
+
+def update_counter(tweet_id, field, delta):
+    """
+    Apply ``delta`` to one of the engagement counters of a tweet.
+
+    With ``TWEET_COUNTERS_WRITE_BEHIND`` the delta is buffered in Redis, otherwise
+    it is a single atomic ``SET field = field + delta`` UPDATE. Counters never go
+    below zero.
+    """
+    update_counters([(tweet_id, field, delta)])
+
+
+def update_counters(changes):
+    """
+    ``update_counter`` for many ``(tweet_id, field, delta)`` changes: one Redis
+    round trip with ``TWEET_COUNTERS_WRITE_BEHIND``, one UPDATE per tweet otherwise.
+    """
+    deltas = defaultdict(dict)
+    for tweet_id, field, delta in changes:
+        deltas[tweet_id][field] = deltas[tweet_id].get(field, 0) + delta
+    if not deltas:
+        return
+
+    if not settings.TWEET_COUNTERS_WRITE_BEHIND:
+        for tweet_id, fields in deltas.items():
+            Tweet.objects.filter(pk=tweet_id).update(
+                **{
+                    field: Greatest(F(field) + delta, 0)
+                    for field, delta in fields.items()
+                }
+            )
+        invalidate_post_cache("tweet", list(deltas))
+        return
+
+    pipe = get_redis_connection("default").pipeline()
+    for tweet_id, fields in deltas.items():
+        for field, delta in fields.items():
+            pipe.hincrby(pending_counters_key(tweet_id), field, delta)
+    pipe.sadd(DIRTY_TWEETS_KEY, *deltas)
+    pipe.execute()
+
+
+def apply_pending_deltas(tweets):
+    """
+    Overlay the not yet flushed deltas on the counters of the given Tweet instances,
+    in a single Redis round trip.
+    """
+    tweets = [tweet for tweet in tweets if tweet is not None]
+    if not settings.TWEET_COUNTERS_WRITE_BEHIND or not tweets:
+        return
+
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    for tweet in tweets:
+        pipe.hgetall(pending_counters_key(tweet.pk))
+        pipe.hgetall(flushing_counters_key(tweet.pk))
+    results = pipe.execute()
+
+    for index, tweet in enumerate(tweets):
+        for deltas in results[2 * index : 2 * index + 2]:
+            for field, delta in deltas.items():
+                field = field.decode()
+                setattr(tweet, field, max(0, getattr(tweet, field) + int(delta)))
+
+
+def _write_deltas(conn, tweet_ids):
+    """
+    Apply the deltas parked under the flushing keys of ``tweet_ids`` with one
+    batched UPDATE, then drop the keys and the cached payloads of the tweets.
+    """
+    pipe = conn.pipeline(transaction=False)
+    for tweet_id in tweet_ids:
+        pipe.hgetall(flushing_counters_key(tweet_id))
+    results = pipe.execute()
+
+    tweets = []
+    fields = set()
+    for tweet_id, deltas in zip(tweet_ids, results):
+        if not deltas:
+            continue
+        tweet = Tweet(pk=tweet_id)
+        for field, delta in deltas.items():
+            field = field.decode()
+            setattr(tweet, field, Greatest(F(field) + int(delta), 0))
+            fields.add(field)
+        tweets.append(tweet)
+
+    if tweets:
+        with transaction.atomic():
+            Tweet.objects.bulk_update(tweets, sorted(fields))
+
+    pipe = conn.pipeline()
+    for tweet_id in tweet_ids:
+        pipe.delete(flushing_counters_key(tweet_id))
+    pipe.srem(FLUSHING_TWEETS_KEY, *tweet_ids)
+    pipe.execute()
+
+    if tweets:
+        # Cached payloads carry the counts they were rendered with. Dropped only
+        # once the deltas are gone, a payload rendered in between would have them
+        # applied on top of the updated columns.
+        invalidate_post_cache("tweet", [tweet.pk for tweet in tweets])
+
+    return len(tweets)
+
+
+def flush_pending_counters(batch_size=None):
+    """
+    Flush buffered counter deltas to PostgreSQL, ``batch_size`` tweets per UPDATE.
+
+    Each batch is first moved from the pending keys to flushing keys (RENAME is
+    atomic, so increments racing with the flush land in a fresh pending key).
+    Batches left under flushing keys by a crashed worker are replayed first.
+    Delivery is at-least-once; reconcile_tweet_counters repairs any drift.
+
+    Returns the number of tweets updated.
+    """
+    batch_size = batch_size or settings.TWEET_COUNTERS_FLUSH_BATCH_SIZE
+    conn = get_redis_connection("default")
+
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=settings.TWEET_COUNTERS_FLUSH_LOCK_TTL):
+        return 0
+
+    try:
+        flushed = 0
+
+        # Crash recovery: replay batches a previous run did not finish.
+        leftover = [int(tweet_id) for tweet_id in conn.smembers(FLUSHING_TWEETS_KEY)]
+        for start in range(0, len(leftover), batch_size):
+            flushed += _write_deltas(conn, leftover[start : start + batch_size])
+
+        while True:
+            tweet_ids = [
+                int(tweet_id) for tweet_id in conn.spop(DIRTY_TWEETS_KEY, batch_size)
+            ]
+            if not tweet_ids:
+                break
+
+            pipe = conn.pipeline(transaction=False)
+            pipe.sadd(FLUSHING_TWEETS_KEY, *tweet_ids)
+            for tweet_id in tweet_ids:
+                pipe.rename(
+                    pending_counters_key(tweet_id), flushing_counters_key(tweet_id)
+                )
+            # A tweet already flushed by an earlier pop has no pending key to rename.
+            pipe.execute(raise_on_error=False)
+
+            flushed += _write_deltas(conn, tweet_ids)
+
+        return flushed
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _count_subquery(model, condition=Q()):
+    counts = (
+        model.objects.filter(condition, tweet=OuterRef("pk"))
+        .order_by()
+        .values("tweet")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def actual_counts():
+    """
+    The counter values as recomputed from the Like, Comment and Retweet tables.
+    """
+    return {
+        "likes_count": _count_subquery(Like),
+        "comments_count": _count_subquery(Comment, Q(parent=None)),
+        "retweets_count": _count_subquery(Retweet),
+    }
+
+
+def reconcile_counters(queryset=None):
+    """
+    Rewrite the counters of every tweet in ``queryset`` whose stored values drifted
+    from the source tables. Returns the number of tweets that were corrected.
+    """
+    queryset = Tweet.objects.all() if queryset is None else queryset
+    expected = {f"expected_{field}": value for field, value in actual_counts().items()}
+
+    drifted = queryset.annotate(**expected).filter(
+        ~Q(likes_count=F("expected_likes_count"))
+        | ~Q(comments_count=F("expected_comments_count"))
+        | ~Q(retweets_count=F("expected_retweets_count"))
+    )
+
+    return Tweet.objects.filter(pk__in=drifted.values("pk")).update(**actual_counts())
@@ -0,0 +1,219 @@
+from django.contrib.auth import get_user_model
+from django.db.models import CharField, Q, Value
+from .counters import apply_pending_deltas
+from .models import Tweet, Retweet
+from .search import search_query, tweet_search_vector, retweet_search_vector
+from .viewer_state import ViewerStateResolver
+
+User = get_user_model()
+
+
+def tweets_of(posts):
+    """
+    The tweet carrying the engagement data of each post: itself, or the retweeted one.
+    """
+    return [post if isinstance(post, Tweet) else post.tweet for post in posts]
+
+
+def prepare_tweets(tweets, viewer):
+    """
+    Overlay buffered counter deltas and the viewer's interaction flags before
+    serialization, with a constant number of queries per page.
+    """
+    tweets = list(tweets)
+    apply_pending_deltas(tweets)
+    ViewerStateResolver(viewer).attach(tweets)
+    return tweets
+
+
+def overlay_posts(data, viewer):
+    """
+    Copy serialized posts (``PostSerializer``/``FeedSerializer`` output) with the
+    viewer's interaction flags merged in. The input is left untouched, so it can be
+    a page cached once for every viewer.
+    """
+    posts = []
+    for post in data:
+        post = dict(post)
+        if post["type"] == "retweet":
+            post["original_tweet"] = dict(post["original_tweet"])
+        posts.append(post)
+
+    ViewerStateResolver(viewer).overlay(
+        post["original_tweet"] if post["type"] == "retweet" else post
+        for post in posts
+    )
+    return posts
+
+
+def hydrate_posts(rows, viewer):
+    """
+    Turn ``{"id", "created_at", "kind"}`` rows into Tweet/Retweet instances ready for
+    serialization, keeping the order of the rows. Costs at most one query per kind,
+    plus the viewer state lookups.
+    """
+    rows = list(rows)
+    tweet_ids = [row["id"] for row in rows if row["kind"] == "tweet"]
+    retweet_ids = [row["id"] for row in rows if row["kind"] == "retweet"]
+
+    posts = {}
+    if tweet_ids:
+        tweets = Tweet.objects.filter(id__in=tweet_ids).select_related(
+            "user", "user__profile"
+        )
+        posts.update({("tweet", t.id): t for t in tweets})
+    if retweet_ids:
+        retweets = Retweet.objects.filter(id__in=retweet_ids).select_related(
+            "user", "user__profile", "tweet", "tweet__user", "tweet__user__profile"
+        )
+        posts.update({("retweet", r.id): r for r in retweets})
+
+    prepare_tweets(tweets_of(posts.values()), viewer)
+
+    # Rows deleted between the id query and hydration are silently skipped.
+    return [
+        posts[(row["kind"], row["id"])]
+        for row in rows
+        if (row["kind"], row["id"]) in posts
+    ]
+
+
+class PostStream:
+    """
+    Chronological stream of tweets and retweets merged inside the database.
+
+    Both tables are reduced to a common ``(id, user_id, created_at, kind)`` projection
+    and combined with ``UNION ALL`` ordered by ``created_at``, so slicing the stream
+    (which is what the paginator does) only fetches and annotates the rows of the
+    requested page.
+    """
+
+    ordered = True
+
+    def __init__(self, tweets, retweets, viewer):
+        self.tweets = tweets
+        self.retweets = retweets
+        self.viewer = viewer
+
+    def _clone(self, tweets, retweets):
+        return PostStream(tweets, retweets, self.viewer)
+
+    def search(self, term):
+        if not term:
+            return self
+
+        # Text is matched by the full-text indexes (see tweets.search), authors by name.
+        query = search_query(term)
+        return self._clone(
+            self.tweets.annotate(search=tweet_search_vector()).filter(
+                Q(search=query) | Q(user__username__icontains=term)
+            ),
+            self.retweets.annotate(search=retweet_search_vector()).filter(
+                Q(search=query) | Q(user__username__icontains=term)
+            ),
+        )
+
+    def seek(self, created_at, kind, pk):
+        """
+        Restrict the stream to rows strictly after the ``(created_at, kind, id)`` position,
+        following the ``-created_at, -kind, -id`` ordering of ``rows()``.
+        """
+        return self._clone(
+            self._seek_side(self.tweets, "tweet", created_at, kind, pk),
+            self._seek_side(self.retweets, "retweet", created_at, kind, pk),
+        )
+
+    @staticmethod
+    def _seek_side(queryset, side_kind, created_at, kind, pk):
+        if side_kind == kind:
+            return queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        if side_kind < kind:
+            return queryset.filter(created_at__lte=created_at)
+
+        return queryset.filter(created_at__lt=created_at)
+
+    @staticmethod
+    def position(post):
+        kind = "tweet" if isinstance(post, Tweet) else "retweet"
+        return post.created_at, kind, post.pk
+
+    def rows(self):
+        tweets = (
+            self.tweets.order_by()
+            .annotate(kind=Value("tweet", output_field=CharField()))
+            .values("id", "user_id", "created_at", "kind")
+        )
+        retweets = (
+            self.retweets.order_by()
+            .annotate(kind=Value("retweet", output_field=CharField()))
+            .values("id", "user_id", "created_at", "kind")
+        )
+
+        return tweets.union(retweets, all=True).order_by("-created_at", "-kind", "-id")
+
+    def count(self):
+        return self.tweets.count() + self.retweets.count()
+
+    def slice_rows(self, start, stop):
+        return list(self.rows()[start:stop])
+
+    def refs(self):
+        return PostRefs(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return hydrate_posts(self.rows()[index], self.viewer)
+
+        return hydrate_posts([self.rows()[index]], self.viewer)[0]
+
+
+class PostRefs:
+    """
+    Paginator-compatible view of a post stream that yields the page's rows instead
+    of hydrated instances, for pages rendered from the post payload cache.
+    """
+
+    ordered = True
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def seek(self, created_at, kind, pk):
+        return PostRefs(self.stream.seek(created_at, kind, pk))
+
+    @staticmethod
+    def position(row):
+        return row["created_at"], row["kind"], row["id"]
+
+    def count(self):
+        return self.stream.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self.stream.slice_rows(index, index + 1)[0]
+
+        return self.stream.slice_rows(index.start or 0, index.stop)
+
+
+def feed_stream(user, exclude_authors=()):
+    """
+    Posts from the accounts ``user`` follows, plus the user's own posts.
+    """
+    following_users = User.objects.filter(followers__follower=user).exclude(
+        id__in=exclude_authors
+    )
+    authors = Q(user__in=following_users) | Q(user=user)
+
+    return PostStream(
+        Tweet.objects.filter(authors), Retweet.objects.filter(authors), viewer=user
+    )
+
+
+def user_posts_stream(author, viewer):
+    return PostStream(
+        Tweet.objects.filter(user=author),
+        Retweet.objects.filter(user=author),
+        viewer=viewer,
+    )
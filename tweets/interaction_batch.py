@@ -0,0 +1,146 @@
+"""
+Likes, retweets and bookmarks of many tweets applied in one request, for clients
+that replay actions queued while offline.
+
+A batch is written in one transaction with at most one ``INSERT ... ON CONFLICT DO
+NOTHING RETURNING`` and one ``DELETE ... RETURNING`` per relation, so every
+operation learns whether it changed anything. The side effects the signal
+receivers would run per row are applied once for the whole batch instead: counter
+deltas and viewer-state updates in one Redis pipeline each and notifications pushed
+to the delivery queue at once, all after the transaction commits, and the author's
+cached feed and user-posts pages invalidated once.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from config.upsert import delete_returning, insert_many
+from interactions.delivery import queue_notifications
+
+from .cache_utils import (
+    invalidate_feed_cache,
+    invalidate_post_cache,
+    invalidate_user_posts_cache,
+)
+from .counters import update_counters
+from .models import Tweet, Like, Retweet, Bookmark
+from .timelines import publish_post, unpublish_post
+from .viewer_state import update_viewer_states
+
+# action: (model, whether the row should exist afterwards)
+ACTIONS = {
+    "like": (Like, True),
+    "unlike": (Like, False),
+    "retweet": (Retweet, True),
+    "unretweet": (Retweet, False),
+    "bookmark": (Bookmark, True),
+    "unbookmark": (Bookmark, False),
+}
+VIEWER_FLAGS = {Like: "is_liked", Retweet: "is_retweeted", Bookmark: "is_bookmarked"}
+COUNTER_FIELDS = {Like: "likes_count", Retweet: "retweets_count"}
+
+CREATED = "created"
+DELETED = "deleted"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+
+
+def apply_interactions(user, operations):
+    """
+    Apply ``{"action", "tweet_id"}`` operations for ``user``. Returns one status per
+    operation, in order: ``created``, ``deleted``, ``unchanged`` (the row already
+    was in the requested state) or ``not_found`` (no such tweet).
+
+    Each ``(relation, tweet)`` pair may appear at most once per batch.
+    """
+    tweets = Tweet.objects.only("id", "user_id").in_bulk(
+        {operation["tweet_id"] for operation in operations}
+    )
+
+    statuses = [NOT_FOUND] * len(operations)
+    additions = defaultdict(dict)  # model -> {tweet_id: operation index}
+    removals = defaultdict(dict)
+    for index, operation in enumerate(operations):
+        if operation["tweet_id"] not in tweets:
+            continue
+        model, present = ACTIONS[operation["action"]]
+        (additions if present else removals)[model][operation["tweet_id"]] = index
+
+    created = {}
+    deleted = {}
+    with transaction.atomic():
+        for model, indexes in additions.items():
+            rows = insert_many(
+                model,
+                ["user", "tweet"],
+                [model(user=user, tweet=tweets[tweet_id]) for tweet_id in indexes],
+            )
+            created[model] = rows
+            for row in rows:
+                row.tweet = tweets[row.tweet_id]
+                statuses[indexes[row.tweet_id]] = CREATED
+
+        for model, indexes in removals.items():
+            rows = delete_returning(
+                model.objects.filter(user=user, tweet_id__in=list(indexes))
+            )
+            deleted[model] = rows
+            for row in rows:
+                row.tweet = tweets[row.tweet_id]
+                statuses[indexes[row.tweet_id]] = DELETED
+
+        for indexes in [*additions.values(), *removals.values()]:
+            for index in indexes.values():
+                if statuses[index] == NOT_FOUND:
+                    statuses[index] = UNCHANGED
+
+        _apply_side_effects(user, created, deleted)
+
+    return statuses
+
+
+def _apply_side_effects(user, created, deleted):
+    """
+    What the post_save/post_delete receivers do for single rows, for the batch.
+    """
+    changes = [(row, 1, True) for rows in created.values() for row in rows] + [
+        (row, -1, False) for rows in deleted.values() for row in rows
+    ]
+    if not changes:
+        return
+
+    counter_changes = [
+        (row.tweet_id, COUNTER_FIELDS[type(row)], delta)
+        for row, delta, _ in changes
+        if type(row) in COUNTER_FIELDS
+    ]
+    viewer_changes = [
+        (VIEWER_FLAGS[type(row)], row.tweet_id, present) for row, _, present in changes
+    ]
+    # Applied once the batch committed, like the notifications, so a rolled back
+    # batch leaves no counter delta or viewer flag behind.
+    transaction.on_commit(lambda: update_counters(counter_changes))
+    transaction.on_commit(lambda: update_viewer_states(user.id, viewer_changes))
+    queue_notifications(
+        [
+            (user.id, like.tweet.user_id, "liked", like.tweet)
+            for like in created.get(Like, [])
+        ]
+        + [
+            (user.id, retweet.tweet.user_id, "retweeted", retweet)
+            for retweet in created.get(Retweet, [])
+        ]
+    )
+
+    retweeted = created.get(Retweet, [])
+    unretweeted = deleted.get(Retweet, [])
+    for retweet in retweeted:
+        publish_post(retweet)
+    for retweet in unretweeted:
+        unpublish_post(retweet)
+    if unretweeted:
+        invalidate_post_cache("retweet", [retweet.id for retweet in unretweeted])
+    if retweeted or unretweeted:
+        invalidate_feed_cache(user.id)
+        invalidate_user_posts_cache(user.id)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from tweets.cache_utils import get_feed_invalidation_metrics
+
+
+class Command(BaseCommand):
+    help = "Show how many follower feed caches each write invalidated."
+
+    def handle(self, *args, **options):
+        metrics = get_feed_invalidation_metrics()
+
+        self.stdout.write(f"Writes: {metrics.get('writes', 0)}")
+        self.stdout.write(f"Feeds invalidated: {metrics.get('keys', 0)}")
+        self.stdout.write(f"Feeds per write: {metrics['keys_per_write']:.1f}")
+
+        sources = sorted(
+            field.split(":", 1)[1] for field in metrics if field.startswith("writes:")
+        )
+        for source in sources:
+            writes = metrics[f"writes:{source}"]
+            keys = metrics.get(f"keys:{source}", 0)
+            self.stdout.write(f"  {source}: {keys} feed(s) over {writes} write(s)")
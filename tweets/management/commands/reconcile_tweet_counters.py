@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from tweets.counters import flush_pending_counters, reconcile_counters
+from tweets.models import Tweet
+
+
+class Command(BaseCommand):
+    help = "Recompute likes_count, comments_count and retweets_count where they drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of tweets checked per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        # Buffered deltas would otherwise be applied on top of the corrected values.
+        flush_pending_counters()
+
+        fixed = 0
+        last_id = 0
+
+        while True:
+            ids = list(
+                Tweet.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            fixed += reconcile_counters(Tweet.objects.filter(pk__in=ids))
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} tweet(s)"))
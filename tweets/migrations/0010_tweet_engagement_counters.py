@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:13
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Tweet = apps.get_model("tweets", "Tweet")
+
+    def count_of(model_name, condition=Q()):
+        model = apps.get_model("tweets", model_name)
+        counts = (
+            model.objects.filter(condition, tweet=OuterRef("pk"))
+            .order_by()
+            .values("tweet")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Tweet.objects.update(
+        likes_count=count_of("Like"),
+        comments_count=count_of("Comment", Q(parent=None)),
+        retweets_count=count_of("Retweet"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0009_bookmark"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tweet",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tweet",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tweet",
+            name="retweets_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:46
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0010_tweet_engagement_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="retweet",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector("quote", config="english"),
+                name="retweet_quote_search_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tweet",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "content", config="english"
+                ),
+                name="tweet_content_search_idx",
+            ),
+        ),
+    ]
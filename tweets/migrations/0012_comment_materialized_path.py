@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Walk every thread from its top-level comment and fill path, depth and root.
+BACKFILL_SQL = """
+WITH RECURSIVE tree AS (
+    SELECT id, id::text || '/' AS path, 0 AS depth, id AS root_id
+    FROM tweets_comment
+    WHERE parent_id IS NULL
+    UNION ALL
+    SELECT child.id, tree.path || child.id::text || '/', tree.depth + 1, tree.root_id
+    FROM tweets_comment child
+    JOIN tree ON child.parent_id = tree.id
+)
+UPDATE tweets_comment
+SET path = tree.path, depth = tree.depth, root_id = tree.root_id
+FROM tree
+WHERE tweets_comment.id = tree.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0011_full_text_search_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="root",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="thread",
+                to="tweets.comment",
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["path"], name="comment_path_idx", opclasses=["text_pattern_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+UPDATE tweets_comment
+SET replies_count = replies.total
+FROM (
+    SELECT parent_id, COUNT(*) AS total
+    FROM tweets_comment
+    WHERE parent_id IS NOT NULL
+    GROUP BY parent_id
+) AS replies
+WHERE tweets_comment.id = replies.parent_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0012_comment_materialized_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="replies_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,21 +1,37 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
 
 # Create your models here.
 User = get_user_model()
 
+# Text search configuration of the full-text indexes, queries must use the same one.
+SEARCH_CONFIG = "english"
+
 
 class Tweet(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tweets")
     content = models.TextField(max_length=1000)
     image = models.ImageField(upload_to="tweets/", blank=True, null=True)
 
+    # Denormalized engagement counters, maintained by tweets.counters
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)  # Top-level comments only
+    retweets_count = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(
+                SearchVector("content", config=SEARCH_CONFIG),
+                name="tweet_content_search_idx",
+            )
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.content[:20]}"
@@ -35,6 +51,12 @@ class Retweet(models.Model):
                 fields=["user", "tweet"], name="unique_user_tweet_retweet"
             )
         ]
+        indexes = [
+            GinIndex(
+                SearchVector("quote", config=SEARCH_CONFIG),
+                name="retweet_quote_search_idx",
+            )
+        ]
 
     def __str__(self):
         return f"{self.user.profile.name} repost {self.tweet.content[:20]}"
@@ -69,14 +91,53 @@ class Comment(models.Model):
     content = models.TextField(max_length=500)
     image = models.ImageField(upload_to="comments/", blank=True, null=True)
 
+    # Materialized path ("<root id>/.../<own id>/"), depth and thread root, set on
+    # creation so a whole subtree is one prefix range query (see tweets.comment_tree)
+    path = models.TextField(default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    root = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="thread",
+    )
+
+    # Direct replies, maintained by tweets.signals.engagement_counters
+    replies_count = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # text_pattern_ops lets LIKE 'prefix%' use the index under any collation
+            models.Index(
+                fields=["path"], name="comment_path_idx", opclasses=["text_pattern_ops"]
+            )
+        ]
 
     def __str__(self):
         return f"{self.user.profile.name} comments on {self.tweet.content[:20]}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        self.depth = self.parent.depth + 1 if self.parent_id else 0
+        # A comment is never committed without its path and root.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            # The path ends with the comment's own id, known only after the insert.
+            parent_path = self.parent.path if self.parent_id else ""
+            self.path = f"{parent_path}{self.pk}/"
+            self.root_id = self.parent.root_id if self.parent_id else self.pk
+            Comment.objects.filter(pk=self.pk).update(
+                path=self.path, root_id=self.root_id
+            )
+
     def clean(self):
         if not self.content and not self.image:
             raise ValidationError("A comment must have a content, an image or both")
@@ -1,6 +1,6 @@
 from rest_framework import permissions
-from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from config.identity_map import get_instance_or_404
 from .models import Tweet, Comment
 
 
@@ -15,9 +15,8 @@ class IsTweetAuthor(permissions.BasePermission):
     message = "You must be the author of this tweet to view its likes."
 
     def has_permission(self, request, view):
-        tweet_pk = view.kwargs.get("pk")
-        tweet = get_object_or_404(Tweet, pk=tweet_pk)
-        return tweet.user == request.user
+        tweet = get_instance_or_404(request, Tweet, view.kwargs.get("pk"))
+        return tweet.user_id == request.user.id
 
 
 class IsCommentOwner(permissions.BasePermission):
@@ -0,0 +1,146 @@
+"""
+Per-post payload cache.
+
+Feed and user-post pages are cached as short lists of post references, while every
+rendered tweet and retweet is cached once under its own key and shared by all pages
+and viewers. A page is hydrated with a single MGET of those payloads, and only the
+misses are read from the database.
+
+A retweet payload references its original tweet instead of embedding it, so editing
+a tweet or flushing its counters only drops that tweet's own payload.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_utils import get_post_cache_key
+from .counters import apply_pending_deltas
+from .models import Tweet, Retweet
+from .serializers import PostSerializer
+
+
+def row_ref(row):
+    """
+    Reference of a stream row; the original tweet of a retweet is not known yet.
+    """
+    if row["kind"] == "tweet":
+        return ["tweet", row["id"], row["id"]]
+    return ["retweet", row["id"], None]
+
+
+def post_ref(post):
+    """
+    Reference of a rendered post, as stored in cached pages.
+    """
+    if post["type"] == "tweet":
+        return ["tweet", post["id"], post["id"]]
+    return ["retweet", post["id"], post["original_tweet"]["id"]]
+
+
+def _render_tweet(tweet):
+    return dict(PostSerializer(tweet).data)
+
+
+def _render_retweet(retweet):
+    data = dict(PostSerializer(retweet).data)
+    del data["original_tweet"]
+    data["tweet_id"] = retweet.tweet_id
+    return data
+
+
+def _compose_retweet(retweet, tweet):
+    return {
+        "id": retweet["id"],
+        "type": "retweet",
+        "author": retweet["author"],
+        "quote": retweet["quote"],
+        "original_tweet": {key: value for key, value in tweet.items() if key != "type"},
+        "created_at": retweet["created_at"],
+    }
+
+
+def _get_cached(kind, post_ids):
+    keys = {get_post_cache_key(kind, post_id): post_id for post_id in post_ids}
+    return {keys[key]: payload for key, payload in cache.get_many(keys).items()}
+
+
+def load_posts(refs):
+    """
+    Rendered posts (``PostSerializer`` output without viewer flags) for
+    ``[kind, id, tweet_id]`` references, in order. Posts deleted in the meantime
+    are skipped.
+
+    Costs one MGET when every payload is cached, and at most one query per kind
+    for the misses, which are then cached for ``POST_CACHE_TTL``.
+    """
+    refs = [tuple(ref) for ref in refs]
+    tweet_ids = {tweet_id for _, _, tweet_id in refs if tweet_id is not None}
+    retweet_ids = {post_id for kind, post_id, _ in refs if kind == "retweet"}
+
+    keys = [get_post_cache_key("tweet", tweet_id) for tweet_id in tweet_ids]
+    keys += [get_post_cache_key("retweet", retweet_id) for retweet_id in retweet_ids]
+    cached = cache.get_many(keys)
+
+    tweets = {
+        tweet_id: cached[get_post_cache_key("tweet", tweet_id)]
+        for tweet_id in tweet_ids
+        if get_post_cache_key("tweet", tweet_id) in cached
+    }
+    retweets = {
+        retweet_id: cached[get_post_cache_key("retweet", retweet_id)]
+        for retweet_id in retweet_ids
+        if get_post_cache_key("retweet", retweet_id) in cached
+    }
+
+    # Pages read straight from a stream do not know the originals of their retweets.
+    unknown = {retweet["tweet_id"] for retweet in retweets.values()} - tweet_ids
+    if unknown:
+        tweets.update(_get_cached("tweet", unknown))
+        tweet_ids |= unknown
+
+    fresh = {}
+    missing_retweets = retweet_ids - retweets.keys()
+    if missing_retweets:
+        queryset = Retweet.objects.filter(id__in=missing_retweets).select_related(
+            "user", "user__profile", "tweet", "tweet__user", "tweet__user__profile"
+        )
+        originals = {}
+        for retweet in queryset:
+            retweets[retweet.id] = fresh[get_post_cache_key("retweet", retweet.id)] = (
+                _render_retweet(retweet)
+            )
+            if retweet.tweet_id not in tweets:
+                originals[retweet.tweet_id] = retweet.tweet
+
+        apply_pending_deltas(originals.values())
+        for tweet in originals.values():
+            tweets[tweet.id] = fresh[get_post_cache_key("tweet", tweet.id)] = (
+                _render_tweet(tweet)
+            )
+
+    tweet_ids |= {retweet["tweet_id"] for retweet in retweets.values()}
+    missing_tweets = tweet_ids - tweets.keys()
+    if missing_tweets:
+        queryset = Tweet.objects.filter(id__in=missing_tweets).select_related(
+            "user", "user__profile"
+        )
+        fetched = list(queryset)
+        apply_pending_deltas(fetched)
+        for tweet in fetched:
+            tweets[tweet.id] = fresh[get_post_cache_key("tweet", tweet.id)] = (
+                _render_tweet(tweet)
+            )
+
+    if fresh:
+        cache.set_many(fresh, timeout=settings.POST_CACHE_TTL)
+
+    posts = []
+    for kind, post_id, _ in refs:
+        if kind == "tweet" and post_id in tweets:
+            posts.append(tweets[post_id])
+        elif kind == "retweet" and post_id in retweets:
+            retweet = retweets[post_id]
+            if retweet["tweet_id"] in tweets:
+                posts.append(_compose_retweet(retweet, tweets[retweet["tweet_id"]]))
+
+    return posts
@@ -0,0 +1,85 @@
+"""
+Full-text search over tweet contents and retweet quotes.
+
+Both columns carry a GIN expression index on ``to_tsvector(SEARCH_CONFIG, column)``
+(see the model Meta), so matching happens inside PostgreSQL. The vectors built here
+must stay identical to the indexed expressions for the planner to use the indexes.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import CharField, Value
+
+from .models import Tweet, Retweet, SEARCH_CONFIG
+
+
+def tweet_search_vector():
+    return SearchVector("content", config=SEARCH_CONFIG)
+
+
+def retweet_search_vector():
+    return SearchVector("quote", config=SEARCH_CONFIG)
+
+
+def search_query(term):
+    # websearch syntax: quoted phrases, "or" and "-excluded" words, never a syntax error.
+    return SearchQuery(term, config=SEARCH_CONFIG, search_type="websearch")
+
+
+def match_tweets(queryset, term):
+    return queryset.annotate(search=tweet_search_vector()).filter(
+        search=search_query(term)
+    )
+
+
+def match_retweets(queryset, term):
+    return queryset.annotate(search=retweet_search_vector()).filter(
+        search=search_query(term)
+    )
+
+
+class SearchStream:
+    """
+    Tweets and retweet quotes matching a search, ranked with ``ts_rank`` and merged
+    with ``UNION ALL``. Slicing returns ``{"id", "user_id", "created_at", "kind"}``
+    rows, like ``PostStream.rows()``; newer posts win ties in rank.
+    """
+
+    ordered = True
+
+    def __init__(self, term, tweets=None, retweets=None):
+        self.term = term
+        self.tweets = match_tweets(
+            Tweet.objects.all() if tweets is None else tweets, term
+        )
+        self.retweets = match_retweets(
+            Retweet.objects.all() if retweets is None else retweets, term
+        )
+
+    def rows(self):
+        query = search_query(self.term)
+        tweets = (
+            self.tweets.order_by()
+            .annotate(
+                kind=Value("tweet", output_field=CharField()),
+                rank=SearchRank(tweet_search_vector(), query),
+            )
+            .values("id", "user_id", "created_at", "kind", "rank")
+        )
+        retweets = (
+            self.retweets.order_by()
+            .annotate(
+                kind=Value("retweet", output_field=CharField()),
+                rank=SearchRank(retweet_search_vector(), query),
+            )
+            .values("id", "user_id", "created_at", "kind", "rank")
+        )
+
+        return tweets.union(retweets, all=True).order_by(
+            "-rank", "-created_at", "-kind", "-id"
+        )
+
+    def count(self):
+        return self.tweets.count() + self.retweets.count()
+
+    def __getitem__(self, index):
+        return self.rows()[index]
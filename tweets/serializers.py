@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import Tweet, Like, Comment, Retweet, Bookmark
+from .comment_tree import comment_replies_link
+from .interaction_batch import ACTIONS
 
 User = get_user_model()
 
@@ -74,9 +77,9 @@ class FeedSerializer(serializers.Serializer):
                 "author": AuthorSerializer(instance.user).data,
                 "content": instance.content,
                 "image": instance.image.url if instance.image else None,
-                "likes_count": getattr(instance, "likes_count", 0),
-                "comments_count": getattr(instance, "comments_count", 0),
-                "retweets_count": getattr(instance, "retweets_count", 0),
+                "likes_count": instance.likes_count,
+                "comments_count": instance.comments_count,
+                "retweets_count": instance.retweets_count,
                 "is_liked": getattr(instance, "is_liked", False),
                 "is_retweeted": getattr(instance, "is_retweeted", False),
                 "is_bookmarked": getattr(instance, "is_bookmarked", False),
@@ -89,12 +92,12 @@ class FeedSerializer(serializers.Serializer):
                 "author": AuthorSerializer(instance.tweet.user).data,
                 "content": instance.tweet.content,
                 "image": instance.tweet.image.url if instance.tweet.image else None,
-                "likes_count": getattr(instance, "tweet_likes_count", 0),
-                "comments_count": getattr(instance, "tweet_comments_count", 0),
-                "retweets_count": getattr(instance, "tweet_retweets_count", 0),
-                "is_liked": getattr(instance, "tweet_is_liked", False),
-                "is_retweeted": getattr(instance, "tweet_is_retweeted", False),
-                "is_bookmarked": getattr(instance, "tweet_is_bookmarked", False),
+                "likes_count": instance.tweet.likes_count,
+                "comments_count": instance.tweet.comments_count,
+                "retweets_count": instance.tweet.retweets_count,
+                "is_liked": getattr(instance.tweet, "is_liked", False),
+                "is_retweeted": getattr(instance.tweet, "is_retweeted", False),
+                "is_bookmarked": getattr(instance.tweet, "is_bookmarked", False),
                 "created_at": instance.tweet.created_at,
             }
 
@@ -122,9 +125,9 @@ class PostSerializer(serializers.Serializer):
                 "author": AuthorSerializer(instance.user).data,
                 "content": instance.content,
                 "image": instance.image.url if instance.image else None,
-                "likes_count": getattr(instance, "likes_count", 0),
-                "comments_count": getattr(instance, "comments_count", 0),
-                "retweets_count": getattr(instance, "retweets_count", 0),
+                "likes_count": instance.likes_count,
+                "comments_count": instance.comments_count,
+                "retweets_count": instance.retweets_count,
                 "is_liked": getattr(instance, "is_liked", False),
                 "is_retweeted": getattr(instance, "is_retweeted", False),
                 "is_bookmarked": getattr(instance, "is_bookmarked", False),
@@ -137,12 +140,12 @@ class PostSerializer(serializers.Serializer):
                 "author": AuthorSerializer(instance.tweet.user).data,
                 "content": instance.tweet.content,
                 "image": instance.tweet.image.url if instance.tweet.image else None,
-                "likes_count": getattr(instance, "tweet_likes_count", 0),
-                "comments_count": getattr(instance, "tweet_comments_count", 0),
-                "retweets_count": getattr(instance, "tweet_retweets_count", 0),
-                "is_liked": getattr(instance, "tweet_is_liked", False),
-                "is_retweeted": getattr(instance, "tweet_is_retweeted", False),
-                "is_bookmarked": getattr(instance, "tweet_is_bookmarked", False),
+                "likes_count": instance.tweet.likes_count,
+                "comments_count": instance.tweet.comments_count,
+                "retweets_count": instance.tweet.retweets_count,
+                "is_liked": getattr(instance.tweet, "is_liked", False),
+                "is_retweeted": getattr(instance.tweet, "is_retweeted", False),
+                "is_bookmarked": getattr(instance.tweet, "is_bookmarked", False),
                 "created_at": instance.tweet.created_at,
             }
 
@@ -160,17 +163,24 @@ class PostSerializer(serializers.Serializer):
 
 class RetrieveTweetSerializer(serializers.ModelSerializer):
     user = serializers.CharField(source="user.profile.name", read_only=True)
-    comments = serializers.SerializerMethodField(read_only=True)
     likes_count = serializers.IntegerField(read_only=True)
+    # Viewer flags are merged by the view on top of the shared cached body.
+    is_liked = serializers.BooleanField(read_only=True)
+    is_retweeted = serializers.BooleanField(read_only=True)
+    is_bookmarked = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Tweet
-        fields = ["user", "content", "image", "likes_count", "comments", "created_at"]
-
-    def get_comments(self, obj):
-        all_comments = obj.comments.all()
-        queryset = [c for c in all_comments if c.parent_id is None]
-        return CommentSerializer(queryset, many=True).data
+        fields = [
+            "user",
+            "content",
+            "image",
+            "likes_count",
+            "is_liked",
+            "is_retweeted",
+            "is_bookmarked",
+            "created_at",
+        ]
 
 
 class RetweetSerializer(serializers.ModelSerializer):
@@ -182,20 +192,6 @@ class RetweetSerializer(serializers.ModelSerializer):
         model = Retweet
         fields = ["id", "type", "author", "quote", "tweet", "created_at"]
 
-    def validate(self, attrs):
-        user = self.context["user"]
-        tweet = self.context["tweet"]
-
-        if Retweet.objects.filter(user=user, tweet=tweet).exists():
-            raise serializers.ValidationError(
-                {
-                    "error": "already_retweeted",
-                    "detail": "You have already retweeted this tweet. Use DELETE to unretweet.",
-                }
-            )
-
-        return attrs
-
     def get_type(self, obj):
         return "retweet"
 
@@ -203,42 +199,21 @@ class RetweetSerializer(serializers.ModelSerializer):
         return AuthorSerializer(obj.user).data
 
     def get_tweet(self, obj):
-        tweet = obj.tweet
-        tweet.likes_count = getattr(obj, "tweet_likes_count", 0)
-        tweet.comments_count = getattr(obj, "tweet_comments_count", 0)
-        tweet.retweets_count = getattr(obj, "tweet_retweets_count", 0)
-        tweet.is_liked = getattr(obj, "tweet_is_liked", False)
-        tweet.is_retweeted = getattr(obj, "tweet_is_retweeted", False)
-        tweet.is_bookmarked = getattr(obj, "tweet_is_bookmarked", False)
-        return OriginalTweetSerializer(tweet).data
+        return OriginalTweetSerializer(obj.tweet).data
 
 
 class LikeTweetSerializer(serializers.ModelSerializer):
     user = AuthorSerializer(read_only=True)
-    tweet_id = serializers.IntegerField(source="tweet.id", read_only=True)
+    tweet_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Like
         fields = ["id", "user", "tweet_id", "created_at"]
 
-    def validate(self, attrs):
-        user = self.context["request"].user
-        tweet = self.context["tweet"]
-
-        if Like.objects.filter(user=user, tweet=tweet).exists():
-            raise serializers.ValidationError(
-                {
-                    "error": "already_liked",
-                    "detail": "You have already liked this tweet. Use DELETE to unlike.",
-                }
-            )
-
-        return attrs
-
 
 class CommentOnTweetSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField(read_only=True)
-    tweet_id = serializers.IntegerField(source="tweet.id", read_only=True)
+    tweet_id = serializers.IntegerField(read_only=True)
     parent = serializers.PrimaryKeyRelatedField(
         queryset=Comment.objects.all(), required=False, allow_null=True
     )
@@ -288,9 +263,11 @@ class CommentOnTweetSerializer(serializers.ModelSerializer):
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField(read_only=True)
     parent = serializers.PrimaryKeyRelatedField(read_only=True)
-    tweet_id = serializers.IntegerField(source="tweet.id", read_only=True)
-    replies_count = serializers.SerializerMethodField(read_only=True)
+    tweet_id = serializers.IntegerField(read_only=True)
+    replies_count = serializers.IntegerField(read_only=True)
     replies = serializers.SerializerMethodField(read_only=True)
+    has_more_replies = serializers.SerializerMethodField(read_only=True)
+    replies_next = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Comment
@@ -303,30 +280,74 @@ class CommentSerializer(serializers.ModelSerializer):
             "image",
             "replies_count",
             "replies",
+            "has_more_replies",
+            "replies_next",
             "created_at",
         ]
 
     def get_author(self, obj):
         return AuthorSerializer(obj.user).data
 
-    def get_replies_count(self, obj):
-        return getattr(obj, "replies_count", 0)
+    def _reply_preview(self, obj):
+        # Set by prefetch_reply_previews(): the newest replies plus one, if any more.
+        return getattr(obj, "reply_preview", None)
 
     def get_replies(self, obj):
 
         if self.context.get("skip_replies", False):
             return []
 
-        queryset = obj.replies.all()
-
-        # If full_depth is True (detail view), allow unlimited recursion
-        if self.context.get("full_depth", False):
-            return CommentSerializer(queryset, many=True, context=self.context).data
+        preview = self._reply_preview(obj)
+        if preview is None:
+            queryset = obj.replies.all()
+        else:
+            queryset = preview[: settings.COMMENT_REPLY_PREVIEW_SIZE]
 
+        # Threads are rendered by CommentThreadSerializer, lists show one level.
         return CommentSerializer(
             queryset, many=True, context={**self.context, "skip_replies": True}
         ).data
 
+    def get_has_more_replies(self, obj):
+        if self.context.get("skip_replies", False):
+            return None  # Replies of nested replies are not loaded.
+
+        preview = self._reply_preview(obj)
+        return (
+            preview is not None and len(preview) > settings.COMMENT_REPLY_PREVIEW_SIZE
+        )
+
+    def get_replies_next(self, obj):
+        request = self.context.get("request")
+        if self.context.get("skip_replies", False):
+            return comment_replies_link(request, obj, None)
+
+        if not self.get_has_more_replies(obj):
+            return None
+        last = self._reply_preview(obj)[settings.COMMENT_REPLY_PREVIEW_SIZE - 1]
+        return comment_replies_link(request, obj, (last.created_at, "", last.pk))
+
+
+class CommentThreadSerializer(CommentSerializer):
+    """
+    A comment with its replies laid out by a ``CommentTree`` (``context["tree"]``):
+    one page per level down to the maximum depth, and ``replies_next`` linking to
+    the rest of each level.
+    """
+
+    def get_replies(self, obj):
+        replies = self.context["tree"].replies(obj)
+        return CommentThreadSerializer(replies, many=True, context=self.context).data
+
+    def get_has_more_replies(self, obj):
+        return self.context["tree"].next_position(obj) is not None
+
+    def get_replies_next(self, obj):
+        position = self.context["tree"].next_position(obj)
+        if position is None:
+            return None
+        return comment_replies_link(self.context["request"], obj, position)
+
 
 class BookmarkSerializer(serializers.ModelSerializer):
     user = AuthorSerializer(read_only=True)
@@ -339,15 +360,34 @@ class BookmarkSerializer(serializers.ModelSerializer):
 
 class BookmarkedTweetSerializer(serializers.Serializer):
     def to_representation(self, instance):
-        tweet = instance.tweet
-        tweet.likes_count = getattr(instance, "likes_count", 0)
-        tweet.comments_count = getattr(instance, "comments_count", 0)
-        tweet.retweets_count = getattr(instance, "retweets_count", 0)
-        tweet.is_liked = getattr(instance, "is_liked", False)
-        tweet.is_retweeted = getattr(instance, "is_retweeted", False)
-        tweet.is_bookmarked = True
-
-        data = OriginalTweetSerializer(tweet).data
+        data = OriginalTweetSerializer(instance.tweet).data
         data["bookmarked_at"] = instance.created_at
 
         return data
+
+
+class InteractionOperationSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=list(ACTIONS))
+    tweet_id = serializers.IntegerField()
+
+
+class InteractionBatchSerializer(serializers.Serializer):
+    operations = InteractionOperationSerializer(
+        many=True, allow_empty=False, max_length=settings.INTERACTION_BATCH_MAX_SIZE
+    )
+
+    def validate(self, attrs):
+        seen = set()
+        for operation in attrs["operations"]:
+            model, _ = ACTIONS[operation["action"]]
+            key = (model, operation["tweet_id"])
+            if key in seen:
+                raise serializers.ValidationError(
+                    {
+                        "error": "conflicting_operations",
+                        "detail": f"Tweet {operation['tweet_id']} has more than one {model._meta.model_name} operation.",
+                    }
+                )
+            seen.add(key)
+
+        return attrs
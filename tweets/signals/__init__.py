@@ -1,8 +1,10 @@
 from . import (
-    tweet_mentions,
-    retweet_mentions,
-    comment_mentions,
+    mentions,
     notify_post_comment,
     notify_post_retweet,
     notify_post_like,
+    engagement_counters,
+    viewer_state,
+    comment_section,
+    timelines,
 )
@@ -0,0 +1,6 @@
+def deleted_with(origin, model):
+    """
+    Whether a ``post_delete`` is part of a cascade started by deleting ``model``
+    rows. ``origin`` is the instance or queryset whose deletion sent the signal.
+    """
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
@@ -0,0 +1,24 @@
+from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from tweets.models import Comment
+from tweets.cache_utils import invalidate_comment_section_cache
+
+
+def defer_invalidation(tweet_id):
+    """
+    Invalidate once the transaction commits, so a section read in between cannot
+    cache the rows from before the write again.
+    """
+    transaction.on_commit(lambda: invalidate_comment_section_cache(tweet_id))
+
+
+@receiver(post_save, sender=Comment)
+def on_comment_saved(sender, instance, **kwargs):
+    # Replies change the previews and replies_count shown in the section too.
+    defer_invalidation(instance.tweet_id)
+
+
+@receiver(post_delete, sender=Comment)
+def on_comment_deleted(sender, instance, **kwargs):
+    defer_invalidation(instance.tweet_id)
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_save, post_delete, pre_delete
+from tweets.models import Tweet, Like, Comment, Retweet
+from tweets.counters import update_counter, update_counters
+from .cascade import deleted_with
+
+User = get_user_model()
+
+
+def defer_counter(tweet_id, field, delta, origin=None):
+    """
+    Apply a counter change once the transaction commits, so a rolled back write
+    leaves no delta behind. For a deleted row, nothing is applied when the tweet
+    itself is deleted, and the changes of a deleted user are applied together by
+    ``on_user_deleted``.
+    """
+    if deleted_with(origin, Tweet) or deleted_with(origin, User):
+        return
+    transaction.on_commit(lambda: update_counter(tweet_id, field, delta))
+
+
+@receiver(post_save, sender=Like)
+def on_like_created(sender, instance, created, **kwargs):
+    if created:
+        defer_counter(instance.tweet_id, "likes_count", 1)
+
+
+@receiver(post_delete, sender=Like)
+def on_like_deleted(sender, instance, origin=None, **kwargs):
+    defer_counter(instance.tweet_id, "likes_count", -1, origin)
+
+
+@receiver(post_save, sender=Comment)
+def on_comment_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    if instance.parent_id is None:
+        defer_counter(instance.tweet_id, "comments_count", 1)
+    else:
+        Comment.objects.filter(pk=instance.parent_id).update(
+            replies_count=F("replies_count") + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def on_comment_deleted(sender, instance, origin=None, **kwargs):
+    if instance.parent_id is None:
+        defer_counter(instance.tweet_id, "comments_count", -1, origin)
+    elif not deleted_with(origin, Tweet):
+        # A no-op when the parent is deleted in the same cascade.
+        Comment.objects.filter(pk=instance.parent_id, replies_count__gt=0).update(
+            replies_count=F("replies_count") - 1
+        )
+
+
+@receiver(post_save, sender=Retweet)
+def on_retweet_created(sender, instance, created, **kwargs):
+    if created:
+        defer_counter(instance.tweet_id, "retweets_count", 1)
+
+
+@receiver(post_delete, sender=Retweet)
+def on_retweet_deleted(sender, instance, origin=None, **kwargs):
+    defer_counter(instance.tweet_id, "retweets_count", -1, origin)
+
+
+@receiver(pre_delete, sender=User)
+def on_user_deleted(sender, instance, **kwargs):
+    """
+    The counter changes of the likes, retweets and comments a user leaves on other
+    users' tweets, applied in one batch once the deletion commits.
+    """
+    changes = []
+    for queryset, field in [
+        (Like.objects.all(), "likes_count"),
+        (Retweet.objects.all(), "retweets_count"),
+        (Comment.objects.filter(parent=None), "comments_count"),
+    ]:
+        changes += [
+            (tweet_id, field, -count)
+            for tweet_id, count in queryset.filter(user=instance)
+            .exclude(tweet__user=instance)
+            .values("tweet_id")
+            .annotate(count=Count("id"))
+            .values_list("tweet_id", "count")
+        ]
+    if changes:
+        transaction.on_commit(lambda: update_counters(changes))
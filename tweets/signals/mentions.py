@@ -0,0 +1,22 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save
+from tweets.models import Tweet, Comment, Retweet
+from interactions.mentions import queue_mentions
+
+
+@receiver(post_save, sender=Tweet)
+def handle_tweet_mentions(sender, instance, created, **kwargs):
+    if created:
+        queue_mentions(instance.user_id, instance, instance.content)
+
+
+@receiver(post_save, sender=Comment)
+def handle_comment_mentions(sender, instance, created, **kwargs):
+    if created:
+        queue_mentions(instance.user_id, instance, instance.content)
+
+
+@receiver(post_save, sender=Retweet)
+def handle_retweet_mentions(sender, instance, created, **kwargs):
+    if created:
+        queue_mentions(instance.user_id, instance, instance.quote)
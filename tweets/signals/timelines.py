@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from relationships.models import Follow
+from tweets.models import Tweet, Retweet
+from tweets.timelines import unpublish_post
+from .cascade import deleted_with
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Retweet)
+def on_retweet_cascaded(sender, instance, origin=None, **kwargs):
+    """
+    Retweets deleted along with their tweet, or with the tweet's author, are taken
+    out of their retweeters' followers' timelines. The retweets of a deleted user
+    go with the rest of their posts, see ``on_user_deleted``.
+    """
+    if deleted_with(origin, Tweet):
+        unpublish_post(instance)
+    elif deleted_with(origin, User) and instance.user_id != getattr(origin, "pk", None):
+        unpublish_post(instance)
+
+
+@receiver(pre_delete, sender=User)
+def on_user_deleted(sender, instance, **kwargs):
+    """
+    Purge a deleted user's tweets and retweets from their followers' timelines.
+    The followers are read now, their ``Follow`` rows are deleted with the user.
+    """
+    from tweets.tasks import purge_author_from_timelines_task
+
+    author_id = instance.id
+    follower_ids = list(
+        Follow.objects.filter(following_id=author_id).values_list(
+            "follower_id", flat=True
+        )
+    )
+    if follower_ids:
+        transaction.on_commit(
+            lambda: purge_author_from_timelines_task.delay(author_id, follower_ids)
+        )
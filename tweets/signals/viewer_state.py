@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from tweets.models import Tweet, Like, Retweet, Bookmark
+from tweets.viewer_state import update_viewer_state
+from .cascade import deleted_with
+
+User = get_user_model()
+
+
+def defer_update(instance, flag, present, origin=None):
+    """
+    Add a created row to the viewer's set, or remove a deleted one, once the
+    transaction commits, so a rolled back write leaves no flag behind. Deletions
+    cascading from the tweet or the user are skipped: the flags of a deleted tweet
+    are never read again and the sets of a deleted user expire on their own.
+    """
+    if deleted_with(origin, Tweet) or deleted_with(origin, User):
+        return
+    user_id, tweet_id = instance.user_id, instance.tweet_id
+    transaction.on_commit(lambda: update_viewer_state(user_id, flag, tweet_id, present))
+
+
+@receiver(post_save, sender=Like)
+def on_like_created(sender, instance, created, **kwargs):
+    if created:
+        defer_update(instance, "is_liked", True)
+
+
+@receiver(post_delete, sender=Like)
+def on_like_deleted(sender, instance, origin=None, **kwargs):
+    defer_update(instance, "is_liked", False, origin)
+
+
+@receiver(post_save, sender=Retweet)
+def on_retweet_created(sender, instance, created, **kwargs):
+    if created:
+        defer_update(instance, "is_retweeted", True)
+
+
+@receiver(post_delete, sender=Retweet)
+def on_retweet_deleted(sender, instance, origin=None, **kwargs):
+    defer_update(instance, "is_retweeted", False, origin)
+
+
+@receiver(post_save, sender=Bookmark)
+def on_bookmark_created(sender, instance, created, **kwargs):
+    if created:
+        defer_update(instance, "is_bookmarked", True)
+
+
+@receiver(post_delete, sender=Bookmark)
+def on_bookmark_deleted(sender, instance, origin=None, **kwargs):
+    defer_update(instance, "is_bookmarked", False, origin)
@@ -1,37 +1,127 @@
 from celery import shared_task
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
-from tweets.models import Tweet
-from interactions.models import Mention
-import re
+from django.core.cache import cache
+from tweets.models import Tweet, Retweet
+from tweets.counters import flush_pending_counters
+from tweets.cache_utils import (
+    bulk_invalidate_feed_cache,
+    invalidate_celebrity_feeds,
+    record_feed_invalidation,
+)
+from tweets.timelines import (
+    CELEBRITIES_KEY,
+    CELEBRITIES_REFRESH_SCHEDULED_KEY,
+    backfill_timelines,
+    count_celebrity_ids,
+    is_celebrity,
+    purge_author_from_timelines,
+    push_to_timelines,
+    remove_from_timelines,
+)
+from tweets.viewer_state import warm_viewer_state
+from relationships.models import Follow
+
+
+def follower_id_batches(author_id):
+    follower_ids = Follow.objects.filter(following_id=author_id).values_list(
+        "follower_id", flat=True
+    )
+    batch = []
+    for follower_id in follower_ids.iterator(
+        chunk_size=settings.TIMELINE_FANOUT_BATCH_SIZE
+    ):
+        batch.append(follower_id)
+        if len(batch) == settings.TIMELINE_FANOUT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-User = get_user_model()
 
 @shared_task
-def parse_mentions_task(tweet_id):
+def fan_out_post_task(kind, post_id):
+    model = Tweet if kind == "tweet" else Retweet
     try:
-        tweet = Tweet.objects.get(id=tweet_id)
-    except Tweet.DoesNotExist:
+        post = model.objects.get(id=post_id)
+    except model.DoesNotExist:
         return
 
-    if not tweet.content:
-        return
+    if is_celebrity(post.user_id):
+        # Celebrity posts are pulled by their followers at read time, and their
+        # cached feed pages are keyed on the author's version.
+        invalidated = invalidate_celebrity_feeds(post.user_id)
+    else:
+        invalidated = 0
+        for batch in follower_id_batches(post.user_id):
+            push_to_timelines(batch, kind, post.id, post.user_id, post.created_at)
+            # Cached feed pages are dropped only once the post is in the timelines.
+            invalidated += bulk_invalidate_feed_cache(batch)
+
+    record_feed_invalidation(f"{kind}_created", invalidated)
+    return invalidated
+
+
+@shared_task
+def remove_post_from_timelines_task(kind, post_id, author_id):
+    if is_celebrity(author_id):
+        invalidated = invalidate_celebrity_feeds(author_id)
+    else:
+        invalidated = 0
+        for batch in follower_id_batches(author_id):
+            remove_from_timelines(batch, kind, post_id, author_id)
+            invalidated += bulk_invalidate_feed_cache(batch)
+
+    record_feed_invalidation(f"{kind}_deleted", invalidated)
+    return invalidated
+
+
+@shared_task
+def purge_author_from_timelines_task(author_id, follower_ids):
+    invalidated = 0
+    batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+    for start in range(0, len(follower_ids), batch_size):
+        batch = follower_ids[start : start + batch_size]
+        purge_author_from_timelines(batch, author_id)
+        invalidated += bulk_invalidate_feed_cache(batch)
+
+    record_feed_invalidation("author_deleted", invalidated)
+    return invalidated
 
-    pattern = r"@(\w+)"
-    usernames = re.findall(pattern, tweet.content)
 
-    if not usernames:
+@shared_task
+def refresh_celebrities_task():
+    """
+    Recount the celebrity set and move the posts of the authors whose status
+    changed: followers' timelines get the posts of a former celebrity backfilled,
+    and lose those of a new one, which are pulled at read time from now on.
+    """
+    previous = cache.get(CELEBRITIES_KEY)
+    current = count_celebrity_ids()
+    # Stored first, so new posts are fanned out (or not) by the new status.
+    cache.set(CELEBRITIES_KEY, current, timeout=None)
+    cache.delete(CELEBRITIES_REFRESH_SCHEDULED_KEY)
+    if previous is None:
+        # Nothing to compare against: leave the timelines as they are.
         return
 
-    content_type = ContentType.objects.get_for_model(Tweet)
-    usernames = set(usernames)
-    mentioned_users = User.objects.filter(username__in=usernames)
-    
-    for user in mentioned_users:
-        if user != tweet.user:
-            Mention.objects.get_or_create(
-                actor=tweet.user,
-                mentioned_user=user,
-                content_type=content_type,
-                content_id=tweet.id,
-            )
+    for author_id in current - previous:
+        for batch in follower_id_batches(author_id):
+            purge_author_from_timelines(batch, author_id)
+            bulk_invalidate_feed_cache(batch)
+
+    former = get_user_model().objects.filter(id__in=previous - current)
+    for author in former:
+        for batch in follower_id_batches(author.id):
+            backfill_timelines(batch, author)
+            bulk_invalidate_feed_cache(batch)
+
+
+@shared_task
+def flush_counter_deltas_task():
+    return flush_pending_counters()
+
+
+@shared_task
+def warm_viewer_state_task(user_id):
+    warm_viewer_state(user_id)
@@ -36,8 +36,9 @@ class TestBookmarkEndpoints(APITestCase):
         self.authenticate()
         self.client.post(self.url)
         response = self.client.post(self.url)  # second bookmark
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data["error"], "already_bookmarked")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["detail"], "Tweet is already in your bookmarks")
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 1)
 
     def test_bookmark_tweet_unauthenticated(self):
         response = self.client.post(self.url)
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from django.db import DatabaseError
+from django.urls import reverse
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from tweets.comment_tree import CommentTree
+from tweets.models import Tweet, Comment
+from accounts.models import User
+
+
+class TestCommentTree(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.user, content="Test tweet")
+        self.comment = Comment.objects.create(
+            user=self.user, tweet=self.tweet, content="Root"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def url(self, comment=None):
+        return reverse(
+            "comment-details",
+            kwargs={"pk": self.tweet.pk, "comment_id": (comment or self.comment).pk},
+        )
+
+    def reply(self, parent, content="Reply"):
+        return Comment.objects.create(
+            user=self.user, tweet=self.tweet, content=content, parent=parent
+        )
+
+    def chain(self, length):
+        parent = self.comment
+        for level in range(1, length + 1):
+            parent = self.reply(parent, f"Level {level}")
+        return parent
+
+    def test_path_depth_and_root_are_set_on_creation(self):
+        reply = self.reply(self.comment)
+        nested = self.reply(reply)
+
+        nested.refresh_from_db()
+        self.assertEqual(self.comment.path, f"{self.comment.pk}/")
+        self.assertEqual(nested.path, f"{self.comment.pk}/{reply.pk}/{nested.pk}/")
+        self.assertEqual(nested.depth, 2)
+        self.assertEqual(nested.root_id, self.comment.pk)
+
+    def test_comment_is_not_created_without_its_path(self):
+        with patch("django.db.models.query.QuerySet.update", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.reply(self.comment)
+
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_subtree_is_loaded_with_one_query(self):
+        self.chain(4)
+        for _ in range(3):
+            self.reply(self.comment)
+
+        with self.assertNumQueries(1):
+            tree = CommentTree(self.comment)
+
+        self.assertEqual(len(tree.replies(self.comment)), 4)
+
+    @override_settings(COMMENT_TREE_MAX_DEPTH=2)
+    def test_thread_stops_at_max_depth(self):
+        self.chain(4)
+
+        response = self.client.get(self.url())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        level2 = response.data["replies"][0]["replies"][0]
+        self.assertEqual(level2["content"], "Level 2")
+        self.assertEqual(level2["replies"], [])
+        self.assertEqual(level2["replies_count"], 1)
+        self.assertTrue(level2["replies_next"].endswith(f"/comments/{level2['id']}/"))
+
+        response = self.client.get(level2["replies_next"])
+        self.assertEqual(response.data["replies"][0]["content"], "Level 3")
+
+    @override_settings(COMMENT_TREE_PAGE_SIZE=2)
+    def test_each_level_is_paginated(self):
+        replies = [self.reply(self.comment, f"Reply {i}") for i in range(5)]
+        self.reply(replies[0], "Nested")
+
+        response = self.client.get(self.url())
+        self.assertEqual(
+            [reply["content"] for reply in response.data["replies"]],
+            ["Reply 4", "Reply 3"],
+        )
+        self.assertEqual(response.data["replies_count"], 5)
+
+        seen = []
+        next_url = response.data["replies_next"]
+        while next_url:
+            response = self.client.get(next_url)
+            seen += [reply["content"] for reply in response.data["replies"]]
+            next_url = response.data["replies_next"]
+
+        self.assertEqual(seen, ["Reply 2", "Reply 1", "Reply 0"])
+        self.assertEqual(response.data["replies"][-1]["replies"][0]["content"], "Nested")
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url(), {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_thread_does_not_include_sibling_subtrees(self):
+        other = Comment.objects.create(user=self.user, tweet=self.tweet, content="Other")
+        self.reply(other, "Other reply")
+        reply = self.reply(self.comment)
+
+        response = self.client.get(self.url(reply))
+        self.assertEqual(response.data["replies"], [])
+        self.assertEqual(response.data["replies_count"], 0)
+        self.assertIsNone(response.data["replies_next"])
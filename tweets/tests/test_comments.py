@@ -1,3 +1,6 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -213,3 +216,59 @@ class TestCommentDetailEndpoints(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Comment.objects.filter(pk=self.comment.pk).exists())
         self.assertFalse(Comment.objects.filter(pk=reply.pk).exists())  # Cascade delete
+
+
+@override_settings(COMMENT_REPLY_PREVIEW_SIZE=2)
+class TestCommentReplyPreviews(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.user, content="Test tweet")
+        self.busy = Comment.objects.create(
+            user=self.user, tweet=self.tweet, content="Busy"
+        )
+        self.quiet = Comment.objects.create(
+            user=self.user, tweet=self.tweet, content="Quiet"
+        )
+        for i in range(5):
+            Comment.objects.create(
+                user=self.user, tweet=self.tweet, content=f"Reply {i}", parent=self.busy
+            )
+        Comment.objects.create(
+            user=self.user, tweet=self.tweet, content="Only reply", parent=self.quiet
+        )
+        self.list_url = reverse("comments", kwargs={"pk": self.tweet.pk})
+        self.client.force_authenticate(user=self.user)
+
+    def test_only_the_newest_replies_are_loaded(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url)
+
+        comments = {c["content"]: c for c in response.data["results"]}
+        busy, quiet = comments["Busy"], comments["Quiet"]
+
+        self.assertEqual(
+            [r["content"] for r in busy["replies"]], ["Reply 4", "Reply 3"]
+        )
+        self.assertEqual(busy["replies_count"], 5)
+        self.assertTrue(busy["has_more_replies"])
+        self.assertFalse(quiet["has_more_replies"])
+        self.assertIsNone(quiet["replies_next"])
+        self.assertTrue(
+            any(
+                "ROW_NUMBER() OVER" in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_replies_next_continues_after_the_preview(self):
+        response = self.client.get(self.list_url)
+        busy = next(c for c in response.data["results"] if c["content"] == "Busy")
+
+        response = self.client.get(busy["replies_next"])
+
+        self.assertEqual(
+            [r["content"] for r in response.data["replies"]],
+            ["Reply 2", "Reply 1", "Reply 0"],
+        )
@@ -0,0 +1,230 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.db.models.query import QuerySet
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from tweets.cache_utils import invalidate_post_cache
+from tweets.counters import (
+    flush_pending_counters,
+    pending_counters_key,
+    flushing_counters_key,
+    FLUSHING_TWEETS_KEY,
+)
+from tweets.models import Tweet, Like, Comment, Retweet
+from tweets.post_cache import load_posts
+from accounts.models import User
+
+
+class TestEngagementCounters(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.other_user, content="Tweet")
+
+    def assertCounters(self, likes, comments, retweets):
+        flush_pending_counters()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes_count, likes)
+        self.assertEqual(self.tweet.comments_count, comments)
+        self.assertEqual(self.tweet.retweets_count, retweets)
+
+    def test_like_and_unlike_update_likes_count(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("like-tweet", kwargs={"pk": self.tweet.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        self.assertCounters(likes=1, comments=0, retweets=0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        self.assertCounters(likes=0, comments=0, retweets=0)
+
+    def test_only_top_level_comments_are_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(
+                user=self.user, tweet=self.tweet, content="Comment"
+            )
+            Comment.objects.create(
+                user=self.other_user, tweet=self.tweet, parent=comment, content="Reply"
+            )
+        self.assertCounters(likes=0, comments=1, retweets=0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.delete()
+        self.assertCounters(likes=0, comments=0, retweets=0)
+
+    def test_replies_count_follows_direct_replies(self):
+        comment = Comment.objects.create(
+            user=self.user, tweet=self.tweet, content="Comment"
+        )
+        reply = Comment.objects.create(
+            user=self.other_user, tweet=self.tweet, parent=comment, content="Reply"
+        )
+        Comment.objects.create(
+            user=self.user, tweet=self.tweet, parent=reply, content="Nested"
+        )
+        comment.refresh_from_db()
+        self.assertEqual(comment.replies_count, 1)
+
+        reply.delete()
+        comment.refresh_from_db()
+        self.assertEqual(comment.replies_count, 0)
+
+    def test_retweet_and_unretweet_update_retweets_count(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("retweet", kwargs={"pk": self.tweet.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        # Retweeting again returns the existing retweet, with the pending delta.
+        response = self.client.post(url)
+        self.assertEqual(response.data["tweet"]["retweets_count"], 1)
+        self.assertCounters(likes=0, comments=0, retweets=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        self.assertCounters(likes=0, comments=0, retweets=0)
+
+    def test_deleting_user_decrements_counters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, tweet=self.tweet)
+            Retweet.objects.create(user=self.user, tweet=self.tweet)
+        self.assertCounters(likes=1, comments=0, retweets=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertCounters(likes=0, comments=0, retweets=0)
+
+    def test_deleted_rows_are_counted_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            like = Like.objects.create(user=self.user, tweet=self.tweet)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            like.delete()
+        self.assertCounters(likes=1, comments=0, retweets=0)
+
+        for callback in callbacks:
+            callback()
+        self.assertCounters(likes=0, comments=0, retweets=0)
+
+    def test_rolled_back_rows_are_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    Like.objects.create(user=self.user, tweet=self.tweet)
+                    Retweet.objects.create(user=self.user, tweet=self.tweet)
+                    raise DatabaseError
+
+        self.assertCounters(likes=0, comments=0, retweets=0)
+
+    @patch("tweets.signals.engagement_counters.update_counter")
+    def test_deleting_a_tweet_leaves_its_counters_alone(self, update_counter):
+        Like.objects.create(user=self.user, tweet=self.tweet)
+        Retweet.objects.create(user=self.user, tweet=self.tweet)
+        Comment.objects.create(user=self.user, tweet=self.tweet, content="Comment")
+        update_counter.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tweet.delete()
+
+        update_counter.assert_not_called()
+
+    @patch("tweets.signals.engagement_counters.update_counters")
+    @patch("tweets.signals.engagement_counters.update_counter")
+    def test_cascades_update_counters_in_one_batch(
+        self, update_counter, update_counters
+    ):
+        own = Tweet.objects.create(user=self.user, content="Own")
+        for tweet in [self.tweet, own]:
+            Like.objects.create(user=self.user, tweet=tweet)
+            Retweet.objects.create(user=self.user, tweet=tweet)
+            Comment.objects.create(user=self.user, tweet=tweet, content="Comment")
+        Like.objects.create(user=self.other_user, tweet=own)
+        update_counter.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        update_counter.assert_not_called()
+        update_counters.assert_called_once()
+        self.assertCountEqual(
+            update_counters.call_args.args[0],
+            [
+                (self.tweet.id, "likes_count", -1),
+                (self.tweet.id, "retweets_count", -1),
+                (self.tweet.id, "comments_count", -1),
+            ],
+        )
+
+    def test_reconcile_command_fixes_drift(self):
+        Like.objects.create(user=self.user, tweet=self.tweet)
+        Tweet.objects.filter(pk=self.tweet.pk).update(likes_count=7, retweets_count=3)
+
+        out = StringIO()
+        call_command("reconcile_tweet_counters", stdout=out)
+
+        self.assertIn("Reconciled 1 tweet(s)", out.getvalue())
+        self.assertCounters(likes=1, comments=0, retweets=0)
+
+    def test_pending_deltas_are_buffered_and_overlaid_on_reads(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, tweet=self.tweet)
+            Retweet.objects.create(user=self.user, tweet=self.tweet)
+
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes_count, 0)
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("user-posts", kwargs={"username": self.user.username})
+        response = self.client.get(url)
+        original = response.data["results"][0]["original_tweet"]
+        self.assertEqual(original["likes_count"], 1)
+        self.assertEqual(original["retweets_count"], 1)
+
+    def test_flush_replays_batches_left_by_a_crashed_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, tweet=self.tweet)
+
+        # Simulate a worker that moved the deltas aside and died before the UPDATE.
+        conn = get_redis_connection("default")
+        conn.rename(
+            pending_counters_key(self.tweet.pk), flushing_counters_key(self.tweet.pk)
+        )
+        conn.sadd(FLUSHING_TWEETS_KEY, self.tweet.pk)
+
+        self.assertCounters(likes=1, comments=0, retweets=0)
+        self.assertFalse(conn.exists(flushing_counters_key(self.tweet.pk)))
+
+    def test_post_read_during_a_flush_is_not_double_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, tweet=self.tweet)
+        ref = ["tweet", self.tweet.pk, self.tweet.pk]
+        bulk_update = QuerySet.bulk_update
+
+        def update_then_read(queryset, *args, **kwargs):
+            updated = bulk_update(queryset, *args, **kwargs)
+            load_posts([ref])
+            return updated
+
+        def invalidate_then_read(kind, post_ids):
+            invalidate_post_cache(kind, post_ids)
+            load_posts([ref])
+
+        # Feed reads racing with every step of the flush.
+        with patch.object(QuerySet, "bulk_update", update_then_read), patch(
+            "tweets.counters.invalidate_post_cache", invalidate_then_read
+        ):
+            flush_pending_counters()
+
+        self.assertEqual(load_posts([ref])[0]["likes_count"], 1)
@@ -0,0 +1,112 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from tweets.cache_utils import (
+    bulk_invalidate_feed_cache,
+    get_feed_invalidation_metrics,
+    get_feed_cache_key,
+)
+from tweets.models import Tweet
+from accounts.models import User
+from relationships.models import Follow
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+class TestFeedInvalidation(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("feed")
+        self.author = User.objects.create_user(
+            username="author", email="author@gmail.com", password="user1234"
+        )
+        self.followers = [
+            User.objects.create_user(
+                username=f"follower{i}",
+                email=f"follower{i}@gmail.com",
+                password="user1234",
+            )
+            for i in range(3)
+        ]
+        for follower in self.followers:
+            Follow.objects.create(follower=follower, following=self.author)
+
+    def feed_contents(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url)
+        return [post["content"] for post in response.data["results"]]
+
+    def test_bulk_invalidation_bumps_every_version(self):
+        keys = [get_feed_cache_key(user.id, "") for user in self.followers]
+
+        self.assertEqual(bulk_invalidate_feed_cache(u.id for u in self.followers), 3)
+
+        for user, key in zip(self.followers, keys):
+            self.assertNotEqual(get_feed_cache_key(user.id, ""), key)
+
+    def test_new_post_invalidates_followers_cached_feeds(self):
+        Tweet.objects.create(user=self.author, content="First")
+        self.assertEqual(self.feed_contents(self.followers[0]), ["First"])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("create-tweet"), {"content": "Second"})
+
+        self.assertEqual(self.feed_contents(self.followers[0]), ["Second", "First"])
+
+    def test_deleted_post_invalidates_followers_cached_feeds(self):
+        tweet = Tweet.objects.create(user=self.author, content="Delete me")
+        self.assertEqual(self.feed_contents(self.followers[0]), ["Delete me"])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("tweet-detail", kwargs={"pk": tweet.pk}))
+
+        self.assertEqual(self.feed_contents(self.followers[0]), [])
+
+    def test_invalidations_are_measured_per_write(self):
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("create-tweet"), {"content": "Tweet"})
+
+        metrics = get_feed_invalidation_metrics()
+        self.assertEqual(metrics["writes"], 1)
+        self.assertEqual(metrics["keys:tweet_created"], 3)
+        self.assertEqual(metrics["keys_per_write"], 3)
+
+        out = StringIO()
+        call_command("feed_cache_metrics", stdout=out)
+        self.assertIn("tweet_created: 3 feed(s) over 1 write(s)", out.getvalue())
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=2)
+    def test_celebrity_post_invalidates_followers_with_one_version(self):
+        tweet = Tweet.objects.create(user=self.author, content="First")
+        self.assertEqual(self.feed_contents(self.followers[0]), ["First"])
+
+        self.client.force_authenticate(user=self.author)
+        with patch("tweets.tasks.bulk_invalidate_feed_cache") as bulk_invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("create-tweet"), {"content": "Second"})
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(reverse("tweet-detail", kwargs={"pk": tweet.pk}))
+
+        bulk_invalidate.assert_not_called()
+        self.assertEqual(get_feed_invalidation_metrics()["keys"], 2)
+        for follower in self.followers:
+            self.assertEqual(self.feed_contents(follower), ["Second"])
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=2)
+    def test_followed_celebrities_are_refreshed_on_follow(self):
+        user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        Tweet.objects.create(user=self.author, content="Celebrity")
+        self.assertEqual(self.feed_contents(user), [])
+
+        self.client.post(reverse("follow", kwargs={"username": "author"}))
+
+        self.assertEqual(self.feed_contents(user), ["Celebrity"])
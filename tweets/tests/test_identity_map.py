@@ -0,0 +1,93 @@
+from django.urls import reverse
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from tweets.models import Tweet, Like, Comment
+from accounts.models import User
+
+
+class TestTweetIdentityMap(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(content="Original tweet", user=self.user)
+        Like.objects.create(user=self.other_user, tweet=self.tweet)
+
+    def authenticate(self, user=None):
+        self.client.force_authenticate(user=user or self.user)
+
+    def tweet_lookups(self, queries):
+        return [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('SELECT "tweets_tweet"')
+        ]
+
+    def test_likes_list_loads_the_tweet_once(self):
+        self.authenticate()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("like-tweet", kwargs={"pk": self.tweet.pk})
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.tweet_lookups(queries)), 1)
+
+    def test_retweet_loads_the_tweet_once(self):
+        self.authenticate(self.other_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("retweet", kwargs={"pk": self.tweet.pk}), {"quote": "Nice"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.tweet_lookups(queries)), 1)
+
+    def test_missing_tweet_is_not_found(self):
+        self.authenticate()
+
+        response = self.client.get(reverse("like-tweet", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(reverse("retweet", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_comment_of_another_tweet_is_not_found(self):
+        other_tweet = Tweet.objects.create(content="Other", user=self.other_user)
+        comment = Comment.objects.create(
+            user=self.user, tweet=other_tweet, content="Hi"
+        )
+        self.authenticate()
+
+        response = self.client.get(
+            reverse(
+                "comment-details",
+                kwargs={"pk": self.tweet.pk, "comment_id": comment.pk},
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(QUERY_COUNT_REPORT=True)
+    def test_query_count_report(self):
+        self.authenticate()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("like-tweet", kwargs={"pk": self.tweet.pk})
+            )
+
+        self.assertEqual(int(response["X-Query-Count"]), len(queries))
+        self.assertGreater(int(response["X-Identity-Map-Hits"]), 0)
+
+    @override_settings(QUERY_COUNT_REPORT=False)
+    def test_query_count_report_can_be_disabled(self):
+        response = self.client.get(
+            reverse("tweet-detail", kwargs={"pk": self.tweet.pk})
+        )
+
+        self.assertNotIn("X-Query-Count", response)
@@ -0,0 +1,184 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.urls import reverse
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+from interactions.delivery import NOTIFICATION_QUEUE_KEY
+from tweets.models import Tweet, Like, Retweet, Bookmark
+from accounts.models import User
+
+
+class TestInteractionBatch(APITestCase):
+    def setUp(self):
+        # Events are only queued here, not delivered.
+        self.schedule_patcher = patch("interactions.delivery.schedule_delivery")
+        self.schedule_patcher.start()
+        self.addCleanup(self.schedule_patcher.stop)
+        self.redis = get_redis_connection("default")
+        self.redis.delete(NOTIFICATION_QUEUE_KEY)
+        self.addCleanup(self.redis.delete, NOTIFICATION_QUEUE_KEY)
+
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.author = User.objects.create_user(
+            username="author", email="author@gmail.com", password="user1234"
+        )
+        self.tweets = [
+            Tweet.objects.create(content=f"Tweet {i}", user=self.author)
+            for i in range(12)
+        ]
+        self.url = reverse("interaction-batch")
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, *operations):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                self.url,
+                {
+                    "operations": [
+                        {"action": action, "tweet_id": tweet_id}
+                        for action, tweet_id in operations
+                    ]
+                },
+                format="json",
+            )
+
+    def statuses(self, response):
+        return [item["status"] for item in response.data["results"]]
+
+    def test_operations_are_applied(self):
+        first, second, third = self.tweets[:3]
+
+        response = self.post(
+            ("like", first.id),
+            ("bookmark", second.id),
+            ("retweet", third.id),
+            ("like", 0),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.statuses(response), ["created", "created", "created", "not_found"]
+        )
+        self.assertEqual(response.data["results"][0]["action"], "like")
+        self.assertEqual(response.data["results"][0]["tweet_id"], first.id)
+        self.assertTrue(Like.objects.filter(user=self.user, tweet=first).exists())
+        self.assertTrue(Bookmark.objects.filter(user=self.user, tweet=second).exists())
+        self.assertTrue(Retweet.objects.filter(user=self.user, tweet=third).exists())
+
+    def test_replayed_batch_is_unchanged(self):
+        operations = [("like", self.tweets[0].id), ("bookmark", self.tweets[0].id)]
+        self.post(*operations)
+
+        response = self.post(*operations)
+
+        self.assertEqual(self.statuses(response), ["unchanged", "unchanged"])
+        self.assertEqual(Like.objects.filter(user=self.user).count(), 1)
+
+    def test_removals(self):
+        tweet = self.tweets[0]
+        Like.objects.create(user=self.user, tweet=tweet)
+        Retweet.objects.create(user=self.user, tweet=tweet)
+
+        response = self.post(
+            ("unlike", tweet.id), ("unretweet", tweet.id), ("unbookmark", tweet.id)
+        )
+
+        self.assertEqual(self.statuses(response), ["deleted", "deleted", "unchanged"])
+        self.assertFalse(Like.objects.filter(user=self.user).exists())
+        self.assertFalse(Retweet.objects.filter(user=self.user).exists())
+
+    @override_settings(TWEET_COUNTERS_WRITE_BEHIND=False)
+    def test_counters_are_updated(self):
+        tweet = self.tweets[0]
+        Retweet.objects.create(user=self.user, tweet=tweet)
+
+        self.post(("like", tweet.id), ("unretweet", tweet.id))
+
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.likes_count, 1)
+        self.assertEqual(tweet.retweets_count, 0)
+
+    @patch("tweets.interaction_batch.update_viewer_states")
+    @patch("tweets.interaction_batch.update_counters")
+    def test_redis_updates_wait_for_the_commit(
+        self, update_counters, update_viewer_states
+    ):
+        tweet = self.tweets[0]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(
+                self.url,
+                {"operations": [{"action": "like", "tweet_id": tweet.id}]},
+                format="json",
+            )
+        update_counters.assert_not_called()
+        update_viewer_states.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        update_counters.assert_called_once_with([(tweet.id, "likes_count", 1)])
+        update_viewer_states.assert_called_once_with(
+            self.user.id, [("is_liked", tweet.id, True)]
+        )
+
+    def test_notifications_are_queued_together(self):
+        own = Tweet.objects.create(content="Mine", user=self.user)
+
+        with patch("interactions.delivery._enqueue") as enqueue:
+            self.post(
+                ("like", self.tweets[0].id),
+                ("retweet", self.tweets[1].id),
+                ("like", own.id),
+                ("bookmark", self.tweets[2].id),
+            )
+
+        enqueue.assert_called_once()
+        events = enqueue.call_args.args[0]
+        self.assertEqual(
+            sorted(event["verb"] for event in events), ["liked", "retweeted"]
+        )
+
+    def test_query_count_does_not_depend_on_the_batch_size(self):
+        def batch(tweets):
+            operations = [("like", tweet.id) for tweet in tweets] + [
+                ("bookmark", tweet.id) for tweet in tweets
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.post(*operations)
+            return len(queries)
+
+        self.assertEqual(batch(self.tweets[:2]), batch(self.tweets[2:]))
+
+    def test_conflicting_operations_are_rejected(self):
+        tweet = self.tweets[0]
+
+        response = self.post(("like", tweet.id), ("unlike", tweet.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"][0], "conflicting_operations")
+        self.assertFalse(Like.objects.exists())
+
+    def test_invalid_batches_are_rejected(self):
+        response = self.post()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.post(("follow", self.tweets[0].id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        too_many = settings.INTERACTION_BATCH_MAX_SIZE + 1
+        response = self.post(*[("like", tweet_id) for tweet_id in range(too_many)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unauthenticated(self):
+        self.client.force_authenticate(user=None)
+
+        response = self.post(("like", self.tweets[0].id))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
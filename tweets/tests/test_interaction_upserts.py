@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from config.upsert import insert_or_get
+from tweets.models import Tweet, Like, Retweet
+from accounts.models import User
+
+
+class TestInteractionUpserts(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(
+            content="Original tweet", user=self.other_user
+        )
+
+    def authenticate(self, user=None):
+        self.client.force_authenticate(user=user or self.user)
+
+    def test_insert_or_get_returns_the_existing_row(self):
+        like, created = insert_or_get(
+            Like, ["user", "tweet"], user=self.user, tweet=self.tweet
+        )
+        self.assertTrue(created)
+        self.assertIsNotNone(like.pk)
+        self.assertIsNotNone(like.created_at)
+
+        again, created = insert_or_get(
+            Like, ["user", "tweet"], user=self.user, tweet=self.tweet
+        )
+        self.assertFalse(created)
+        self.assertEqual(again.pk, like.pk)
+        self.assertEqual(again.created_at, like.created_at)
+
+    def test_existing_retweet_keeps_its_quote(self):
+        insert_or_get(
+            Retweet, ["user", "tweet"], user=self.user, tweet=self.tweet, quote="First"
+        )
+
+        retweet, created = insert_or_get(
+            Retweet, ["user", "tweet"], user=self.user, tweet=self.tweet, quote="Second"
+        )
+
+        self.assertFalse(created)
+        self.assertEqual(retweet.quote, "First")
+
+    def test_like_is_one_statement(self):
+        self.authenticate()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("like-tweet", kwargs={"pk": self.tweet.pk})
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        like_queries = [q["sql"] for q in queries if '"tweets_like"' in q["sql"]]
+        self.assertEqual(len(like_queries), 1)
+        self.assertIn("ON CONFLICT", like_queries[0])
+
+    @patch("tweets.signals.engagement_counters.update_counter")
+    def test_side_effects_run_only_for_new_rows(self, update_counter):
+        self.authenticate()
+        url = reverse("like-tweet", kwargs={"pk": self.tweet.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+            self.client.post(url)
+
+        update_counter.assert_called_once_with(self.tweet.id, "likes_count", 1)
+
+    @patch("relationships.views.backfill_timeline")
+    def test_repeated_follow_backfills_once(self, backfill_timeline):
+        self.authenticate()
+        url = reverse("follow", kwargs={"username": self.other_user.username})
+
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+
+        backfill_timeline.assert_called_once()
+
+    def test_missing_tweet_is_not_found(self):
+        self.authenticate()
+
+        response = self.client.post(reverse("bookmark", kwargs={"pk": 0}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,9 +1,12 @@
 from django.urls import reverse
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from rest_framework import status
 from tweets.models import Tweet, Like
 from accounts.models import User
+from interactions.delivery import DELIVERY_SCHEDULED_KEY
 from interactions.models import Notification
 
 
@@ -31,20 +34,24 @@ class TestLikeEndpoints(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Like.objects.filter(user=self.user, tweet=self.tweet).exists())
 
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
     def test_like_unlike_like_again_does_not_crash(self):
         """Like -> Unlike -> Like again should PASS (notification de-dupe)."""
+        cache.delete(DELIVERY_SCHEDULED_KEY)
         self.authenticate()
 
         tweet = Tweet.objects.create(content="Other user's tweet", user=self.other_user)
         url = reverse("like-tweet", kwargs={"pk": tweet.pk})
 
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Like.objects.filter(user=self.user, tweet=tweet).exists())
 
@@ -62,13 +69,12 @@ class TestLikeEndpoints(APITestCase):
 
     def test_like_tweet_duplicate_prevented(self):
         self.authenticate()
-        self.client.post(self.url)  # First like
+        first = self.client.post(self.url)  # First like
 
-        response = self.client.post(self.url)  # Second like
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("error", response.data)
-        error_value = response.data["error"]
-        self.assertEqual(error_value[0], "already_liked")
+        response = self.client.post(self.url)  # Second like returns the first
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], first.data["id"])
+        self.assertEqual(Like.objects.filter(tweet=self.tweet).count(), 1)
 
     def test_like_tweet_unauthenticated(self):
         response = self.client.post(self.url)
@@ -2,8 +2,9 @@ from django.urls import reverse
 from django.core.cache import cache
 from rest_framework.test import APITestCase
 from rest_framework import status
-from tweets.models import Tweet
+from tweets.models import Tweet, Retweet
 from accounts.models import User
+from relationships.models import Follow
 
 
 class TestListTweet(APITestCase):
@@ -37,7 +38,7 @@ class TestListTweet(APITestCase):
         for i in range(15):
             Tweet.objects.create(user=self.user, content=f"Tweet {i}")
 
-        response = self.client.get(self.url)
+        response = self.client.get(self.url, {"page": 1})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("count", response.data)
         self.assertIn("next", response.data)
@@ -73,3 +74,46 @@ class TestListTweet(APITestCase):
         
         response = self.client.get(self.url)
         self.assertEqual(response.data["results"][0]["content"], "New Tweet")
+
+    def test_feed_merges_tweets_and_retweets_across_pages(self):
+        self.authenticate()
+        other = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        Follow.objects.create(follower=self.user, following=other)
+
+        for i in range(6):
+            tweet = Tweet.objects.create(user=other, content=f"Tweet {i}")
+            Retweet.objects.create(user=self.user, tweet=tweet, quote=f"Quote {i}")
+
+        first = self.client.get(self.url)
+        second = self.client.get(first.data["next"])
+        results = first.data["results"] + second.data["results"]
+
+        self.assertIsNone(second.data["next"])
+        self.assertEqual(len(results), 12)
+        self.assertEqual(results[0]["type"], "retweet")
+        self.assertEqual(results[0]["quote"], "Quote 5")
+        self.assertEqual(results[1]["content"], "Tweet 5")
+        self.assertEqual(results[-1]["content"], "Tweet 0")
+
+    def test_feed_cursor_pagination(self):
+        self.authenticate()
+        for i in range(15):
+            Tweet.objects.create(user=self.user, content=f"Tweet {i}")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(response.data["results"][-1]["content"], "Tweet 0")
+        self.assertIsNone(response.data["next"])
+
+    def test_feed_invalid_cursor(self):
+        self.authenticate()
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,76 @@
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from tweets.cache_utils import get_post_cache_key
+from tweets.counters import flush_pending_counters
+from tweets.models import Tweet, Retweet, Like
+from tweets.post_cache import load_posts
+from accounts.models import User
+
+
+class TestPostCache(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        self.tweet = Tweet.objects.create(user=self.other_user, content="Original")
+        self.retweet = Retweet.objects.create(user=self.user, tweet=self.tweet)
+        self.url = reverse("user-posts", kwargs={"username": self.user.username})
+
+    def test_cached_payloads_are_loaded_without_queries(self):
+        refs = [
+            ["retweet", self.retweet.id, None],
+            ["tweet", self.tweet.id, self.tweet.id],
+        ]
+
+        with self.assertNumQueries(1):  # The original tweet comes with the retweet.
+            posts = load_posts(refs)
+        with self.assertNumQueries(0):
+            self.assertEqual(load_posts(refs), posts)
+
+        self.assertEqual(posts[0]["original_tweet"]["content"], "Original")
+        self.assertEqual(posts[1]["type"], "tweet")
+
+    def test_deleted_posts_are_skipped(self):
+        refs = [["tweet", self.tweet.id, self.tweet.id], ["tweet", 0, 0]]
+        self.assertEqual([post["id"] for post in load_posts(refs)], [self.tweet.id])
+
+    def test_new_post_keeps_cached_payloads(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+
+        response = self.client.post(reverse("create-tweet"), {"content": "New"})
+        self.assertIsNotNone(cache.get(get_post_cache_key("tweet", self.tweet.id)))
+
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["content"], "New")
+
+    def test_editing_a_tweet_refreshes_its_retweets(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+
+        self.client.force_authenticate(user=self.other_user)
+        self.client.patch(
+            reverse("tweet-detail", kwargs={"pk": self.tweet.pk}), {"content": "Edited"}
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        original = response.data["results"][0]["original_tweet"]
+        self.assertEqual(original["content"], "Edited")
+
+    def test_counter_flush_drops_stale_payloads(self):
+        load_posts([["tweet", self.tweet.id, self.tweet.id]])
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, tweet=self.tweet)
+
+        flush_pending_counters()
+
+        self.assertIsNone(cache.get(get_post_cache_key("tweet", self.tweet.id)))
+        post = load_posts([["tweet", self.tweet.id, self.tweet.id]])[0]
+        self.assertEqual(post["likes_count"], 1)
@@ -1,8 +1,10 @@
 from django.urls import reverse
 from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from rest_framework import status
-from tweets.models import Tweet
+from tweets.cache_utils import get_comment_section_cache_key
+from tweets.models import Tweet, Like, Comment
 from accounts.models import User
 
 # Create your tests here.
@@ -37,3 +39,84 @@ class TestRetrieveTweet(APITestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_body_is_shared_with_per_viewer_flags(self):
+        other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        Like.objects.create(user=self.user, tweet=self.tweet)
+
+        self.authenticate()
+        response = self.client.get(self.url)
+        self.assertTrue(response.data["is_liked"])
+
+        self.client.force_authenticate(user=other_user)
+        with self.assertNumQueries(3):  # Viewer flags only, the body is cached.
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["content"], "Tweet 1")
+        self.assertFalse(response.data["is_liked"])
+        self.assertFalse(response.data["is_bookmarked"])
+
+    @override_settings(COMMENT_REPLY_PREVIEW_SIZE=1)
+    def test_only_the_first_page_of_comments_is_embedded(self):
+        comments = [
+            Comment.objects.create(user=self.user, tweet=self.tweet, content=f"C{i}")
+            for i in range(12)
+        ]
+        for i in range(3):
+            Comment.objects.create(
+                user=self.user, tweet=self.tweet, content=f"R{i}", parent=comments[-1]
+            )
+
+        self.authenticate()
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data["comments"]), 10)
+        newest = response.data["comments"][0]
+        self.assertEqual(newest["content"], "C11")
+        self.assertEqual(newest["replies_count"], 3)
+        self.assertEqual(len(newest["replies"]), 1)
+        self.assertTrue(newest["has_more_replies"])
+
+        response = self.client.get(response.data["comments_next"])
+        self.assertEqual(
+            [comment["content"] for comment in response.data["results"]], ["C1", "C0"]
+        )
+
+    def test_comment_section_is_cached_once_per_tweet(self):
+        other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        Comment.objects.create(user=self.user, tweet=self.tweet, content="First")
+
+        self.authenticate()
+        self.client.get(self.url)
+
+        self.client.force_authenticate(user=other_user)
+        with self.assertNumQueries(3):  # Viewer flags only.
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["comments"][0]["content"], "First")
+        self.assertIsNone(response.data["comments_next"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(user=other_user, tweet=self.tweet, content="Second")
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["comments"][0]["content"], "Second")
+
+    def test_comment_section_is_invalidated_after_commit(self):
+        self.authenticate()
+        self.client.get(self.url)
+        section_key = get_comment_section_cache_key(self.tweet.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(
+                user=self.user, tweet=self.tweet, content="New"
+            )
+            self.assertIsNotNone(cache.get(section_key))
+        self.assertIsNone(cache.get(section_key))
+
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.delete()
+            self.assertIsNotNone(cache.get(section_key))
+        self.assertIsNone(cache.get(section_key))
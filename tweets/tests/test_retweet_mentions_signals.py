@@ -1,5 +1,6 @@
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from tweets.models import Retweet, Tweet
 from interactions.models import Mention
@@ -8,6 +9,7 @@ from interactions.models import Mention
 User = get_user_model()
 
 
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
 class TestRetweetMentions(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -19,9 +21,10 @@ class TestRetweetMentions(APITestCase):
 
     def test_mention_success(self):
         tweet = Tweet.objects.create(user=self.user, content="Original tweet")
-        retweet = Retweet.objects.create(
-            user=self.user, tweet=tweet, quote="Hello @user2"
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            retweet = Retweet.objects.create(
+                user=self.user, tweet=tweet, quote="Hello @user2"
+            )
         self.assertTrue(
             Mention.objects.filter(
                 mentioned_user=self.user2, content_id=retweet.id
@@ -33,9 +36,10 @@ class TestRetweetMentions(APITestCase):
             username="user3", email="user3@gmail.com", password="user1234"
         )
         tweet = Tweet.objects.create(user=self.user, content="Original tweet")
-        retweet = Retweet.objects.create(
-            user=self.user, tweet=tweet, quote="Hello @user2 and @user3"
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            retweet = Retweet.objects.create(
+                user=self.user, tweet=tweet, quote="Hello @user2 and @user3"
+            )
 
         self.assertTrue(
             Mention.objects.filter(
@@ -49,23 +53,26 @@ class TestRetweetMentions(APITestCase):
 
     def test_mention_nonexistent_user(self):
         tweet = Tweet.objects.create(user=self.user, content="Original tweet")
-        retweet = Retweet.objects.create(
-            user=self.user, tweet=tweet, quote="Hello @no-user"
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            retweet = Retweet.objects.create(
+                user=self.user, tweet=tweet, quote="Hello @no-user"
+            )
         self.assertEqual(Mention.objects.filter(content_id=retweet.id).count(), 0)
 
     def test_mention_case_insensitivity(self):
         tweet = Tweet.objects.create(user=self.user, content="Original tweet")
-        retweet = Retweet.objects.create(
-            user=self.user, tweet=tweet, quote="Hello @USER2"
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            retweet = Retweet.objects.create(
+                user=self.user, tweet=tweet, quote="Hello @USER2"
+            )
         self.assertFalse(Mention.objects.filter(mentioned_user=self.user2).exists())
 
     def test_mention_self(self):
         tweet = Tweet.objects.create(user=self.user, content="Original tweet")
-        retweet = Retweet.objects.create(
-            user=self.user, tweet=tweet, quote="I'm mentioning myself @user"
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            retweet = Retweet.objects.create(
+                user=self.user, tweet=tweet, quote="I'm mentioning myself @user"
+            )
         self.assertFalse(
             Mention.objects.filter(
                 mentioned_user=self.user, content_id=retweet.id
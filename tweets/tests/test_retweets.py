@@ -43,15 +43,8 @@ class TestRetweetEndpoints(APITestCase):
         self.authenticate()
         self.client.post(self.url)  # First retweet
 
-        response = self.client.post(self.url)  # Second retweet
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("error", response.data)
-        # Error can be a list or string depending on serializer
-        error_value = response.data["error"]
-        if isinstance(error_value, list):
-            self.assertEqual(error_value[0], "already_retweeted")
-        else:
-            self.assertEqual(error_value, "already_retweeted")
+        response = self.client.post(self.url)  # Second retweet returns the first
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
             Retweet.objects.filter(user=self.user, tweet=self.tweet).count(), 1
         )
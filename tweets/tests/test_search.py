@@ -0,0 +1,69 @@
+from django.urls import reverse
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+from tweets.models import Tweet, Retweet
+from tweets.search import match_tweets
+from accounts.models import User
+
+
+class TestSearchPosts(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("search-posts")
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+
+    def authenticate(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_search_matches_word_forms_across_all_users(self):
+        self.authenticate()
+        Tweet.objects.create(user=self.other_user, content="Running a marathon")
+        Tweet.objects.create(user=self.user, content="Django is awesome")
+
+        response = self.client.get(self.url, {"q": "runs"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["content"], "Running a marathon")
+
+    def test_search_ranks_by_relevance(self):
+        self.authenticate()
+        Tweet.objects.create(user=self.user, content="Python")
+        Tweet.objects.create(user=self.user, content="Python python python tips")
+        tweet = Tweet.objects.create(user=self.other_user, content="Cooking")
+        Retweet.objects.create(user=self.user, tweet=tweet, quote="Python dinner?")
+
+        response = self.client.get(self.url, {"q": "python"})
+
+        results = response.data["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["content"], "Python python python tips")
+        self.assertIn("retweet", [post["type"] for post in results])
+
+    def test_search_requires_query(self):
+        self.authenticate()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "missing_query")
+
+    def test_search_unauthenticated(self):
+        response = self.client.get(self.url, {"q": "python"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_search_uses_full_text_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            queryset = match_tweets(Tweet.objects.all(), "python")
+            plan = queryset.explain()
+            cursor.execute("SET enable_seqscan = on")
+
+        self.assertIn("tweet_content_search_idx", plan)
@@ -0,0 +1,259 @@
+from unittest import mock
+
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import override_settings
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+from tweets.models import Tweet, Retweet
+from tweets.tasks import refresh_celebrities_task
+from tweets.timelines import timeline_stream, timeline_key
+from accounts.models import User
+from relationships.models import Follow
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+class TestTimelines(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("feed")
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.author = User.objects.create_user(
+            username="author", email="author@gmail.com", password="user1234"
+        )
+        Follow.objects.create(follower=self.user, following=self.author)
+
+    def timeline_contents(self, user):
+        return [post.content for post in timeline_stream(user)[0:50]]
+
+    def test_new_tweet_is_fanned_out_to_followers(self):
+        Tweet.objects.create(user=self.author, content="Before")
+        self.assertEqual(self.timeline_contents(self.user), ["Before"])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("create-tweet"), {"content": "After"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.timeline_contents(self.user), ["After", "Before"])
+
+    def test_new_retweet_is_fanned_out_to_followers(self):
+        tweet = Tweet.objects.create(user=self.user, content="Original")
+        self.assertEqual(self.timeline_contents(self.user), ["Original"])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("retweet", kwargs={"pk": tweet.pk}))
+
+        posts = timeline_stream(self.user)[0:50]
+        self.assertIsInstance(posts[0], Retweet)
+        self.assertEqual(posts[0].user, self.author)
+
+    def test_deleted_tweet_is_removed_from_timelines(self):
+        tweet = Tweet.objects.create(user=self.author, content="Delete me")
+        self.assertEqual(self.timeline_contents(self.user), ["Delete me"])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("tweet-detail", kwargs={"pk": tweet.pk}))
+
+        self.assertEqual(self.timeline_contents(self.user), [])
+
+    def test_follow_backfills_and_unfollow_purges(self):
+        other = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        Tweet.objects.create(user=other, content="Other tweet")
+        self.assertEqual(self.timeline_contents(self.user), [])
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse("follow", kwargs={"username": "other"}))
+        self.assertEqual(self.timeline_contents(self.user), ["Other tweet"])
+
+        self.client.delete(reverse("unfollow", kwargs={"username": "other"}))
+        self.assertEqual(self.timeline_contents(self.user), [])
+
+    @override_settings(TIMELINE_MAX_LENGTH=5)
+    def test_feed_continues_from_database_past_timeline_window(self):
+        for i in range(12):
+            Tweet.objects.create(user=self.author, content=f"Tweet {i}")
+
+        self.client.force_authenticate(user=self.user)
+        contents = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            contents += [post["content"] for post in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(contents, [f"Tweet {i}" for i in reversed(range(12))])
+
+        response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(response.data["count"], 12)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def feed_contents(self):
+        contents = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            contents += [post["content"] for post in response.data["results"]]
+            url = response.data["next"]
+        return contents
+
+    @override_settings(TIMELINE_MAX_LENGTH=5)
+    def test_unfollow_on_a_trimmed_timeline_keeps_older_posts(self):
+        other = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        Follow.objects.create(follower=self.user, following=other)
+        for i in range(8):
+            Tweet.objects.create(user=self.author, content=f"Author {i}")
+            if i % 4 == 3:
+                Tweet.objects.create(user=other, content=f"Other {i}")
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(len(self.feed_contents()), 10)
+
+        self.client.delete(reverse("unfollow", kwargs={"username": "other"}))
+
+        self.assertEqual(
+            self.feed_contents(), [f"Author {i}" for i in reversed(range(8))]
+        )
+
+    @override_settings(TIMELINE_MAX_LENGTH=5)
+    def test_delete_on_a_trimmed_timeline_keeps_older_posts(self):
+        tweets = [
+            Tweet.objects.create(user=self.author, content=f"Tweet {i}")
+            for i in range(8)
+        ]
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(len(self.feed_contents()), 8)
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("tweet-detail", kwargs={"pk": tweets[6].pk}))
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(
+            self.feed_contents(), [f"Tweet {i}" for i in reversed(range(8)) if i != 6]
+        )
+
+    @override_settings(TIMELINE_MAX_LENGTH=5)
+    def test_fan_out_to_a_full_timeline_records_the_boundary(self):
+        for i in range(5):
+            Tweet.objects.create(user=self.author, content=f"Tweet {i}")
+        self.assertEqual(len(self.timeline_contents(self.user)), 5)
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("create-tweet"), {"content": "Tweet 5"})
+        self.client.force_authenticate(user=self.user)
+        self.client.delete(reverse("unfollow", kwargs={"username": "author"}))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("follow", kwargs={"username": "author"}))
+
+        self.assertEqual(
+            self.feed_contents(), [f"Tweet {i}" for i in reversed(range(6))]
+        )
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=2)
+    def test_celebrity_posts_are_pulled_at_read_time(self):
+        fan = User.objects.create_user(
+            username="fan", email="fan@gmail.com", password="user1234"
+        )
+        Follow.objects.create(follower=fan, following=self.author)
+        Tweet.objects.create(user=self.user, content="Own tweet")
+        self.assertEqual(self.timeline_contents(self.user), ["Own tweet"])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("create-tweet"), {"content": "Celebrity"})
+
+        members = get_redis_connection("default").zrange(
+            timeline_key(self.user.id), 0, -1
+        )
+        self.assertEqual(len(members), 1)
+        self.assertEqual(self.timeline_contents(self.user), ["Celebrity", "Own tweet"])
+
+    def timeline_members(self, user):
+        return get_redis_connection("default").zrange(timeline_key(user.id), 0, -1)
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=2)
+    def test_feed_requests_only_read_the_celebrity_set(self):
+        refresh_celebrities_task()
+        self.client.force_authenticate(user=self.user)
+        with mock.patch("tweets.tasks.count_celebrity_ids") as count:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        count.assert_not_called()
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=2)
+    def test_new_celebrity_is_purged_from_timelines(self):
+        refresh_celebrities_task()
+        Tweet.objects.create(user=self.author, content="Before")
+        self.assertEqual(self.timeline_contents(self.user), ["Before"])
+        self.assertEqual(len(self.timeline_members(self.user)), 1)
+
+        fan = User.objects.create_user(
+            username="fan", email="fan@gmail.com", password="user1234"
+        )
+        Follow.objects.create(follower=fan, following=self.author)
+        refresh_celebrities_task()
+
+        self.assertEqual(self.timeline_members(self.user), [])
+        self.assertEqual(self.timeline_contents(self.user), ["Before"])
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=2)
+    def test_former_celebrity_is_backfilled_into_timelines(self):
+        fan = User.objects.create_user(
+            username="fan", email="fan@gmail.com", password="user1234"
+        )
+        follow = Follow.objects.create(follower=fan, following=self.author)
+        refresh_celebrities_task()
+        self.assertEqual(self.timeline_contents(self.user), [])
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("create-tweet"), {"content": "Pulled"})
+        self.assertEqual(self.timeline_members(self.user), [])
+
+        follow.delete()
+        refresh_celebrities_task()
+
+        self.assertEqual(len(self.timeline_members(self.user)), 1)
+        self.assertEqual(self.timeline_contents(self.user), ["Pulled"])
+
+    def test_retweets_deleted_with_their_tweet_are_removed_from_timelines(self):
+        other = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        tweet = Tweet.objects.create(user=other, content="Retweeted")
+        Retweet.objects.create(user=self.author, tweet=tweet)
+        self.assertEqual(len(timeline_stream(self.user)[0:50]), 1)
+
+        self.client.force_authenticate(user=other)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("tweet-detail", kwargs={"pk": tweet.pk}))
+
+        self.assertEqual(self.timeline_members(self.user), [])
+
+    def test_deleted_user_posts_are_removed_from_timelines(self):
+        other = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        Follow.objects.create(follower=self.user, following=other)
+        tweet = Tweet.objects.create(user=self.author, content="Author tweet")
+        Retweet.objects.create(user=other, tweet=tweet)
+        other_tweet = Tweet.objects.create(user=other, content="Other tweet")
+        Retweet.objects.create(user=self.author, tweet=other_tweet)
+        self.assertEqual(len(timeline_stream(self.user)[0:50]), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.delete()
+
+        self.assertEqual(self.timeline_contents(self.user), ["Other tweet"])
+        self.assertEqual(len(self.timeline_members(self.user)), 1)
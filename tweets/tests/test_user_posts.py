@@ -2,7 +2,7 @@ from django.urls import reverse
 from django.core.cache import cache
 from rest_framework.test import APITestCase
 from rest_framework import status
-from tweets.models import Tweet, Retweet
+from tweets.models import Tweet, Retweet, Like
 from accounts.models import User
 
 
@@ -60,7 +60,7 @@ class TestUserPosts(APITestCase):
         for i in range(15):
             Tweet.objects.create(user=self.user, content=f"Tweet {i}")
 
-        response = self.client.get(self.url)
+        response = self.client.get(self.url, {"page": 1})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("count", response.data)
@@ -103,3 +103,37 @@ class TestUserPosts(APITestCase):
         self.assertEqual(results[0]["id"], tweet3.pk)
         self.assertEqual(results[1]["id"], tweet2.pk)
         self.assertEqual(results[2]["id"], tweet1.pk)
+
+    def test_user_posts_cursor_breaks_ties_between_tweets_and_retweets(self):
+        self.authenticate()
+        for i in range(6):
+            tweet = Tweet.objects.create(user=self.user, content=f"Tweet {i}")
+            other_tweet = Tweet.objects.create(
+                user=self.other_user, content=f"Other {i}"
+            )
+            retweet = Retweet.objects.create(user=self.user, tweet=other_tweet)
+            # Same timestamp on both tables must neither duplicate nor drop posts.
+            Retweet.objects.filter(pk=retweet.pk).update(created_at=tweet.created_at)
+
+        first = self.client.get(self.url)
+        second = self.client.get(first.data["next"])
+        results = first.data["results"] + second.data["results"]
+
+        self.assertEqual(len(results), 12)
+        self.assertEqual(len({(post["type"], post["id"]) for post in results}), 12)
+        self.assertIsNone(second.data["next"])
+
+    def test_user_posts_page_is_shared_between_viewers(self):
+        tweet = Tweet.objects.create(user=self.user, content="Tweet")
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.other_user, tweet=tweet)
+
+        self.authenticate(self.other_user)
+        response = self.client.get(self.url)
+        self.assertTrue(response.data["results"][0]["is_liked"])
+
+        self.authenticate()
+        with self.assertNumQueries(3):  # Viewer flags only, the username is cached.
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["likes_count"], 1)
+        self.assertFalse(response.data["results"][0]["is_liked"])
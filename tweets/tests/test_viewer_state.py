@@ -0,0 +1,159 @@
+from unittest.mock import patch
+
+from django.db import DatabaseError, transaction
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from tweets.cache_utils import invalidate_user_posts_cache
+from tweets.models import Tweet, Like, Retweet, Bookmark
+from tweets.viewer_state import (
+    ViewerStateResolver,
+    warm_viewer_state,
+    viewer_state_ready_key,
+)
+from accounts.models import User
+from django_redis import get_redis_connection
+from redis.client import Pipeline
+
+
+class TestViewerState(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user", email="user@gmail.com", password="user1234"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", email="other@gmail.com", password="user1234"
+        )
+        self.tweets = [
+            Tweet.objects.create(user=self.other_user, content=f"Tweet {i}")
+            for i in range(5)
+        ]
+        Like.objects.create(user=self.user, tweet=self.tweets[0])
+        Retweet.objects.create(user=self.user, tweet=self.tweets[1])
+        Bookmark.objects.create(user=self.user, tweet=self.tweets[2])
+
+    def assertState(self, state):
+        self.assertEqual(state["is_liked"], {self.tweets[0].id})
+        self.assertEqual(state["is_retweeted"], {self.tweets[1].id})
+        self.assertEqual(state["is_bookmarked"], {self.tweets[2].id})
+
+    def test_cold_lookup_costs_one_query_per_flag(self):
+        tweet_ids = [tweet.id for tweet in self.tweets]
+
+        with self.assertNumQueries(3):
+            state = ViewerStateResolver(self.user).resolve(tweet_ids)
+
+        self.assertState(state)
+
+    def test_warm_lookup_does_not_query_the_database(self):
+        warm_viewer_state(self.user.id)
+        tweet_ids = [tweet.id for tweet in self.tweets]
+
+        with self.assertNumQueries(0):
+            state = ViewerStateResolver(self.user).resolve(tweet_ids)
+
+        self.assertState(state)
+
+    def test_writes_keep_warm_sets_in_sync(self):
+        warm_viewer_state(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.filter(user=self.user).delete()
+            Like.objects.create(user=self.user, tweet=self.tweets[3])
+
+        state = ViewerStateResolver(self.user).resolve(
+            [self.tweets[0].id, self.tweets[3].id]
+        )
+
+        self.assertEqual(state["is_liked"], {self.tweets[3].id})
+
+    def test_removals_are_applied_after_commit(self):
+        warm_viewer_state(self.user.id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Bookmark.objects.filter(user=self.user).delete()
+        resolver = ViewerStateResolver(self.user)
+        self.assertEqual(
+            resolver.resolve([self.tweets[2].id])["is_bookmarked"], {self.tweets[2].id}
+        )
+
+        for callback in callbacks:
+            callback()
+        resolver = ViewerStateResolver(self.user)
+        self.assertEqual(resolver.resolve([self.tweets[2].id])["is_bookmarked"], set())
+
+    def test_writes_during_a_warm_up_are_not_lost(self):
+        execute = Pipeline.execute
+        raced = []
+
+        def execute_after_a_like(pipe, *args, **kwargs):
+            if not raced:
+                # A like committing after the snapshot, before the set is ready.
+                raced.append(True)
+                with self.captureOnCommitCallbacks(execute=True):
+                    Like.objects.create(user=self.user, tweet=self.tweets[4])
+            return execute(pipe, *args, **kwargs)
+
+        with patch.object(Pipeline, "execute", execute_after_a_like):
+            warm_viewer_state(self.user.id)
+
+        with self.assertNumQueries(0):
+            state = ViewerStateResolver(self.user).resolve([self.tweets[4].id])
+        self.assertEqual(state["is_liked"], {self.tweets[4].id})
+
+    def test_rolled_back_writes_leave_no_flag(self):
+        warm_viewer_state(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    Like.objects.create(user=self.user, tweet=self.tweets[3])
+                    raise DatabaseError
+
+        state = ViewerStateResolver(self.user).resolve([self.tweets[3].id])
+        self.assertEqual(state["is_liked"], set())
+
+    @patch("tweets.signals.viewer_state.update_viewer_state")
+    def test_cascades_skip_the_viewer_sets(self, update_viewer_state):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tweets[0].delete()
+            self.user.delete()
+
+        update_viewer_state.assert_not_called()
+
+    @override_settings(VIEWER_STATE_MAX_SET_SIZE=0)
+    def test_large_relations_are_not_materialized(self):
+        warm_viewer_state(self.user.id)
+
+        conn = get_redis_connection("default")
+        self.assertFalse(conn.exists(viewer_state_ready_key(self.user.id, "is_liked")))
+        self.assertState(
+            ViewerStateResolver(self.user).resolve(tweet.id for tweet in self.tweets)
+        )
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    def test_flags_are_attached_to_user_posts(self):
+        Retweet.objects.create(user=self.other_user, tweet=self.tweets[0])
+        self.client.force_authenticate(user=self.user)
+        url = reverse("user-posts", kwargs={"username": self.other_user.username})
+
+        for _ in range(2):  # Cold, then warmed by the first read.
+            invalidate_user_posts_cache(self.other_user.id)
+            response = self.client.get(url)
+            retweet = response.data["results"][0]
+            self.assertEqual(retweet["type"], "retweet")
+            self.assertTrue(retweet["original_tweet"]["is_liked"])
+            self.assertFalse(retweet["original_tweet"]["is_retweeted"])
+
+            flags = {
+                post["id"]: (
+                    post["is_liked"],
+                    post["is_retweeted"],
+                    post["is_bookmarked"],
+                )
+                for post in response.data["results"][1:]
+            }
+            self.assertEqual(flags[self.tweets[1].id], (False, True, False))
+            self.assertEqual(flags[self.tweets[2].id], (False, False, True))
+            self.assertEqual(flags[self.tweets[3].id], (False, False, False))
@@ -0,0 +1,548 @@
+"""
+Materialized home timelines (fan-out-on-write).
+
+Every user with a materialized timeline has a Redis sorted set of the newest
+``TIMELINE_MAX_LENGTH`` posts of the accounts they follow (and their own), scored by
+``created_at``. New posts are pushed into the followers' sets by a Celery task, so
+reading a feed page costs O(page size) instead of a join over the whole follow graph.
+
+Fan-out is hybrid: authors above ``TIMELINE_CELEBRITY_THRESHOLD`` followers are never
+pushed, their posts are pulled at read time and merged with the timeline, so the cost
+of a single write stays bounded no matter who posts it. The celebrity set is recounted
+by a periodic task, which also moves the posts of authors crossing the threshold in or
+out of their followers' timelines.
+
+Once a timeline has been trimmed, ``timeline_boundary:<user id>`` records its oldest
+kept entry: the set holds every post newer than the boundary, older posts are read
+from the database. The boundary is recorded explicitly because entries removed by an
+unfollow or a delete make a trimmed timeline shorter without making it complete.
+"""
+
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django_redis import get_redis_connection
+
+from relationships.models import Follow
+from .feed import (
+    PostStream,
+    PostRefs,
+    hydrate_posts,
+    feed_stream,
+    user_posts_stream,
+)
+from .models import Tweet, Retweet
+
+
+def timeline_key(user_id):
+    return f"timeline:{user_id}"
+
+
+def timeline_ready_key(user_id):
+    # Marks a timeline as materialized, an empty sorted set does not exist in Redis.
+    return f"timeline_ready:{user_id}"
+
+
+def timeline_boundary_key(user_id):
+    # Oldest entry kept the last time the timeline was trimmed, absent until then.
+    return f"timeline_boundary:{user_id}"
+
+
+# KEYS: timeline, boundary. ARGV: max length, ttl, then score/member pairs.
+# Adds the members not older than the boundary, trims the timeline to its max
+# length and moves the boundary to the oldest entry kept.
+ADD_SCRIPT = """
+local boundary = redis.call('hmget', KEYS[2], 'score', 'kind', 'id')
+local boundary_score = tonumber(boundary[1])
+
+local function older_than_boundary(score, member)
+    if boundary_score == nil then
+        return false
+    end
+    if score ~= boundary_score then
+        return score < boundary_score
+    end
+    local kind, id = string.match(member, '^(%a+):(%d+):')
+    if kind ~= boundary[2] then
+        return kind < boundary[2]
+    end
+    return tonumber(id) < tonumber(boundary[3])
+end
+
+for i = 3, #ARGV, 2 do
+    local score = tonumber(ARGV[i])
+    if not older_than_boundary(score, ARGV[i + 1]) then
+        redis.call('zadd', KEYS[1], score, ARGV[i + 1])
+    end
+end
+
+local excess = redis.call('zcard', KEYS[1]) - tonumber(ARGV[1])
+if excess > 0 then
+    redis.call('zremrangebyrank', KEYS[1], 0, excess - 1)
+    local oldest = redis.call('zrange', KEYS[1], 0, 0, 'withscores')
+    local kind, id = string.match(oldest[1], '^(%a+):(%d+):')
+    redis.call('hset', KEYS[2], 'score', oldest[2], 'kind', kind, 'id', id)
+end
+
+for _, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        redis.call('expire', key, ARGV[2])
+    end
+end
+"""
+
+
+def _add_to_timeline(pipe, user_id, members):
+    """
+    Queue ``ADD_SCRIPT`` for ``{member: score}`` on ``pipe``.
+    """
+    args = []
+    for member, score in members.items():
+        args += [repr(score), member]
+    pipe.eval(
+        ADD_SCRIPT,
+        2,
+        timeline_key(user_id),
+        timeline_boundary_key(user_id),
+        settings.TIMELINE_MAX_LENGTH,
+        settings.TIMELINE_TTL,
+        *args,
+    )
+
+
+def post_kind(post):
+    return "tweet" if isinstance(post, Tweet) else "retweet"
+
+
+def timeline_member(kind, post_id, author_id):
+    return f"{kind}:{post_id}:{author_id}"
+
+
+def parse_timeline_member(member):
+    kind, post_id, author_id = member.decode().split(":")
+    return kind, int(post_id), int(author_id)
+
+
+def timeline_score(created_at):
+    return created_at.timestamp()
+
+
+def score_to_datetime(score):
+    return datetime.fromtimestamp(score, tz=timezone.utc)
+
+
+def _members_from_rows(rows):
+    return {
+        timeline_member(row["kind"], row["id"], row["user_id"]): timeline_score(
+            row["created_at"]
+        )
+        for row in rows
+    }
+
+
+def push_to_timelines(user_ids, kind, post_id, author_id, created_at):
+    """
+    Add a post to the materialized timelines among ``user_ids`` and trim them.
+    Cold timelines are skipped, they are rebuilt from the database on their next read.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    conn = get_redis_connection("default")
+
+    ready = conn.pipeline(transaction=False)
+    for user_id in user_ids:
+        ready.exists(timeline_ready_key(user_id))
+    flags = ready.execute()
+
+    members = {timeline_member(kind, post_id, author_id): timeline_score(created_at)}
+
+    pipe = conn.pipeline(transaction=False)
+    for user_id, is_ready in zip(user_ids, flags):
+        if is_ready:
+            _add_to_timeline(pipe, user_id, members)
+    pipe.execute()
+
+
+def remove_from_timelines(user_ids, kind, post_id, author_id):
+    member = timeline_member(kind, post_id, author_id)
+
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.zrem(timeline_key(user_id), member)
+    pipe.execute()
+
+
+CELEBRITIES_KEY = "timeline_celebrities"
+CELEBRITIES_REFRESH_SCHEDULED_KEY = "timeline_celebrities:refresh_scheduled"
+
+
+def count_celebrity_ids():
+    """
+    Ids of authors with at least ``TIMELINE_CELEBRITY_THRESHOLD`` followers, counted
+    over the whole follow graph. Only run by ``refresh_celebrities_task``.
+    """
+    return set(
+        Follow.objects.values("following")
+        .annotate(followers_count=Count("id"))
+        .filter(followers_count__gte=settings.TIMELINE_CELEBRITY_THRESHOLD)
+        .values_list("following", flat=True)
+    )
+
+
+def celebrity_ids():
+    """
+    Ids of the authors whose posts are pulled at read time instead of being fanned
+    out on write, as last counted by ``refresh_celebrities_task``. Requests never
+    count them: before the first count, the set is empty and a count is scheduled.
+    """
+    celebrities = cache.get(CELEBRITIES_KEY)
+    if celebrities is None:
+        schedule_celebrity_refresh()
+        celebrities = cache.get(CELEBRITIES_KEY, set())
+    return celebrities
+
+
+def schedule_celebrity_refresh():
+    from .tasks import refresh_celebrities_task
+
+    if cache.add(CELEBRITIES_REFRESH_SCHEDULED_KEY, 1, timeout=60):
+        refresh_celebrities_task.delay()
+
+
+def is_celebrity(user_id):
+    return user_id in celebrity_ids()
+
+
+def followed_celebrities_key(user_id):
+    return f"followed_celebrities:{user_id}"
+
+
+def followed_celebrity_ids(user):
+    """
+    Ids of the celebrities ``user`` follows, cached until the user follows or
+    unfollows someone or the celebrity set changes. Read on every feed request,
+    they are part of its cache key.
+    """
+    celebrities = celebrity_ids() - {user.id}
+    if not celebrities:
+        return set()
+
+    cached = cache.get(followed_celebrities_key(user.id))
+    if cached is not None and cached[0] == celebrities:
+        return cached[1]
+
+    followed = set(
+        Follow.objects.filter(follower=user, following_id__in=celebrities).values_list(
+            "following_id", flat=True
+        )
+    )
+    cache.set(
+        followed_celebrities_key(user.id),
+        (celebrities, followed),
+        timeout=settings.TIMELINE_CELEBRITY_REFRESH_INTERVAL,
+    )
+    return followed
+
+
+def forget_followed_celebrities(user_id):
+    cache.delete(followed_celebrities_key(user_id))
+
+
+def celebrity_stream(user, author_ids):
+    return PostStream(
+        Tweet.objects.filter(user_id__in=author_ids),
+        Retweet.objects.filter(user_id__in=author_ids),
+        viewer=user,
+    )
+
+
+def publish_post(post):
+    """
+    Push a new post into its author's own timeline right away (read-your-writes) and
+    fan it out to the followers once the transaction commits, which also invalidates
+    their cached feed pages.
+    """
+    from .tasks import fan_out_post_task
+
+    kind = post_kind(post)
+    push_to_timelines([post.user_id], kind, post.id, post.user_id, post.created_at)
+    transaction.on_commit(lambda: fan_out_post_task.delay(kind, post.id))
+
+
+def unpublish_post(post):
+    from .tasks import remove_post_from_timelines_task
+
+    kind = post_kind(post)
+    post_id, author_id = post.id, post.user_id
+    remove_from_timelines([author_id], kind, post_id, author_id)
+    transaction.on_commit(
+        lambda: remove_post_from_timelines_task.delay(kind, post_id, author_id)
+    )
+
+
+def rebuild_timeline(user):
+    """
+    Materialize a timeline from the database, bounded to ``TIMELINE_MAX_LENGTH`` rows.
+    """
+    excluded = followed_celebrity_ids(user)
+    rows = feed_stream(user, exclude_authors=excluded).rows()
+    rows = list(rows[: settings.TIMELINE_MAX_LENGTH + 1])
+    truncated = len(rows) > settings.TIMELINE_MAX_LENGTH
+    rows = rows[: settings.TIMELINE_MAX_LENGTH]
+    members = _members_from_rows(rows)
+
+    pipe = get_redis_connection("default").pipeline()
+    pipe.delete(timeline_key(user.id), timeline_boundary_key(user.id))
+    if members:
+        pipe.zadd(timeline_key(user.id), members)
+        pipe.expire(timeline_key(user.id), settings.TIMELINE_TTL)
+    if truncated:
+        oldest = rows[-1]
+        pipe.hset(
+            timeline_boundary_key(user.id),
+            mapping={
+                "score": repr(timeline_score(oldest["created_at"])),
+                "kind": oldest["kind"],
+                "id": oldest["id"],
+            },
+        )
+        pipe.expire(timeline_boundary_key(user.id), settings.TIMELINE_TTL)
+    pipe.set(timeline_ready_key(user.id), 1, ex=settings.TIMELINE_TTL)
+    pipe.execute()
+
+
+def backfill_timeline(follower_id, author):
+    """
+    Merge the newest posts of a newly followed author into the follower's timeline.
+    """
+    if not is_celebrity(author.id):
+        backfill_timelines([follower_id], author)
+
+
+def backfill_timelines(user_ids, author):
+    """
+    Merge the newest posts of ``author`` into the materialized timelines among
+    ``user_ids``.
+    """
+    conn = get_redis_connection("default")
+    ready = conn.pipeline(transaction=False)
+    for user_id in user_ids:
+        ready.exists(timeline_ready_key(user_id))
+    user_ids = [user_id for user_id, exists in zip(user_ids, ready.execute()) if exists]
+    if not user_ids:
+        return
+
+    rows = user_posts_stream(author, viewer=None).rows()
+    rows = rows[: settings.TIMELINE_MAX_LENGTH]
+    members = _members_from_rows(rows)
+    if not members:
+        return
+
+    pipe = conn.pipeline()
+    for user_id in user_ids:
+        _add_to_timeline(pipe, user_id, members)
+    pipe.execute()
+
+
+def purge_author(follower_id, author_id):
+    """
+    Drop every post of an unfollowed author from the follower's timeline.
+    """
+    purge_author_from_timelines([follower_id], author_id)
+
+
+def purge_author_from_timelines(user_ids, author_id):
+    """
+    Drop every post of ``author_id`` from the timelines of ``user_ids``.
+    """
+    conn = get_redis_connection("default")
+    suffix = f":{author_id}".encode()
+
+    pipe = conn.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.zrange(timeline_key(user_id), 0, -1)
+
+    stale = conn.pipeline(transaction=False)
+    for user_id, members in zip(user_ids, pipe.execute()):
+        members = [member for member in members if member.endswith(suffix)]
+        if members:
+            stale.zrem(timeline_key(user_id), *members)
+    stale.execute()
+
+
+def timeline_stream(user):
+    """
+    Feed stream read from the user's materialized timeline, building it on first use.
+    """
+    conn = get_redis_connection("default")
+    if not conn.exists(timeline_ready_key(user.id)):
+        rebuild_timeline(user)
+    else:
+        pipe = conn.pipeline(transaction=False)
+        pipe.expire(timeline_key(user.id), settings.TIMELINE_TTL)
+        pipe.expire(timeline_boundary_key(user.id), settings.TIMELINE_TTL)
+        pipe.expire(timeline_ready_key(user.id), settings.TIMELINE_TTL)
+        pipe.execute()
+
+    return TimelineStream(user)
+
+
+def merge_rows(*sources):
+    """
+    Merge row lists into one ``-created_at, -kind, -id`` ordered list without duplicates.
+    """
+    merged = {}
+    for rows in sources:
+        for row in rows:
+            merged[(row["kind"], row["id"])] = row
+
+    return sorted(merged.values(), key=TimelineStream.order_key, reverse=True)
+
+
+class TimelineStream:
+    """
+    Paginator-compatible stream over a materialized timeline.
+
+    Offers the same interface as PostStream (slicing, ``count()``, ``seek()``,
+    ``position()``, ``refs()``). Posts of followed celebrities are not fanned out,
+    they are pulled from the database at read time and merged with the timeline
+    entries.
+    A timeline only keeps the newest posts, so once a trimmed timeline is exhausted,
+    reading continues from the database right after its boundary.
+    """
+
+    ordered = True
+    position = staticmethod(PostStream.position)
+
+    def __init__(self, user, after=None, celebrity_ids=None):
+        self.user = user
+        self.after = after
+        self.key = timeline_key(user.id)
+        self.boundary_key = timeline_boundary_key(user.id)
+        self.conn = get_redis_connection("default")
+
+        if celebrity_ids is None:
+            celebrity_ids = followed_celebrity_ids(user)
+        self.celebrity_ids = celebrity_ids
+
+    def seek(self, created_at, kind, pk):
+        return TimelineStream(
+            self.user, after=(created_at, kind, pk), celebrity_ids=self.celebrity_ids
+        )
+
+    def _entry(self, member, score):
+        kind, post_id, author_id = parse_timeline_member(member)
+        return {
+            "id": post_id,
+            "user_id": author_id,
+            "created_at": score_to_datetime(score),
+            "kind": kind,
+        }
+
+    @staticmethod
+    def order_key(row):
+        return row["created_at"], row["kind"], row["id"]
+
+    def _oldest(self):
+        """
+        Position of the boundary once the timeline was trimmed, None while it holds
+        the whole feed.
+        """
+        boundary = self.conn.hgetall(self.boundary_key)
+        if not boundary:
+            return None
+
+        return (
+            score_to_datetime(float(boundary[b"score"])),
+            boundary[b"kind"].decode(),
+            int(boundary[b"id"]),
+        )
+
+    def _fallback(self, position):
+        return feed_stream(self.user).seek(*position)
+
+    def _pulled(self, limit, oldest):
+        """
+        Newest posts of followed celebrities after the cursor, newer than ``oldest``.
+        Older ones are already covered by the database fallback.
+        """
+        if not self.celebrity_ids:
+            return []
+
+        stream = celebrity_stream(self.user, self.celebrity_ids)
+        if self.after is not None:
+            stream = stream.seek(*self.after)
+
+        rows = stream.rows()[:limit]
+        return [row for row in rows if oldest is None or self.order_key(row) > oldest]
+
+    def count(self):
+        length = self.conn.zcard(self.key)
+        oldest = self._oldest()
+
+        if self.celebrity_ids:
+            stream = celebrity_stream(self.user, self.celebrity_ids)
+            pulled = stream.count()
+            if oldest is not None:
+                pulled -= stream.seek(*oldest).count()
+            length += pulled
+
+        if oldest is None:
+            return length
+
+        return length + self._fallback(oldest).count()
+
+    def _timeline_rows(self, start, stop):
+        if self.after is None:
+            members = self.conn.zrevrange(self.key, start, stop - 1, withscores=True)
+            return [self._entry(member, score) for member, score in members]
+
+        # Posts sharing the cursor's timestamp are ordered by (kind, id) in Python.
+        score = timeline_score(self.after[0])
+        ties = self.conn.zcount(self.key, score, score)
+        members = self.conn.zrevrangebyscore(
+            self.key, score, "-inf", start=0, num=stop + ties, withscores=True
+        )
+        rows = [self._entry(member, score) for member, score in members]
+        rows = [row for row in rows if self.order_key(row) < self.after]
+        rows.sort(key=self.order_key, reverse=True)
+        return rows[start:stop]
+
+    def slice_rows(self, start, stop):
+        oldest = self._oldest()
+
+        if self.celebrity_ids:
+            # Both sources are read from the top so the merged slice is exact.
+            pulled = self._pulled(stop, oldest)
+            rows = merge_rows(self._timeline_rows(0, stop), pulled)[start:stop]
+        else:
+            pulled = []
+            rows = self._timeline_rows(start, stop)
+
+        missing = stop - start - len(rows)
+        if missing > 0 and oldest is not None:
+            if self.after is None:
+                newer = self.conn.zcard(self.key) + len(pulled)
+                offset = max(0, start - newer)
+                position = oldest
+            else:
+                offset = 0
+                position = min(oldest, self.after)
+            fallback = self._fallback(position).rows()[offset : offset + missing]
+            rows = merge_rows(rows, fallback)
+
+        return rows
+
+    def refs(self):
+        return PostRefs(self)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        return hydrate_posts(self.slice_rows(index.start or 0, index.stop), self.user)
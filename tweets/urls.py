@@ -10,11 +10,14 @@ from .views import (
     CommentDetailAPIView,
     BookmarkAPIView,
     UserBookmarksAPIView,
+    SearchPostsAPIView,
+    InteractionBatchAPIView,
 )
 
 urlpatterns = [
     path("", CreateTweetAPIView.as_view(), name="create-tweet"),
     path("feed/", FeedAPIView.as_view(), name="feed"),
+    path("search/", SearchPostsAPIView.as_view(), name="search-posts"),
     path("<int:pk>/", TweetAPIView.as_view(), name="tweet-detail"),
     path("<int:pk>/retweets/", RetweetAPIView.as_view(), name="retweet"),
     path("<int:pk>/likes/", LikeTweetAPIView.as_view(), name="like-tweet"),
@@ -27,4 +30,9 @@ urlpatterns = [
     path("user/<str:username>/", UserPostsAPIView.as_view(), name="user-posts"),
     path("<int:pk>/bookmark/", BookmarkAPIView.as_view(), name="bookmark"),
     path("bookmarks/", UserBookmarksAPIView.as_view(), name="user-bookmarks"),
+    path(
+        "interactions/batch/",
+        InteractionBatchAPIView.as_view(),
+        name="interaction-batch",
+    ),
 ]
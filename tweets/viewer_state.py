@@ -0,0 +1,207 @@
+"""
+Per-viewer interaction flags (``is_liked``, ``is_retweeted``, ``is_bookmarked``).
+
+Flags are resolved for a whole page of tweets at once instead of one ``EXISTS``
+subquery per row and flag. Each flag costs at most one ``tweet_id IN (...)`` query,
+or none when the viewer's Redis set for that relation is warm.
+
+A warm set holds every tweet id the viewer has liked, retweeted or bookmarked. Sets
+are built in the background on a cold read, kept in sync by signals on writes and
+expire after ``VIEWER_STATE_TTL``. Viewers with more than ``VIEWER_STATE_MAX_SET_SIZE``
+rows in a relation are never materialized and always read from the database.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .models import Like, Retweet, Bookmark
+
+VIEWER_STATE_RELATIONS = {
+    "is_liked": Like,
+    "is_retweeted": Retweet,
+    "is_bookmarked": Bookmark,
+}
+
+
+def viewer_state_key(user_id, flag):
+    return f"viewer_state:{user_id}:{flag}"
+
+
+def viewer_state_ready_key(user_id, flag):
+    # An empty set does not exist in Redis, readiness is tracked separately.
+    return f"viewer_state_ready:{user_id}:{flag}"
+
+
+def viewer_state_warming_key(user_id):
+    return f"viewer_state_warming:{user_id}"
+
+
+def warm_viewer_state(user_id):
+    """
+    Materialize the viewer's relation sets from the database. Each relation is
+    read again once its set is marked ready, to pick up the writes that committed
+    in between.
+    """
+    conn = get_redis_connection("default")
+    limit = settings.VIEWER_STATE_MAX_SET_SIZE
+
+    for flag, model in VIEWER_STATE_RELATIONS.items():
+        relation = model.objects.filter(user_id=user_id).values_list(
+            "tweet_id", flat=True
+        )
+        tweet_ids = list(relation[: limit + 1])
+        if len(tweet_ids) > limit:
+            # Too large to mirror, don't retry before the other sets expire.
+            cache.set(
+                viewer_state_warming_key(user_id), 1, timeout=settings.VIEWER_STATE_TTL
+            )
+            continue
+
+        key = viewer_state_key(user_id, flag)
+        pipe = conn.pipeline()
+        pipe.delete(key)
+        if tweet_ids:
+            pipe.sadd(key, *tweet_ids)
+            pipe.expire(key, settings.VIEWER_STATE_TTL)
+        pipe.set(viewer_state_ready_key(user_id, flag), 1, ex=settings.VIEWER_STATE_TTL)
+        pipe.execute()
+
+        # Writes committed while the snapshot was read found the set not ready and
+        # were dropped; the writers keep it in sync from here on.
+        snapshot = set(tweet_ids)
+        current = set(relation[: limit + 1])
+        added, removed = current - snapshot, snapshot - current
+        if added or removed:
+            pipe = conn.pipeline()
+            if added:
+                pipe.sadd(key, *added)
+                pipe.expire(key, settings.VIEWER_STATE_TTL)
+            if removed:
+                pipe.srem(key, *removed)
+            pipe.execute()
+
+
+def schedule_warm_viewer_state(user_id):
+    from .tasks import warm_viewer_state_task
+
+    # One warm-up per viewer at a time, concurrent cold reads just hit the database.
+    if cache.add(viewer_state_warming_key(user_id), 1, timeout=60):
+        warm_viewer_state_task.delay(user_id)
+
+
+def update_viewer_state(user_id, flag, tweet_id, present):
+    """
+    Reflect a like/retweet/bookmark write in the viewer's set, if it is materialized.
+    """
+    update_viewer_states(user_id, [(flag, tweet_id, present)])
+
+
+def update_viewer_states(user_id, changes):
+    """
+    ``update_viewer_state`` for many ``(flag, tweet_id, present)`` writes of one
+    viewer, in two Redis round trips.
+    """
+    flags = sorted({flag for flag, _, _ in changes})
+    if not flags:
+        return
+
+    conn = get_redis_connection("default")
+    ready = conn.pipeline(transaction=False)
+    for flag in flags:
+        ready.exists(viewer_state_ready_key(user_id, flag))
+    materialized = {flag for flag, exists in zip(flags, ready.execute()) if exists}
+    if not materialized:
+        return
+
+    pipe = conn.pipeline()
+    for flag, tweet_id, present in changes:
+        if flag not in materialized:
+            continue
+        key = viewer_state_key(user_id, flag)
+        if present:
+            pipe.sadd(key, tweet_id)
+            pipe.expire(key, settings.VIEWER_STATE_TTL)
+        else:
+            pipe.srem(key, tweet_id)
+    pipe.execute()
+
+
+class ViewerStateResolver:
+    """
+    Resolves the viewer's interaction flags for a page of tweets in bulk.
+
+    Usage::
+
+        ViewerStateResolver(request.user).attach(tweets)
+
+    sets ``is_liked``, ``is_retweeted`` and ``is_bookmarked`` on every tweet before
+    serialization.
+    """
+
+    def __init__(self, viewer):
+        self.viewer = viewer
+
+    def resolve(self, tweet_ids):
+        """
+        Return ``{flag: set of tweet ids}`` for the given ids.
+        """
+        tweet_ids = list(dict.fromkeys(tweet_ids))
+        state = {flag: set() for flag in VIEWER_STATE_RELATIONS}
+        if not tweet_ids or self.viewer is None or not self.viewer.is_authenticated:
+            return state
+
+        user_id = self.viewer.id
+        conn = get_redis_connection("default")
+        flags = list(VIEWER_STATE_RELATIONS)
+
+        ready = conn.pipeline(transaction=False)
+        for flag in flags:
+            ready.exists(viewer_state_ready_key(user_id, flag))
+        warm = [flag for flag, is_ready in zip(flags, ready.execute()) if is_ready]
+
+        if warm:
+            pipe = conn.pipeline(transaction=False)
+            for flag in warm:
+                pipe.smismember(viewer_state_key(user_id, flag), tweet_ids)
+            for flag, members in zip(warm, pipe.execute()):
+                state[flag] = {
+                    tweet_id for tweet_id, member in zip(tweet_ids, members) if member
+                }
+
+        cold = [flag for flag in flags if flag not in warm]
+        for flag in cold:
+            state[flag] = set(
+                VIEWER_STATE_RELATIONS[flag]
+                .objects.filter(user_id=user_id, tweet_id__in=tweet_ids)
+                .values_list("tweet_id", flat=True)
+            )
+
+        if cold:
+            schedule_warm_viewer_state(user_id)
+
+        return state
+
+    def attach(self, tweets):
+        tweets = list(tweets)
+        state = self.resolve(tweet.id for tweet in tweets)
+
+        for tweet in tweets:
+            for flag, tweet_ids in state.items():
+                setattr(tweet, flag, tweet.id in tweet_ids)
+
+        return tweets
+
+    def overlay(self, payloads):
+        """
+        Same as ``attach()``, for serialized tweets (dicts with an ``id``) that may
+        come from a cache shared between viewers.
+        """
+        payloads = list(payloads)
+        state = self.resolve(payload["id"] for payload in payloads)
+
+        for payload in payloads:
+            for flag, tweet_ids in state.items():
+                payload[flag] = payload["id"] in tweet_ids
+
+        return payloads
@@ -1,13 +1,11 @@
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
-from django.db.models import Prefetch, Count, Exists, OuterRef, Q
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from rest_framework import generics, filters, mixins, status
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .cache_utils import invalidate_feed_cache, get_feed_cache_key, invalidate_user_posts_cache, get_user_posts_cache_key,get_tweet_cache_key, invalidate_tweet_cache
+from .cache_utils import invalidate_feed_cache, get_feed_cache_key, invalidate_user_posts_cache, get_user_posts_cache_key,get_tweet_cache_key, invalidate_tweet_cache, invalidate_post_cache, get_comment_section_cache_key
 from .serializers import (
     TweetSerializer,
     FeedSerializer,
@@ -16,30 +14,48 @@ from .serializers import (
     LikeTweetSerializer,
     CommentOnTweetSerializer,
     CommentSerializer,
+    CommentThreadSerializer,
     PostSerializer,
     BookmarkSerializer,
     BookmarkedTweetSerializer,
+    InteractionBatchSerializer,
 )
 from .models import Tweet, Like, Comment, Retweet, Bookmark
+from .counters import apply_pending_deltas
+from .feed import (
+    feed_stream,
+    user_posts_stream,
+    prepare_tweets,
+    tweets_of,
+    overlay_posts,
+)
+from .viewer_state import ViewerStateResolver
+from .post_cache import load_posts, row_ref, post_ref
+from .search import SearchStream
+from .timelines import (
+    timeline_stream,
+    followed_celebrity_ids,
+    publish_post,
+    unpublish_post,
+)
 from .permissions import IsAuthorOrReadOnly, IsTweetAuthor, IsCommentOwner, CanEdit
-from config.throttles import ContentCreationRateThrottle, InteractionRateThrottle
+from config.throttles import (
+    ContentCreationRateThrottle,
+    InteractionRateThrottle,
+    InteractionBatchRateThrottle,
+)
+from config.pagination import KeysetPagination
+from config.identity_map import get_instance_or_404
+from config.upsert import insert_or_get
+from accounts.usernames import get_user_id_or_404
+from .comment_tree import CommentTree
+from .comment_section import prefetch_reply_previews, cache_comment_section
+from .interaction_batch import apply_interactions
 
 # Create your views here.
 User = get_user_model()
 
 
-def prefetch_top_level_comments(path: str = "comments"):
-    replies_qs = Comment.objects.select_related("user", "user__profile")
-
-    top_level_comments_qs = (
-        Comment.objects.filter(parent=None)
-        .select_related("user", "user__profile")
-        .prefetch_related(Prefetch("replies", queryset=replies_qs))
-    )
-
-    return Prefetch(path, queryset=top_level_comments_qs)
-
-
 class CreateTweetAPIView(generics.CreateAPIView):
     queryset = Tweet.objects.all()
     serializer_class = TweetSerializer
@@ -47,112 +63,71 @@ class CreateTweetAPIView(generics.CreateAPIView):
     throttle_classes = [ContentCreationRateThrottle]
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        tweet = serializer.save(user=self.request.user)
+        publish_post(tweet)
         invalidate_feed_cache(self.request.user.id)
         invalidate_user_posts_cache(self.request.user.id)
 
 
-class FeedAPIView(generics.ListAPIView):
+class CachedPostPageMixin:
     """
-    API endpoint that returns a personalized feed of tweets and retweets from followed users
-    and the current user, sorted by creation date in descending order.
+    Lists posts from a cached page of post references.
+
+    The page cache only keeps ``[kind, id, tweet_id]`` references and the pagination
+    links, so invalidating it is cheap. Posts are rendered from the per-post payload
+    cache (see ``tweets.post_cache``) and the viewer's flags are merged last. Views
+    using it define ``get_page_cache_key``.
     """
 
-    serializer_class = FeedSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["user__username", "user__profile__name", "content"]
+    page_cache_timeout = 120
 
     def list(self, request, *args, **kwargs):
-        page = request.query_params.get("page", "1")
-        search = request.query_params.get("search", "")
-        cache_key = get_feed_cache_key(request.user.id, page, search)
+        cache_key = self.get_page_cache_key()
         cached = cache.get(cache_key)
 
-        if cached is not None:
-            return Response(cached)
-
-        queryset = self.get_queryset()
-        page = self.paginate_queryset(queryset)
+        if cached is None:
+            rows = self.paginate_queryset(self.get_queryset().refs())
+            posts = load_posts(row_ref(row) for row in rows)
+            data = self.get_paginated_response(posts).data
+            cached = {**data, "results": [post_ref(post) for post in posts]}
+            cache.set(cache_key, cached, timeout=self.page_cache_timeout)
+        else:
+            posts = load_posts(cached["results"])
 
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response = self.get_paginated_response(serializer.data)
-            cache.set(cache_key, response.data, timeout=120)
-            return response
-
-        serializer = self.get_serializer(queryset, many=True)
-        cache.set(cache_key, serializer.data, timeout=120)
-        return Response(serializer.data)
+        return Response({**cached, "results": overlay_posts(posts, request.user)})
 
-    def get_queryset(self):
-        from django.db.models import Count, Exists, OuterRef, Q
 
-        current_user = self.request.user
-        following_users = User.objects.filter(followers__follower=current_user)
-        tweets = (
-            Tweet.objects.filter(Q(user__in=following_users) | Q(user=current_user))
-            .select_related("user", "user__profile")
-            .annotate(
-                likes_count=Count("likes", distinct=True),
-                comments_count=Count(
-                    "comments", filter=Q(comments__parent=None), distinct=True
-                ),
-                retweets_count=Count("retweets", distinct=True),
-                is_liked=Exists(
-                    Like.objects.filter(user=current_user, tweet=OuterRef("pk"))
-                ),
-                is_retweeted=Exists(
-                    Retweet.objects.filter(user=current_user, tweet=OuterRef("pk"))
-                ),
-                is_bookmarked=Exists(
-                    Bookmark.objects.filter(user=current_user, tweet=OuterRef("pk"))
-                ),
-            )
-        )
+class FeedAPIView(CachedPostPageMixin, generics.ListAPIView):
+    """
+    API endpoint that returns a personalized feed of tweets and retweets from followed users
+    and the current user, sorted by creation date in descending order.
+    """
 
-        retweets = (
-            Retweet.objects.filter(Q(user__in=following_users) | Q(user=current_user))
-            .select_related(
-                "user", "user__profile", "tweet", "tweet__user", "tweet__user__profile"
-            )
-            .annotate(
-                tweet_likes_count=Count("tweet__likes", distinct=True),
-                tweet_comments_count=Count(
-                    "tweet__comments",
-                    filter=Q(tweet__comments__parent=None),
-                    distinct=True,
-                ),
-                tweet_retweets_count=Count("tweet__retweets", distinct=True),
-                tweet_is_liked=Exists(
-                    Like.objects.filter(user=current_user, tweet=OuterRef("tweet"))
-                ),
-                tweet_is_retweeted=Exists(
-                    Retweet.objects.filter(user=current_user, tweet=OuterRef("tweet"))
-                ),
-                tweet_is_bookmarked=Exists(
-                    Bookmark.objects.filter(user=current_user, tweet=OuterRef("tweet"))
-                ),
-            )
-        )
+    serializer_class = FeedSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [filters.SearchFilter]
+    search_fields = ["user__username", "user__profile__name", "content"]
 
-        posts = sorted(
-            list(tweets) + list(retweets), key=lambda x: x.created_at, reverse=True
+    def get_page_cache_key(self):
+        params = self.request.query_params
+        return get_feed_cache_key(
+            self.request.user.id,
+            params.get("page", ""),
+            params.get("search", ""),
+            params.get("cursor", ""),
+            celebrity_ids=followed_celebrity_ids(self.request.user),
         )
 
-        search_query = self.request.query_params.get("search", "").lower()
+    def get_queryset(self):
+        search_query = self.request.query_params.get("search", "")
         if search_query:
-            posts = [
-                p for p in posts 
-                if search_query in getattr(p, 'content', '').lower() or 
-                   search_query in p.user.username.lower() or
-                   search_query in getattr(p, 'quote', '').lower()
-            ]
+            return feed_stream(self.request.user).search(search_query)
 
-        return posts
+        return timeline_stream(self.request.user)
 
 
-class UserPostsAPIView(generics.ListAPIView):
+class UserPostsAPIView(CachedPostPageMixin, generics.ListAPIView):
     """
     API endpoint that returns a paginated list of a user's posts (tweets and retweets)
     sorted by creation date in descending order.
@@ -166,80 +141,46 @@ class UserPostsAPIView(generics.ListAPIView):
 
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    page_cache_timeout = 300  # 5 minutes
 
-        
-    def get_queryset(self):
+    def get_author_id(self):
+        return get_user_id_or_404(self.kwargs["username"])
 
-        user = get_object_or_404(User, username=self.kwargs["username"])
-        current_user = self.request.user
-        
-        tweets = (
-            Tweet.objects.filter(user=user)
-            .select_related("user", "user__profile")
-            .annotate(
-                likes_count=Count("likes", distinct=True),
-                comments_count=Count(
-                    "comments", filter=Q(comments__parent=None), distinct=True
-                ),
-                retweets_count=Count("retweets", distinct=True),
-                is_liked=Exists(
-                    Like.objects.filter(user=current_user, tweet=OuterRef("pk"))
-                ),
-                is_retweeted=Exists(
-                    Retweet.objects.filter(user=current_user, tweet=OuterRef("pk"))
-                ),
-                is_bookmarked=Exists(
-                    Bookmark.objects.filter(user=current_user, tweet=OuterRef("pk"))
-                ),
-            )
+    def get_page_cache_key(self):
+        params = self.request.query_params
+        return get_user_posts_cache_key(
+            self.get_author_id(), params.get("page", ""), params.get("cursor", "")
         )
 
-        retweets = (
-            Retweet.objects.filter(user=user)
-            .select_related(
-                "user", "user__profile", "tweet", "tweet__user", "tweet__user__profile"
-            )
-            .annotate(
-                tweet_likes_count=Count("tweet__likes", distinct=True),
-                tweet_comments_count=Count(
-                    "tweet__comments",
-                    filter=Q(tweet__comments__parent=None),
-                    distinct=True,
-                ),
-                tweet_retweets_count=Count("tweet__retweets", distinct=True),
-                tweet_is_liked=Exists(
-                    Like.objects.filter(user=current_user, tweet=OuterRef("tweet"))
-                ),
-                tweet_is_retweeted=Exists(
-                    Retweet.objects.filter(user=current_user, tweet=OuterRef("tweet"))
-                ),
-                tweet_is_bookmarked=Exists(
-                    Bookmark.objects.filter(user=current_user, tweet=OuterRef("tweet"))
-                ),
-            )
-        )
+    def get_queryset(self):
+        return user_posts_stream(self.get_author_id(), viewer=None)
 
-        posts = sorted(
-            list(tweets) + list(retweets), key=lambda x: x.created_at, reverse=True
-        )
 
-        return posts
+class SearchPostsAPIView(generics.ListAPIView):
+    """
+    API endpoint that searches every tweet and retweet quote with PostgreSQL
+    full-text search (``?q=``), most relevant first.
+    """
 
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticated]
 
-    def list(self, request, *args, **kwargs):
-            user = get_object_or_404(User, username=self.kwargs["username"])
-            viewer = request.user
-            page = request.query_params.get("page", "1")
+    def get_search_term(self):
+        term = self.request.query_params.get("q", "").strip()
+        if not term:
+            raise ValidationError(
+                {"error": "missing_query", "detail": "The q parameter is required."}
+            )
+        return term
 
-            cache_key = get_user_posts_cache_key(user.id, viewer.id,page)
-            cached = cache.get(cache_key)
+    def get_queryset(self):
+        return SearchStream(self.get_search_term())
 
-            if cached is not None:
-                return Response(cached)
-            
-            response = super().list(request, *args, **kwargs)
-            cache.set(cache_key, response.data, timeout=300) # 5 minutes
-            return response
+    def list(self, request, *args, **kwargs):
+        rows = self.paginate_queryset(self.get_queryset())
+        posts = load_posts(row_ref(row) for row in rows)
+        return self.get_paginated_response(overlay_posts(posts, request.user))
 
 
 class TweetAPIView(generics.RetrieveUpdateDestroyAPIView):
@@ -249,8 +190,6 @@ class TweetAPIView(generics.RetrieveUpdateDestroyAPIView):
         return (
             Tweet.objects.all()
             .select_related("user", "user__profile")
-            .prefetch_related(prefetch_top_level_comments())
-            .annotate(likes_count=Count("likes", distinct=True))
         )
 
     def get_serializer_class(self):
@@ -260,19 +199,32 @@ class TweetAPIView(generics.RetrieveUpdateDestroyAPIView):
         return RetrieveTweetSerializer
     
     def retrieve(self, request, *args, **kwargs):
-        viewer = request.user
-        tweet_id = self.kwargs["pk"]
+        tweet_id = int(self.kwargs["pk"])
 
-        cache_key = get_tweet_cache_key(tweet_id,viewer.id)
-        cached = cache.get(cache_key)
+        cache_key = get_tweet_cache_key(tweet_id)
+        section_key = get_comment_section_cache_key(tweet_id)
+        cached = cache.get_many([cache_key, section_key])
+        data = cached.get(cache_key)
 
-        if cached is not None:
-            return Response(cached)
-        
-        tweet = self.get_object()
-        serializer = self.get_serializer(tweet)
-        cache.set(cache_key, serializer.data, timeout=300) # 5 minutes
-        return Response(serializer.data)
+        if data is None:
+            tweet = self.get_object()
+            apply_pending_deltas([tweet])
+            data = self.get_serializer(tweet).data
+            cache.set(cache_key, data, timeout=300) # 5 minutes
+
+        # First page of comments only, cached once per tweet and linked to the rest.
+        section = cached.get(section_key) or cache_comment_section(tweet_id)
+
+        state = ViewerStateResolver(request.user).resolve([tweet_id])
+        flags = {flag: tweet_id in tweet_ids for flag, tweet_ids in state.items()}
+        return Response(
+            {
+                **data,
+                "comments": section["results"],
+                "comments_next": section["next"],
+                **flags,
+            }
+        )
 
     def perform_update(self, serializer):
         tweet = serializer.save()
@@ -283,6 +235,7 @@ class TweetAPIView(generics.RetrieveUpdateDestroyAPIView):
     def perform_destroy(self, instance):
         user_id = instance.user.id
         tweet_id = instance.id
+        unpublish_post(instance)
         instance.delete()
         invalidate_feed_cache(user_id)
         invalidate_user_posts_cache(user_id)
@@ -290,7 +243,6 @@ class TweetAPIView(generics.RetrieveUpdateDestroyAPIView):
 
 
 class RetweetAPIView(
-    mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
     generics.GenericAPIView,
@@ -306,7 +258,12 @@ class RetweetAPIView(
         return super().get_throttles()
 
     def get_tweet(self):
-        return get_object_or_404(Tweet, pk=self.kwargs["pk"])
+        # The author is preloaded for the retweet returned by POST.
+        return get_instance_or_404(
+            self.request,
+            Tweet.objects.select_related("user", "user__profile"),
+            self.kwargs["pk"],
+        )
 
     def get_queryset(self):
         return (
@@ -314,66 +271,43 @@ class RetweetAPIView(
             .select_related(
                 "user", "user__profile", "tweet", "tweet__user", "tweet__user__profile"
             )
-            .annotate(
-                tweet_likes_count=Count("tweet__likes", distinct=True),
-                tweet_comments_count=Count(
-                    "tweet__comments",
-                    filter=Q(tweet__comments__parent=None),
-                    distinct=True,
-                ),
-                tweet_retweets_count=Count("tweet__retweets", distinct=True),
-                tweet_is_liked=Exists(
-                    Like.objects.filter(user=self.request.user, tweet=self.get_tweet())
-                ),
-                tweet_is_retweeted=Exists(
-                    Retweet.objects.filter(
-                        user=self.request.user, tweet=self.get_tweet()
-                    )
-                ),
-                tweet_is_bookmarked=Exists(
-                    Bookmark.objects.filter(
-                        user=self.request.user, tweet=self.get_tweet()
-                    )
-                ),
-            )
         )
 
-    def get_serializer(self, *args, **kwargs):
-        kwargs["context"] = {
-            **self.get_serializer_context(),
-            "user": self.request.user,
-            "tweet": self.get_tweet(),
-        }
-
-        return super().get_serializer(*args, **kwargs)
-
-    def perform_create(self, serializer):
-        try:
-            serializer.save(user=self.request.user, tweet=self.get_tweet())
-        except IntegrityError:
-            raise ValidationError(
-                {
-                    "error": "already_retweeted",
-                    "detail": "You have already retweeted this tweet. Use DELETE to unretweet.",
-                }
-            )
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            prepare_tweets(tweets_of(page), self.request.user)
+        return page
 
     def post(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        if response.status_code == status.HTTP_201_CREATED:
-            instance = self.get_queryset().get(pk=response.data["id"])
-            serializer = self.get_serializer(instance)
+        # Idempotent: retweeting again returns the existing retweet.
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        retweet, created = insert_or_get(
+            Retweet,
+            ["user", "tweet"],
+            user=request.user,
+            tweet=self.get_tweet(),
+            **serializer.validated_data,
+        )
+        if created:
+            publish_post(retweet)
             invalidate_feed_cache(request.user.id)
             invalidate_user_posts_cache(request.user.id)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        return response
+        prepare_tweets([retweet.tweet], request.user)
+        return Response(
+            self.get_serializer(retweet).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
     def get(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
     def delete(self, request, *args, **kwargs):
         instance = get_object_or_404(Retweet, tweet=self.get_tweet(), user=request.user)
+        unpublish_post(instance)
+        invalidate_post_cache("retweet", [instance.id])
         self.perform_destroy(instance)
         invalidate_feed_cache(request.user.id)
         invalidate_user_posts_cache(request.user.id)
@@ -382,7 +316,6 @@ class RetweetAPIView(
 
 class LikeTweetAPIView(
     mixins.ListModelMixin,
-    mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     generics.GenericAPIView,
 ):
@@ -403,12 +336,7 @@ class LikeTweetAPIView(
         )
 
     def get_tweet(self):
-        return get_object_or_404(Tweet, pk=self.kwargs["pk"])
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context["tweet"] = self.get_tweet()
-        return context
+        return get_instance_or_404(self.request, Tweet, self.kwargs["pk"])
 
     def get_permissions(self):
         if self.request.method == "GET":
@@ -416,28 +344,18 @@ class LikeTweetAPIView(
 
         return super().get_permissions()
 
-    def perform_create(self, serializer):
-        try:
-            serializer.save(user=self.request.user, tweet=self.get_tweet())
-        except IntegrityError:
-            raise ValidationError(
-                {
-                    "error": "already_liked",
-                    "detail": "You have already liked this tweet. Use DELETE to unlike.",
-                }
-            )
-
     def get(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        if response.status_code == status.HTTP_201_CREATED:
-            instance = self.get_queryset().get(pk=response.data["id"])
-            serializer = self.get_serializer(instance)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        return response
+        # Idempotent: liking again returns the existing like.
+        like, created = insert_or_get(
+            Like, ["user", "tweet"], user=request.user, tweet=self.get_tweet()
+        )
+        return Response(
+            self.get_serializer(like).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
     def delete(self, request, *args, **kwargs):
         instance = get_object_or_404(Like, user=request.user, tweet=self.get_tweet())
@@ -448,21 +366,16 @@ class LikeTweetAPIView(
 
 class CommentOnTweetAPIView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_tweet(self):
-        return get_object_or_404(Tweet, pk=self.kwargs["pk"])
+        return get_instance_or_404(self.request, Tweet, self.kwargs["pk"])
 
     def get_queryset(self):
         return (
             Comment.objects.filter(tweet=self.get_tweet(), parent=None)
             .select_related("user", "user__profile", "tweet")
-            .prefetch_related(
-                Prefetch(
-                    "replies",
-                    queryset=Comment.objects.select_related("user", "user__profile"),
-                )
-            )
-            .annotate(replies_count=Count("replies", distinct=True))
+            .prefetch_related(prefetch_reply_previews())
         )
 
     def get_serializer_class(self):
@@ -480,31 +393,22 @@ class CommentOnTweetAPIView(generics.ListCreateAPIView):
 
 
 class CommentDetailAPIView(generics.RetrieveDestroyAPIView):
-    serializer_class = CommentSerializer
+    """
+    A comment with its thread: one page of replies per level, down to
+    ``COMMENT_TREE_MAX_DEPTH`` levels. ``?cursor=`` continues the comment's own
+    replies from a ``replies_next`` link.
+    """
+
+    serializer_class = CommentThreadSerializer
 
     def get_queryset(self):
-        return Comment.objects.select_related(
-            "user", "user__profile", "tweet"
-        ).prefetch_related(
-            Prefetch(
-                "replies",
-                queryset=Comment.objects.select_related(
-                    "user", "user__profile"
-                ).prefetch_related(
-                    Prefetch(
-                        "replies",
-                        queryset=Comment.objects.select_related(
-                            "user", "user__profile"
-                        ),
-                    )
-                ),
-            )
-        )
+        return Comment.objects.select_related("user", "user__profile", "tweet")
 
     def get_object(self):
-        tweet = get_object_or_404(Tweet, pk=self.kwargs["pk"])
         obj = get_object_or_404(
-            self.get_queryset(), pk=self.kwargs["comment_id"], tweet=tweet
+            self.get_queryset(),
+            pk=self.kwargs["comment_id"],
+            tweet_id=self.kwargs["pk"],
         )
         self.check_object_permissions(self.request, obj)
         return obj
@@ -514,14 +418,17 @@ class CommentDetailAPIView(generics.RetrieveDestroyAPIView):
             return [IsAuthenticated(), IsCommentOwner()]
         return [IsAuthenticated()]
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context["full_depth"] = True  # Full recusrsion
-        return context
+    def retrieve(self, request, *args, **kwargs):
+        comment = self.get_object()
+        cursor = KeysetPagination().decode_cursor(request)
+        tree = CommentTree(comment, cursor=cursor)
+
+        context = {**self.get_serializer_context(), "tree": tree}
+        serializer = self.get_serializer(comment, context=context)
+        return Response(serializer.data)
 
 
 class BookmarkAPIView(
-    mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     generics.GenericAPIView,
 ):
@@ -532,31 +439,24 @@ class BookmarkAPIView(
         return (
             Bookmark.objects.filter(user=self.request.user)
             .select_related("user", "user__profile", "tweet")
-            .prefetch_related("tweet__comments")
         )
 
     def get_tweet(self):
-        return get_object_or_404(Tweet, pk=self.kwargs["pk"])
-
-    def perform_create(self, serializer):
-        try:
-            serializer.save(user=self.request.user, tweet=self.get_tweet())
-        except IntegrityError:
-            raise ValidationError(
-                {
-                    "error": "already_bookmarked",
-                    "detail": "You have already bookmarked this tweet. Use DELETE to remove.",
-                }
-            )
+        return get_instance_or_404(self.request, Tweet, self.kwargs["pk"])
 
     def post(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        if response.status_code == status.HTTP_201_CREATED:
+        # Idempotent: bookmarking again keeps the existing bookmark.
+        _, created = insert_or_get(
+            Bookmark, ["user", "tweet"], user=request.user, tweet=self.get_tweet()
+        )
+        if created:
             return Response(
                 {"detail": "Tweet added to your bookmarks"},
                 status=status.HTTP_201_CREATED,
             )
-        return response
+        return Response(
+            {"detail": "Tweet is already in your bookmarks"}, status=status.HTTP_200_OK
+        )
 
     def delete(self, request, *args, **kwargs):
         instance = get_object_or_404(
@@ -576,21 +476,38 @@ class UserBookmarksAPIView(generics.ListAPIView):
         return (
             Bookmark.objects.filter(user=self.request.user)
             .select_related("tweet", "tweet__user", "tweet__user__profile")
-            .annotate(
-                likes_count=Count("tweet__likes", distinct=True),
-                comments_count=Count(
-                    "tweet__comments",
-                    filter=Q(tweet__comments__parent=None),
-                    distinct=True,
-                ),
-                retweets_count=Count("tweet__retweets", distinct=True),
-                is_liked=Exists(
-                    Like.objects.filter(user=self.request.user, tweet=OuterRef("tweet"))
-                ),
-                is_retweeted=Exists(
-                    Retweet.objects.filter(
-                        user=self.request.user, tweet=OuterRef("tweet")
-                    )
-                ),
-            )
         ).order_by("-created_at")
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            prepare_tweets((bookmark.tweet for bookmark in page), self.request.user)
+        return page
+
+
+class InteractionBatchAPIView(generics.GenericAPIView):
+    """
+    Apply many likes, retweets and bookmarks (and their removals) in one
+    transaction; the response lists the outcome of each operation in order.
+    """
+
+    serializer_class = InteractionBatchSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [InteractionBatchRateThrottle]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data["operations"]
+
+        statuses = apply_interactions(request.user, operations)
+
+        return Response(
+            {
+                "results": [
+                    {**operation, "status": status_}
+                    for operation, status_ in zip(operations, statuses)
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )